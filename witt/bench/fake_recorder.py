@@ -0,0 +1,103 @@
+import os
+import shlex
+import subprocess
+import time
+from pathlib import Path
+from typing import Union
+
+from core.cyber.reader import read_record_info
+from core.cyber.splitter import split_record
+from core.staging import StagingCache
+from core.trace import span
+from utils import parser
+
+
+class FakeExecutor:
+    """
+    替代 DockerAdapter：本地模拟容器内的 cyber_recorder info/split，
+    按 docker exec 启动开销 + 文件吞吐量注入延迟，输出格式与真实命令一致。
+    """
+
+    def __init__(
+        self, ctx, exec_latency: float = 0.1, info_latency: float = 0.05, split_mbps: float = 150.0
+    ):
+        self.staging = StagingCache(ctx)
+        self.exec_latency = exec_latency
+        self.info_latency = info_latency
+        self.split_mbps = split_mbps
+
+    def map_path(self, host_path: Union[str, Path], stage: bool = False) -> str:
+        if stage:
+            host_path = self.staging.stage(host_path)
+        return Path(host_path).resolve().as_posix()
+
+    def remove(self, path: str):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def execute(self, cmd: str) -> str:
+        with span("docker.execute", cmd=cmd) as s:
+            stdout = self._execute(cmd)
+            s.update(exit_code=0, bytes_out=len(stdout))
+            return stdout
+
+    def execute_interactive(self, cmd: str):
+        time.sleep(self.exec_latency)
+
+    def cancel_all(self):
+        """模拟命令在本线程内执行，随 Ctrl-C 一起结束，无需额外处理"""
+
+    def _execute(self, cmd: str) -> str:
+        time.sleep(self.exec_latency)
+        argv = shlex.split(cmd)
+        if argv[:2] == ["cyber_recorder", "info"]:
+            time.sleep(self.info_latency)
+            return self._info(argv[2])
+        if argv[:2] == ["cyber_recorder", "split"]:
+            return self._split(argv[2:])
+        raise subprocess.CalledProcessError(127, cmd, "", f"fake: unsupported command {cmd}")
+
+    @staticmethod
+    def _info(path: str) -> str:
+        try:
+            info = read_record_info(path)
+        except (OSError, ValueError) as e:
+            raise subprocess.CalledProcessError(1, f"cyber_recorder info {path}", "", str(e))
+        lines = [
+            f"record_file:    {path}",
+            "version:        1.0",
+            f"duration:       {info['duration']}.000000 Seconds",
+            f"begin_time:     {info['begin']:%Y-%m-%d-%H:%M:%S}",
+            f"end_time:       {info['end']:%Y-%m-%d-%H:%M:%S}",
+            f"size:           {os.path.getsize(path)} Bytes",
+            "is_complete:    true",
+        ]
+        prefix = "channel_info:   "
+        for ch in info["channels"]:
+            lines.append(f"{prefix}{ch['name']:<60}{ch['count']:>8} messages: pb.Msg")
+            prefix = " " * 16
+        return "\n".join(lines) + "\n"
+
+    def _split(self, args) -> str:
+        opts = {"-k": []}
+        for flag, value in zip(args[::2], args[1::2]):
+            if flag == "-k":
+                opts["-k"].append(value)
+            else:
+                opts[flag] = value
+        src, dest = opts["-f"], opts["-o"]
+        begin = parser.str_to_time(opts["-b"]) if "-b" in opts else None
+        end = parser.str_to_time(opts["-e"]) if "-e" in opts else None
+        # 模拟容器内逐条解析的吞吐量
+        time.sleep(os.path.getsize(src) / (self.split_mbps * 2**20))
+        try:
+            split_record(
+                src,
+                dest,
+                int(begin.timestamp()) * 10**9 if begin else None,
+                int(end.timestamp()) * 10**9 if end else None,
+                opts["-k"],
+            )
+        except (OSError, ValueError) as e:
+            raise subprocess.CalledProcessError(1, f"cyber_recorder split -f {src}", "", str(e))
+        return ""
@@ -0,0 +1,206 @@
+"""
+端到端性能基准：在模拟 NAS 上跑 检索 -> 切片 -> 回放库扫描/加载，记录各阶段耗时。
+容器由 FakeExecutor 模拟，不需要实车数据和 docker。
+用法示例:
+    python3 main.py bench
+    python3 main.py bench --records 120 --tags 20 --tolerance 0.3
+结果追加到系统临时目录下的 witt_bench/results.jsonl（--results 可改），与上一次相同参数的结果比较，任一阶段变慢超过阈值时返回非零。
+"""
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from bench.fake_recorder import FakeExecutor
+from bench.synth import generate
+from core.session import AppSession
+from core.trace import tracer
+from interface import ui
+from utils import parser
+
+BENCH_DIR = Path(__file__).resolve().parent
+# 结果不写进源码目录，跨多次运行保留在系统临时目录中用于对比
+DEFAULT_RESULTS = Path(tempfile.gettempdir()) / "witt_bench" / "results.jsonl"
+DATASET_KEYS = ("socs", "records", "tags", "channels", "rate", "payload")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="witt bench", description="witt 端到端性能基准")
+    ap.add_argument("--socs", type=int, default=2)
+    ap.add_argument("--records", type=int, default=60, help="每个 soc 的 record 数（每个 60s）")
+    ap.add_argument("--tags", type=int, default=10)
+    ap.add_argument("--channels", type=int, default=8)
+    ap.add_argument("--rate", type=int, default=10, help="每个频道每秒消息数")
+    ap.add_argument("--payload", type=int, default=256, help="单条消息字节数")
+    ap.add_argument("--backend", choices=["docker", "native", "both"], default="both")
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--exec-latency", type=float, default=0.1, help="模拟 docker exec 启动耗时(s)")
+    ap.add_argument("--info-latency", type=float, default=0.05, help="模拟 cyber_recorder info 耗时(s)")
+    ap.add_argument("--split-mbps", type=float, default=150.0, help="模拟容器内切片吞吐(MB/s)")
+    ap.add_argument("--staging", action="store_true", help="把模拟数据当作 NAS，经本地缓存读取")
+    ap.add_argument("--workdir", help="数据集与输出目录，默认临时目录且结束后删除")
+    ap.add_argument("--results", default=str(DEFAULT_RESULTS))
+    ap.add_argument("--tolerance", type=float, default=0.2, help="相对上次结果允许的变慢比例")
+    ap.add_argument("--verbose", action="store_true", help="显示各阶段原本的终端输出")
+    return ap
+
+
+class Bench:
+    def __init__(self, args, root: Path):
+        self.args = args
+        self.root = root
+        self.data_root = root / "data"
+        self.date = "20260101"
+        self.vehicle = "BENCH01"
+        self.timings: Dict[str, float] = {}
+
+    def session(self, backend: str, dest_root: Path) -> AppSession:
+        session = AppSession()
+        config = session.ctx.config
+        config["host"]["data_root"] = str(self.data_root)
+        config["host"]["dest_root"] = str(dest_root)
+        config["logic"].update(
+            {"vehicle": self.vehicle, "target_date": self.date, "soc": "soc",
+             "before": 15, "after": 5, "blacklist": [self.dataset["channels"][-1]]}
+        )
+        config.setdefault("recorder", {}).update(info_backend=backend, split_backend=backend)
+        if self.args.workers:
+            config.setdefault("pipeline", {})["workers"] = self.args.workers
+        config["staging"] = {
+            "enabled": self.args.staging,
+            "sources": [str(self.data_root)],
+            "dir": str(dest_root / "staging"),
+        }
+        session.executor = FakeExecutor(
+            session.ctx,
+            self.args.exec_latency, self.args.info_latency, self.args.split_mbps
+        )
+        return session
+
+    def time(self, stage: str, func: Callable):
+        out = io.StringIO()
+        quiet = contextlib.nullcontext() if self.args.verbose else contextlib.redirect_stdout(out)
+        t0 = time.perf_counter()
+        with quiet:
+            result = func()
+        self.timings[stage] = round(time.perf_counter() - t0, 4)
+        return result
+
+    def run(self) -> Dict[str, float]:
+        args = self.args
+        t0 = time.perf_counter()
+        self.dataset = generate(
+            self.data_root, self.date,
+            **{k: getattr(args, k) for k in DATASET_KEYS},
+        )
+        ui.print_status(
+            f"模拟数据: {self.dataset['records']} 个 record, "
+            f"{self.dataset['bytes'] / 2**20:.1f} MB, {time.perf_counter() - t0:.1f}s"
+        )
+        backends = ["docker", "native"] if args.backend == "both" else [args.backend]
+        for backend in backends:
+            dest_root = self.root / f"dest_{backend}"
+            session = self.session(backend, dest_root)
+            p = f"{backend}."
+            self.time(p + "search_cold", session.index.search)
+            self.time(p + "search_warm", session.index.search)
+            tasks = [t for t in parser.parse_manifest(session.ctx.manifest_path) if t["paths"]]
+            stats = self.time(p + "split", lambda: session.downloader.download_record(tasks))
+            if stats["failed"] or not stats["sliced"]:
+                raise RuntimeError(f"{backend} 切片结果异常: {stats}")
+            self.time(p + "split_noop", lambda: session.downloader.download_record(tasks))
+            session.catalog.db_path.unlink()
+            self.time(p + "library_scan_cold", session.player.scan_local_library)
+            self.time(p + "library_scan_warm", session.player.scan_local_library)
+            library = self.time(p + "library_load", session.player.get_library)
+            if len(library) != len({t["name"] for t in tasks}):
+                ui.print_status(f"{backend} 回放库条目数与 tag 数不一致", "WARN")
+            tracer.flush(session.ctx.log_dir)
+        return self.timings
+
+
+def git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baseline(results: Path, params: dict) -> Optional[dict]:
+    """同一组参数的上一次结果"""
+    if not results.exists():
+        return None
+    baseline = None
+    for line in results.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get("params") == params:
+            baseline = entry
+    return baseline
+
+
+def report(timings: dict, baseline: Optional[dict], tolerance: float) -> list:
+    """打印对比表，返回超出阈值的阶段"""
+    old = (baseline or {}).get("timings", {})
+    regressions = []
+    print(f"{'stage':<28}{'time':>10}{'baseline':>12}{'delta':>10}")
+    print("-" * 60)
+    for stage, value in timings.items():
+        prev = old.get(stage)
+        if prev:
+            delta = (value - prev) / prev
+            flag = ""
+            # 极短的阶段只看比例会误报，至少慢 10ms 才算退化
+            if delta > tolerance and value - prev > 0.01:
+                regressions.append(stage)
+                flag = " !"
+            print(f"{stage:<28}{value:>9.3f}s{prev:>11.3f}s{delta:>+9.0%}{flag}")
+        else:
+            print(f"{stage:<28}{value:>9.3f}s{'-':>12}{'-':>10}")
+    print("-" * 60)
+    return regressions
+
+
+def main(argv) -> int:
+    args = build_parser().parse_args(argv)
+    root = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="witt_bench_"))
+    # 只清理基准自己创建的子目录
+    for name in ("data", "dest_docker", "dest_native"):
+        shutil.rmtree(root / name, ignore_errors=True)
+    params = {k: getattr(args, k) for k in DATASET_KEYS + ("backend", "workers",
+              "exec_latency", "info_latency", "split_mbps", "staging")}
+    try:
+        timings = Bench(args, root).run()
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+    results = Path(args.results)
+    baseline = load_baseline(results, params)
+    regressions = report(timings, baseline, args.tolerance)
+    results.parent.mkdir(parents=True, exist_ok=True)
+    with open(results, "a", encoding="utf-8") as f:
+        entry = {"time": datetime.now().isoformat(timespec="seconds"), "rev": git_rev(),
+                 "params": params, "timings": timings}
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    if regressions:
+        ui.print_status(f"性能退化超过 {args.tolerance:.0%}: {', '.join(regressions)}", "ERROR")
+        return 1
+    ui.print_status(f"结果已保存: {results}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
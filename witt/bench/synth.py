@@ -0,0 +1,134 @@
+"""
+生成模拟 NAS 目录：按 soc 划分的 record、两种时间格式的 tag 文件与 version 文件，
+布局与 find_record.sh / RecordIndex 的解析规则一致。
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from core.cyber.proto import field_bytes, field_varint
+from core.cyber.splitter import RecordWriter
+
+
+def _channel_names(count: int) -> List[str]:
+    base = ["perception/obstacles", "planning/trajectory", "control/cmd", "localization/pose",
+            "sensor/camera/front", "sensor/lidar/top", "canbus/chassis", "prediction/obstacles"]
+    return [f"/mdrive/{base[i % len(base)]}{'' if i < len(base) else i // len(base)}"
+            for i in range(count)]
+
+
+def write_record(
+    path: Path,
+    begin: datetime,
+    seconds: int,
+    channels: List[str],
+    rate: int,
+    payload: int,
+    chunk_seconds: int = 5,
+):
+    """写出一个未压缩的 record：每个频道每秒 rate 条消息，每 chunk_seconds 秒一个 chunk"""
+    t0 = int(begin.timestamp()) * 10**9
+    step = 10**9 // rate
+    blob = os.urandom(payload)
+    writer = RecordWriter(
+        str(path),
+        {"major_version": 1, "minor_version": 0, "compress": 0,
+         "chunk_interval": chunk_seconds * 10**9, "segment_interval": seconds * 10**9},
+    )
+    counts = dict.fromkeys(channels, 0)
+    for c_start in range(0, seconds, chunk_seconds):
+        times = [
+            t0 + (c_start + s) * 10**9 + i * step
+            for s in range(min(chunk_seconds, seconds - c_start))
+            for i in range(rate)
+        ]
+        body = b"".join(
+            field_bytes(1, field_bytes(1, ch.encode()) + field_varint(2, t) + field_bytes(3, blob))
+            for t in times
+            for ch in channels
+        )
+        count = len(times) * len(channels)
+        header = (
+            field_varint(1, times[0])
+            + field_varint(2, times[-1])
+            + field_varint(3, count)
+            + field_varint(4, len(body))
+        )
+        writer.write_chunk(header, body, count, times[0], times[-1], len(body))
+        for ch in channels:
+            counts[ch] += len(times)
+    for ch in channels:
+        desc = field_bytes(1, ch.encode()) + field_bytes(2, b"pb.Msg") + field_bytes(3, b"desc")
+        cache = (
+            field_varint(1, counts[ch])
+            + field_bytes(2, ch.encode())
+            + field_bytes(3, b"pb.Msg")
+            + field_bytes(4, b"desc")
+        )
+        writer.write_channel(desc, cache)
+    writer.close(len(channels))
+
+
+def _tag_line(name: str, dt: datetime, mdy: bool) -> str:
+    if mdy:
+        hour = dt.hour % 12 or 12
+        stamp = f"{dt.month}/{dt.day}/{dt.year}, {hour}:{dt:%M:%S} {'PM' if dt.hour >= 12 else 'AM'}"
+    else:
+        stamp = f"{dt.year}/{dt.month}/{dt.day} {dt:%H:%M:%S}"
+    return f'msg: "{name} : {stamp}\\n"'
+
+
+def generate(
+    root: Path,
+    date: str,
+    socs: int = 2,
+    records: int = 60,
+    record_seconds: int = 60,
+    tags: int = 10,
+    channels: int = 8,
+    rate: int = 10,
+    payload: int = 256,
+    seed: int = 0,
+) -> Dict:
+    """
+    在 root 下生成一天的数据：
+    root/{date}_soc{n}/{date}HHMMSS.record.{序号}.{HHMMSS}、root/tags/tag_{date}_*.pb.txt
+    返回数据集描述
+    """
+    rng = random.Random(seed)
+    day_start = datetime.strptime(date, "%Y%m%d") + timedelta(hours=10)
+    names = _channel_names(channels)
+    total_bytes = 0
+    for soc in range(1, socs + 1):
+        soc_dir = root / f"{date}_soc{soc}"
+        soc_dir.mkdir(parents=True, exist_ok=True)
+        (soc_dir / "version.json").write_text(
+            json.dumps({"soc": f"soc{soc}", "version": "bench"}), encoding="utf-8"
+        )
+        for seq in range(records):
+            begin = day_start + timedelta(seconds=seq * record_seconds)
+            path = soc_dir / f"{day_start:%Y%m%d%H%M%S}.record.{seq:05d}.{begin:%H%M%S}"
+            write_record(path, begin, record_seconds, names, rate, payload)
+            total_bytes += path.stat().st_size
+
+    tag_dir = root / "tags"
+    tag_dir.mkdir(parents=True, exist_ok=True)
+    span = records * record_seconds
+    lines = []
+    for i in range(tags):
+        dt = day_start + timedelta(seconds=rng.randrange(60, max(61, span)))
+        lines.append(_tag_line(f"tag{i:03d}", dt, mdy=bool(i % 2)))
+    half = len(lines) // 2
+    (tag_dir / f"tag_{date}_a.pb.txt").write_text("\n".join(lines[:half]) + "\n", encoding="utf-8")
+    (tag_dir / f"tag_{date}_b.pb.txt").write_text("\n".join(lines[half:]) + "\n", encoding="utf-8")
+    return {
+        "date": date,
+        "socs": socs,
+        "records": records * socs,
+        "tags": tags,
+        "channels": names,
+        "bytes": total_bytes,
+    }
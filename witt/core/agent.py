@@ -0,0 +1,121 @@
+import itertools
+import json
+import logging
+import subprocess
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Dict, List, Optional
+
+AGENT_SERVER = Path(__file__).resolve().with_name("agent_server.py")
+# 代理侧超时后结束进程组再回复，客户端在此基础上多等一段时间
+REPLY_GRACE = 30
+
+
+class AgentClient:
+    """
+    与常驻代理进程通信的客户端，线程安全。
+    argv 决定代理如何启动：正常为 docker exec -i，本地调试可直接用 python3 运行 agent_server.py。
+    """
+
+    def __init__(self, argv: List[str], startup_timeout: float = 30):
+        self.argv = argv
+        self.startup_timeout = startup_timeout
+        self.proc: Optional[subprocess.Popen] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        threading.Thread(target=self._log_stderr, args=(self.proc.stderr,), daemon=True).start()
+        if not self._ready.wait(self.startup_timeout) or not self.alive:
+            self.close()
+            raise RuntimeError("任务代理启动失败")
+        logging.info(f"[AGENT] Started: pid {self.proc.pid}")
+
+    def _read_loop(self):
+        for line in self.proc.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if msg.get("ready"):
+                self._ready.set()
+                continue
+            with self._lock:
+                future = self._pending.pop(msg.get("id"), None)
+            if future:
+                future.set_result(msg)
+        # 代理退出：唤醒所有等待中的调用方
+        self._ready.set()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError("任务代理已退出"))
+
+    @staticmethod
+    def _log_stderr(stream):
+        """代理的标准错误（如 setup.sh 报错）写入日志"""
+        for line in stream:
+            logging.info(f"[AGENT] {line.rstrip()}")
+
+    def execute(self, cmd: str, timeout: Optional[float] = None) -> str:
+        """提交一条命令并等待结果，失败/超时时与 subprocess.run(check=True) 行为一致"""
+        future: Future = Future()
+        with self._lock:
+            if not self.alive:
+                raise RuntimeError("任务代理未运行")
+            job_id = next(self._ids)
+            self._pending[job_id] = future
+            self.proc.stdin.write(
+                json.dumps({"id": job_id, "cmd": cmd, "timeout": timeout}) + "\n"
+            )
+            self.proc.stdin.flush()
+        try:
+            msg = future.result(timeout + REPLY_GRACE if timeout else None)
+        except FutureTimeout:
+            with self._lock:
+                self._pending.pop(job_id, None)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if msg.get("timeout"):
+            raise subprocess.TimeoutExpired(cmd, timeout, output=msg["stdout"])
+        if msg["rc"] != 0:
+            raise subprocess.CalledProcessError(
+                msg["rc"], cmd, output=msg["stdout"], stderr=msg["stderr"]
+            )
+        return msg["stdout"]
+
+    def cancel_all(self):
+        """结束代理中所有正在执行的命令，等待中的调用方随即收到失败结果"""
+        with self._lock:
+            if not self.alive:
+                return
+            try:
+                self.proc.stdin.write(json.dumps({"cancel": True}) + "\n")
+                self.proc.stdin.flush()
+            except OSError:
+                pass
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+        self.proc = None
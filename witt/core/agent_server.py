@@ -0,0 +1,92 @@
+"""
+容器内常驻的任务代理：环境只 source 一次，通过 stdin/stdout 的 JSON 行协议接收命令。
+请求: {"id": 1, "cmd": "cyber_recorder info ...", "timeout": 600}
+响应: {"id": 1, "rc": 0, "stdout": "...", "stderr": "..."}，超时时附带 "timeout": true
+取消: {"cancel": true} 结束所有正在执行的命令，各自照常回复（rc 为负的信号值）
+启动完成后先输出 {"id": 0, "ready": true}。
+该文件会被原样传入容器执行，只依赖标准库，并保持 python3.6 兼容。
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_write_lock = threading.Lock()
+_running_lock = threading.Lock()
+_running = {}
+
+
+def reply(obj):
+    line = json.dumps(obj)
+    with _write_lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+
+def run_job(job):
+    try:
+        proc = subprocess.Popen(
+            ["/bin/bash", "-c", job["cmd"]],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            preexec_fn=os.setsid,
+        )
+        with _running_lock:
+            _running[job["id"]] = proc
+        timed_out = False
+        try:
+            out, err = proc.communicate(timeout=job.get("timeout"))
+        except subprocess.TimeoutExpired:
+            # 结束整个进程组，避免卡在 CIFS 读上的子进程占住 worker
+            timed_out = True
+            os.killpg(proc.pid, signal.SIGKILL)
+            out, err = proc.communicate()
+        reply(
+            {
+                "id": job["id"],
+                "rc": proc.returncode,
+                "stdout": out.decode("utf-8", "replace"),
+                "stderr": err.decode("utf-8", "replace"),
+                "timeout": timed_out,
+            }
+        )
+    except Exception as e:
+        reply({"id": job["id"], "rc": -1, "stdout": "", "stderr": str(e)})
+    finally:
+        with _running_lock:
+            _running.pop(job["id"], None)
+
+
+def cancel_all():
+    with _running_lock:
+        procs = list(_running.values())
+    for proc in procs:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        reply({"id": 0, "ready": True})
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError:
+                continue
+            if job.get("cancel"):
+                cancel_all()
+                continue
+            pool.submit(run_job, job)
+
+
+if __name__ == "__main__":
+    main()
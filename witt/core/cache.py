@@ -0,0 +1,143 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# 命中后的 last_used 先记在内存，攒够条数或间隔到期再批量写回
+TOUCH_BATCH = 200
+TOUCH_INTERVAL = 30.0
+
+
+class InfoCache:
+    """
+    cyber_recorder info 结果的持久化缓存。
+    以 (路径, 大小, mtime) 标识文件，文件被改写后自动失效；超过条目上限时按最近使用淘汰。
+    每个线程复用一条连接，表结构只建一次；命中只读库，最近使用时间批量写回
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.max_entries = int(ctx.config.get("cache", {}).get("info_entries", 5000))
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ready = set()
+        self._touched: Dict[str, float] = {}
+        self._flushed = time.monotonic()
+        atexit.register(self.flush)
+
+    @property
+    def db_path(self) -> Path:
+        # v2: 本地解析与 cyber_recorder 统一只保留 /mdrive/ 频道，旧缓存中可能含其他频道
+        return self.ctx.cache_dir / "record_info.v2.db"
+
+    def _init_db(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10)
+        try:
+            # WAL 下读不阻塞写，切片线程池并发查询时不互相等待
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS info (
+                        path TEXT PRIMARY KEY,
+                        size INTEGER,
+                        mtime INTEGER,
+                        data TEXT,
+                        last_used REAL
+                    )"""
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON info(last_used)")
+        finally:
+            conn.close()
+
+    def _conn(self) -> sqlite3.Connection:
+        """当前线程的连接；dest_root 改变时换到新的库"""
+        path = self.db_path
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.path == path:
+            return conn
+        if conn is not None:
+            conn.close()
+        with self._lock:
+            if path not in self._ready:
+                self._init_db(path)
+                self._ready.add(path)
+        conn = sqlite3.connect(path, timeout=10)
+        self._local.conn, self._local.path = conn, path
+        return conn
+
+    @staticmethod
+    def _identity(path: str):
+        st = os.stat(path)
+        return os.path.realpath(path), st.st_size, st.st_mtime_ns
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            key, size, mtime = self._identity(path)
+        except OSError:
+            return None
+        row = self._conn().execute(
+            "SELECT data FROM info WHERE path=? AND size=? AND mtime=?",
+            (key, size, mtime),
+        ).fetchone()
+        if row is None:
+            return None
+        self._touch(key)
+        info = json.loads(row[0])
+        info["begin"] = datetime.fromisoformat(info["begin"])
+        info["end"] = datetime.fromisoformat(info["end"])
+        return info
+
+    def _touch(self, key: str):
+        with self._lock:
+            self._touched[key] = time.time()
+            due = (
+                len(self._touched) >= TOUCH_BATCH
+                or time.monotonic() - self._flushed >= TOUCH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def _take_touched(self):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._flushed = time.monotonic()
+        return [(t, key) for key, t in touched.items()]
+
+    def flush(self):
+        """把内存中的最近使用时间写回库"""
+        touched = self._take_touched()
+        if not touched:
+            return
+        try:
+            with self._conn() as conn:
+                conn.executemany("UPDATE info SET last_used=? WHERE path=?", touched)
+        except sqlite3.Error:
+            # 只影响淘汰顺序，写回失败不影响结果
+            pass
+
+    def put(self, path: str, info: Dict[str, Any]):
+        try:
+            key, size, mtime = self._identity(path)
+        except OSError:
+            return
+        data = dict(info, begin=info["begin"].isoformat(), end=info["end"].isoformat())
+        touched = self._take_touched()
+        with self._conn() as conn:
+            if touched:
+                conn.executemany("UPDATE info SET last_used=? WHERE path=?", touched)
+            conn.execute(
+                "INSERT OR REPLACE INTO info VALUES (?, ?, ?, ?, ?)",
+                (key, size, mtime, json.dumps(data, ensure_ascii=False), time.time()),
+            )
+            conn.execute(
+                """DELETE FROM info WHERE path IN (
+                    SELECT path FROM info ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
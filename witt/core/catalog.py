@@ -0,0 +1,230 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from interface import ui
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tags (
+    tag_dir TEXT PRIMARY KEY,
+    vehicle TEXT,
+    date TEXT,
+    tag TEXT,
+    time TEXT,
+    last_update TEXT,
+    signature TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    tag_dir TEXT,
+    soc TEXT,
+    path TEXT,
+    begin TEXT,
+    duration INTEGER,
+    PRIMARY KEY (tag_dir, soc, path)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_vehicle_date ON tags(vehicle, date, time);
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag);
+CREATE INDEX IF NOT EXISTS idx_tags_time ON tags(time);
+CREATE INDEX IF NOT EXISTS idx_files_soc ON files(soc);
+"""
+
+
+def load_tag_entry(tag_dir: Path) -> Dict[str, Any]:
+    """从 tag 目录的 meta.json 构造回放库条目"""
+    meta_file = tag_dir / "meta.json"
+    try:
+        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        tag_entry = {
+            "tag": meta["tag_info"]["name"],
+            "time": meta["tag_info"]["time"],
+            "vehicle": meta.get("vehicle", tag_dir.parent.name),
+            "date": meta.get("date", tag_dir.parents[1].name),
+            "socs": {},
+            "last_update": meta.get("last_update"),
+        }
+        for soc_name, file_names in meta.get("files", {}).items():
+            soc_path = tag_dir / soc_name
+            if not soc_path.exists():
+                continue
+            record_details = []
+            for fname in file_names:
+                f_abs_path = soc_path / fname
+                if f_abs_path.exists():
+                    record_details.append(
+                        {
+                            "path": str(f_abs_path.absolute()),
+                            "begin": meta["tag_info"]["abs_start"],
+                            "duration": meta["tag_info"]["offset_bf"]
+                            + meta["tag_info"]["offset_af"],
+                        }
+                    )
+            if record_details:
+                record_details.sort(key=lambda x: x["begin"])
+                tag_entry["socs"][soc_name] = record_details
+        return tag_entry
+    except Exception as e:
+        ui.print_status(f"[{meta_file}] 元数据解析失败...", "ERROR")
+        raise e
+
+
+def tag_signature(tag_dir: Path) -> Optional[List]:
+    """meta.json 与各 soc 子目录的 mtime，任一变化即视为该 tag 目录有更新"""
+    try:
+        meta_mtime = (tag_dir / "meta.json").stat().st_mtime_ns
+    except OSError:
+        return None
+    sub_mtimes = {}
+    with os.scandir(tag_dir) as it:
+        for de in it:
+            if de.is_dir():
+                sub_mtimes[de.name] = de.stat().st_mtime_ns
+    return [meta_mtime, sub_mtimes]
+
+
+class Catalog:
+    """
+    dest_root 下跨日期、跨车辆的切片目录，取代按 work_dir 存放的 local_library.json。
+    可随时从已有的 meta.json 全量重建。
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self) -> Path:
+        return self.ctx.cache_dir / "catalog.db"
+
+    @contextmanager
+    def _connect(self):
+        fresh = not self.db_path.exists()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.executescript(_SCHEMA)
+        try:
+            with self._lock, conn:
+                if fresh:
+                    self._rebuild(conn)
+                yield conn
+        finally:
+            conn.close()
+
+    def _write(self, conn, tag_dir: str, entry: Dict[str, Any], signature=None):
+        conn.execute("DELETE FROM files WHERE tag_dir=?", (tag_dir,))
+        conn.execute(
+            "INSERT OR REPLACE INTO tags VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                tag_dir,
+                entry["vehicle"],
+                entry["date"],
+                entry["tag"],
+                entry["time"],
+                json.dumps(entry.get("last_update") or {}, ensure_ascii=False),
+                json.dumps(signature) if signature else None,
+            ),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+            [
+                (tag_dir, soc, r["path"], r["begin"], r["duration"])
+                for soc, records in entry["socs"].items()
+                for r in records
+            ],
+        )
+
+    def upsert(self, tag_dir: Path, entry: Dict[str, Any], signature=None):
+        with self._connect() as conn:
+            self._write(conn, str(tag_dir), entry, signature)
+
+    def remove(self, tag_dirs: List[str]):
+        with self._connect() as conn:
+            for tag_dir in tag_dirs:
+                conn.execute("DELETE FROM files WHERE tag_dir=?", (tag_dir,))
+                conn.execute("DELETE FROM tags WHERE tag_dir=?", (tag_dir,))
+
+    def signatures(self, work_dir: Path) -> Dict[str, Any]:
+        """work_dir 下已登记 tag 目录的签名"""
+        prefix = str(work_dir).rstrip("/") + "/"
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT tag_dir, signature FROM tags WHERE substr(tag_dir, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+        return {d: json.loads(sig) if sig else None for d, sig in rows}
+
+    def query(
+        self,
+        vehicle: Optional[str] = None,
+        date: Optional[str] = None,
+        tag: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        soc: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """按 车辆/日期/tag/时间范围/soc 查询，返回与回放库相同结构的条目"""
+        conds, args = [], []
+        for column, value in (("vehicle", vehicle), ("date", date), ("tag", tag)):
+            if value:
+                conds.append(f"t.{column} = ?")
+                args.append(value)
+        if start:
+            conds.append("t.time >= ?")
+            args.append(start)
+        if end:
+            conds.append("t.time <= ?")
+            args.append(end)
+        if soc:
+            conds.append("f.soc = ?")
+            args.append(soc)
+        where = f"WHERE {' AND '.join(conds)}" if conds else ""
+        sql = f"""SELECT t.tag_dir, t.vehicle, t.date, t.tag, t.time, t.last_update,
+                         f.soc, f.path, f.begin, f.duration
+                  FROM tags t JOIN files f ON f.tag_dir = t.tag_dir
+                  {where} ORDER BY t.time, f.soc, f.begin, f.path"""
+        with self._connect() as conn:
+            rows = conn.execute(sql, args).fetchall()
+        library: Dict[str, Dict[str, Any]] = {}
+        for tag_dir, vehicle_, date_, tag_, time_, last_update, soc_, path, begin, duration in rows:
+            entry = library.setdefault(
+                tag_dir,
+                {
+                    "tag": tag_,
+                    "time": time_,
+                    "vehicle": vehicle_,
+                    "date": date_,
+                    "socs": {},
+                    "last_update": json.loads(last_update),
+                },
+            )
+            entry["socs"].setdefault(soc_, []).append(
+                {"path": path, "begin": begin, "duration": duration}
+            )
+        return list(library.values())
+
+    def _rebuild(self, conn):
+        dest_root = Path(self.ctx.config["host"]["dest_root"])
+        conn.execute("DELETE FROM files")
+        conn.execute("DELETE FROM tags")
+        count = 0
+        for meta_file in dest_root.glob("*/*/*/meta.json"):
+            tag_dir = meta_file.parent
+            try:
+                entry = load_tag_entry(tag_dir)
+            except Exception:
+                continue
+            self._write(conn, str(tag_dir), entry, tag_signature(tag_dir))
+            count += 1
+        # 目录库取代了各 work_dir 下的 local_library.json，重建时清理遗留的缓存文件
+        for stale in dest_root.glob("*/*/.witt/local_library.json"):
+            stale.unlink()
+        logging.info(f"[CATALOG] Rebuilt from {dest_root}: {count} tags")
+
+    def rebuild(self):
+        """从 dest_root 下所有 meta.json 重建目录"""
+        with self._connect() as conn:
+            self._rebuild(conn)
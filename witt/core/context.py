@@ -1,4 +1,5 @@
 import atexit
+import copy
 import logging
 import os
 import tempfile
@@ -54,13 +55,27 @@ class TaskContext:
         base = Path(self.config["host"]["dest_root"])
         return base / self.target_date[:8] / self.vehicle
 
+    @property
+    def cache_dir(self) -> Path:
+        """跨日期/车辆共享的缓存目录"""
+        return Path(self.config["host"]["dest_root"]) / ".witt"
+
     @property
     def log_dir(self) -> Path:
         return self.work_dir / ".witt" / "log"
 
     @property
     def manifest_path(self) -> Path:
-        return self.temp_dir / "tasks.list"
+        return self.temp_dir / "tasks.jsonl"
+
+    def derive(self, vehicle: str, target_date: str) -> "TaskContext":
+        """派生出指向另一车辆/日期的上下文，配置独立、临时目录挂在当前会话下"""
+        child = copy.copy(self)
+        child.config = copy.deepcopy(self.config)
+        child.config["logic"]["vehicle"] = vehicle
+        child.config["logic"]["target_date"] = target_date
+        child.temp_dir = Path(tempfile.mkdtemp(prefix=f"{vehicle}_{target_date}_", dir=self.temp_dir))
+        return child
 
     def _cleanup_temp(self):
         if self.temp_dir.exists():
@@ -106,19 +121,6 @@ class TaskContext:
         logging.info("Log File: %s", log_file)
         logging.info("=" * 50)
 
-    def get_library_fingerprint(self) -> str:
-        """
-        检查工作目录下所有子目录的最新修改时间，生成指纹。
-        """
-        if not self.work_dir.exists():
-            return ""
-        mtimes = [
-            path.stat().st_mtime for path in self.work_dir.rglob("*") if path.is_dir()
-        ]
-        mtimes.append(self.work_dir.stat().st_mtime)
-        latest_mtime = max(mtimes)
-        return f"{datetime.now().day}_{latest_mtime}"
-
     def get_env_vars(self) -> Dict[str, str]:
         """构建注入 Shell 脚本的环境变量字典"""
         vars = {
@@ -137,6 +139,8 @@ class TaskContext:
             "REMOTE_USER": self.config["remote"]["user"],
             "REMOTE_IP": self.config["remote"]["ip"],
             "REMOTE_DATA_ROOT": self.config["remote"]["data_root"],
+            # supervisor / Dreamview 由 witt 的 ServiceManager 按需拉起
+            "WITT_SERVICES": "1",
         }
         full_env = os.environ.copy()
         full_env.update({k: str(v) for k, v in vars.items()})
@@ -0,0 +1,81 @@
+"""
+最小化的 protobuf 线格式解码，只覆盖 Cyber record 用到的 varint / 定长 / length-delimited 字段。
+"""
+import struct
+from typing import Iterator, Tuple, Union
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LEN = 2
+WIRE_FIXED32 = 5
+
+
+def read_varint(buf, pos: int) -> Tuple[int, int]:
+    """返回 (值, 下一个位置)"""
+    result = 0
+    shift = 0
+    while True:
+        try:
+            b = buf[pos]
+        except IndexError:
+            raise ValueError("varint 越界") from None
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("varint 过长")
+
+
+def iter_fields(
+    buf, start: int = 0, end: int = -1
+) -> Iterator[Tuple[int, int, Union[int, memoryview]]]:
+    """
+    逐个产出 (字段号, wire 类型, 值)。
+    length-delimited 字段以 memoryview 切片返回，不复制底层数据。
+    """
+    view = memoryview(buf)
+    end = len(view) if end < 0 else end
+    pos = start
+    while pos < end:
+        key, pos = read_varint(view, pos)
+        field_no, wire = key >> 3, key & 0x07
+        if wire == WIRE_VARINT:
+            value, pos = read_varint(view, pos)
+        elif wire == WIRE_LEN:
+            length, pos = read_varint(view, pos)
+            if pos + length > end:
+                raise ValueError("字段长度越界")
+            value = view[pos : pos + length]
+            pos += length
+        elif wire in (WIRE_FIXED64, WIRE_FIXED32):
+            fmt = "<Q" if wire == WIRE_FIXED64 else "<I"
+            width = struct.calcsize(fmt)
+            if pos + width > end:
+                raise ValueError("定长字段越界")
+            value = struct.unpack_from(fmt, view, pos)[0]
+            pos += width
+        else:
+            raise ValueError(f"不支持的 wire 类型: {wire}")
+        yield field_no, wire, value
+
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def field_varint(field_no: int, value: int) -> bytes:
+    return encode_varint(field_no << 3 | WIRE_VARINT) + encode_varint(value)
+
+
+def field_bytes(field_no: int, value: Union[bytes, memoryview]) -> bytes:
+    return encode_varint(field_no << 3 | WIRE_LEN) + encode_varint(len(value)) + bytes(value)
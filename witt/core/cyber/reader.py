@@ -0,0 +1,142 @@
+import math
+import mmap
+import struct
+from datetime import datetime
+from typing import Any, Dict, List
+
+from core.cyber.proto import iter_fields
+from utils import parser
+
+# record 文件中每个段的前缀：int32 类型 + 4 字节对齐 + int64 长度
+SECTION = struct.Struct("<i4xq")
+HEADER_LENGTH = 2048
+
+SECTION_HEADER = 0
+SECTION_CHUNK_HEADER = 1
+SECTION_CHUNK_BODY = 2
+SECTION_INDEX = 3
+SECTION_CHANNEL = 4
+
+# record.proto 中 Header 的字段号
+HEADER_FIELDS = {
+    1: "major_version",
+    2: "minor_version",
+    3: "compress",
+    4: "chunk_interval",
+    5: "segment_interval",
+    6: "index_position",
+    7: "chunk_number",
+    8: "channel_number",
+    9: "begin_time",
+    10: "end_time",
+    11: "message_number",
+    12: "size",
+    13: "is_complete",
+    14: "chunk_raw_size",
+    15: "segment_raw_size",
+}
+
+
+class RecordReader:
+    """
+    基于 mmap 直接解析 Cyber record 的 Header 与 Index 段，不依赖容器和 cyber_recorder。
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header = self._read_header()
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+
+    def read_section(self, pos: int):
+        """返回 (段类型, 数据起始位置, 数据长度)"""
+        if pos + SECTION.size > len(self.mm):
+            raise ValueError(f"{self.path}: 段头越界 @ {pos}")
+        s_type, size = SECTION.unpack_from(self.mm, pos)
+        start = pos + SECTION.size
+        if size < 0 or start + size > len(self.mm):
+            raise ValueError(f"{self.path}: 段长度越界 @ {pos}")
+        return s_type, start, size
+
+    def _read_header(self) -> Dict[str, int]:
+        s_type, start, size = self.read_section(0)
+        if s_type != SECTION_HEADER:
+            raise ValueError(f"{self.path}: 不是有效的 record 文件")
+        header = {}
+        for no, _, value in iter_fields(self.mm, start, start + size):
+            if no in HEADER_FIELDS:
+                header[HEADER_FIELDS[no]] = value
+        return header
+
+    @property
+    def index(self) -> List[Dict[str, Any]]:
+        """Index 段中的 SingleIndex 列表：type / position / cache"""
+        if self._index is None:
+            pos = self.header.get("index_position", 0)
+            if not self.header.get("is_complete") or not pos:
+                raise ValueError(f"{self.path}: record 未正常关闭，缺少索引")
+            s_type, start, size = self.read_section(pos)
+            if s_type != SECTION_INDEX:
+                raise ValueError(f"{self.path}: 索引位置无效")
+            self._index = [
+                self._parse_single_index(value)
+                for no, _, value in iter_fields(self.mm, start, start + size)
+                if no == 1
+            ]
+        return self._index
+
+    @staticmethod
+    def _parse_single_index(buf) -> Dict[str, Any]:
+        entry = {"type": 0, "position": 0, "cache": {}}
+        for no, _, value in iter_fields(buf):
+            if no == 1:
+                entry["type"] = value
+            elif no == 2:
+                entry["position"] = value
+            elif no in (101, 102, 103):
+                # 复制出 bytes，避免持有 mmap 的引用导致无法关闭
+                entry["cache"] = {
+                    n: v if isinstance(v, int) else bytes(v)
+                    for n, _, v in iter_fields(value)
+                }
+        return entry
+
+    def channels(self) -> List[Dict[str, Any]]:
+        """与 cyber_recorder info 经 parser.parse_record_info 解析后的频道一致，只保留 /mdrive/ 频道"""
+        result = []
+        for entry in self.index:
+            if entry["type"] != SECTION_CHANNEL:
+                continue
+            cache = entry["cache"]
+            name = cache.get(2, b"").decode("utf-8", "replace")
+            if not parser.is_listed_channel(name):
+                continue
+            result.append({"name": name, "count": cache.get(1, 0)})
+        result.sort(key=lambda x: x["name"])
+        return result
+
+    def info(self) -> Dict[str, Any]:
+        """与 parser.parse_record_info 返回相同结构"""
+        begin_ns = self.header.get("begin_time", 0)
+        end_ns = self.header.get("end_time", 0)
+        return {
+            "begin": datetime.fromtimestamp(begin_ns // 10**9),
+            "end": datetime.fromtimestamp(end_ns // 10**9),
+            "duration": math.floor((end_ns - begin_ns) / 1e9),
+            "channels": self.channels(),
+        }
+
+
+def read_record_info(path: str) -> Dict[str, Any]:
+    with RecordReader(path) as reader:
+        return reader.info()
@@ -0,0 +1,242 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.cyber.proto import field_bytes, field_varint, read_varint
+from core.cyber.reader import (
+    HEADER_FIELDS,
+    HEADER_LENGTH,
+    SECTION,
+    SECTION_CHANNEL,
+    SECTION_CHUNK_BODY,
+    SECTION_CHUNK_HEADER,
+    SECTION_HEADER,
+    SECTION_INDEX,
+    RecordReader,
+)
+
+_HEADER_NUMBERS = {name: no for no, name in HEADER_FIELDS.items()}
+
+
+def iter_messages(buf, start: int, end: int):
+    """
+    遍历 ChunkBody 中的 SingleMessage，产出 (channel, time, 编码起点, 编码终点)。
+    只解析字段头，content 按长度跳过。
+    """
+    pos = start
+    while pos < end:
+        field_start = pos
+        key, pos = read_varint(buf, pos)
+        length, pos = read_varint(buf, pos)
+        msg_end = pos + length
+        if key != (1 << 3 | 2) or msg_end > end:
+            raise ValueError("ChunkBody 格式异常")
+        channel, t = b"", 0
+        p = pos
+        while p < msg_end:
+            k, p = read_varint(buf, p)
+            if k & 0x07 == 2:
+                n, p = read_varint(buf, p)
+                if k >> 3 == 1:
+                    channel = bytes(buf[p : p + n])
+                p += n
+            else:
+                v, p = read_varint(buf, p)
+                if k >> 3 == 2:
+                    t = v
+        yield channel, t, field_start, msg_end
+        pos = msg_end
+
+
+class RecordWriter:
+    """按 Cyber RecordFileWriter 的布局写出 record：Header(2048) + 各段 + Index"""
+
+    def __init__(self, path: str, src_header: Dict[str, int]):
+        self.f = open(path, "wb")
+        self.src_header = src_header
+        self.index: List[bytes] = []
+        self.stats = {"chunks": 0, "messages": 0, "begin": 0, "end": 0}
+        self.f.write(b"\0" * (SECTION.size + HEADER_LENGTH))
+
+    def _section(self, s_type: int, payload) -> int:
+        pos = self.f.tell()
+        self.f.write(SECTION.pack(s_type, len(payload)))
+        self.f.write(payload)
+        return pos
+
+    def write_channel(self, payload, cache: bytes):
+        pos = self._section(SECTION_CHANNEL, payload)
+        self._add_index(SECTION_CHANNEL, pos, 101, cache)
+
+    def write_chunk(self, header_payload, body_payload, count: int, begin: int, end: int, raw: int):
+        pos = self._section(SECTION_CHUNK_HEADER, header_payload)
+        cache = (
+            field_varint(1, count)
+            + field_varint(2, begin)
+            + field_varint(3, end)
+            + field_varint(4, raw)
+        )
+        self._add_index(SECTION_CHUNK_HEADER, pos, 102, cache)
+        pos = self._section(SECTION_CHUNK_BODY, body_payload)
+        self._add_index(SECTION_CHUNK_BODY, pos, 103, field_varint(1, count))
+        stats = self.stats
+        stats["chunks"] += 1
+        stats["messages"] += count
+        stats["begin"] = begin if not stats["begin"] else min(stats["begin"], begin)
+        stats["end"] = max(stats["end"], end)
+
+    def _add_index(self, s_type: int, pos: int, cache_no: int, cache: bytes):
+        entry = field_varint(1, s_type) + field_varint(2, pos) + field_bytes(cache_no, cache)
+        self.index.append(field_bytes(1, entry))
+
+    def close(self, channel_number: int):
+        index_pos = self._section(SECTION_INDEX, b"".join(self.index))
+        header = dict(self.src_header)
+        header.update(
+            {
+                "index_position": index_pos,
+                "chunk_number": self.stats["chunks"],
+                "channel_number": channel_number,
+                "begin_time": self.stats["begin"],
+                "end_time": self.stats["end"],
+                "message_number": self.stats["messages"],
+                "size": self.f.tell(),
+                "is_complete": 1,
+            }
+        )
+        payload = b"".join(
+            field_varint(_HEADER_NUMBERS[k], v) for k, v in header.items()
+        )
+        self.f.seek(0)
+        self.f.write(SECTION.pack(SECTION_HEADER, len(payload)))
+        self.f.write(payload)
+        self.f.close()
+
+
+def split_record(
+    src: str,
+    dest: str,
+    start_ns: Optional[int],
+    end_ns: Optional[int],
+    blacklist: Optional[Iterable[str]] = None,
+) -> Dict[str, int]:
+    """
+    按时间窗切片 record：
+    完全落在窗口内且不含黑名单频道的 chunk 原样拷贝，边界 chunk 逐条过滤消息。
+    遇到压缩或未正常关闭的文件抛出 ValueError，由调用方回退到 cyber_recorder split。
+    """
+    return split_record_multi(src, [(dest, start_ns, end_ns)], blacklist)[0]
+
+
+def split_record_multi(
+    src: str,
+    outputs: List[Tuple[str, Optional[int], Optional[int]]],
+    blacklist: Optional[Iterable[str]] = None,
+) -> List[Dict[str, int]]:
+    """
+    一次读取 src，同时切出多个时间窗 [(dest, start_ns, end_ns)]：
+    每个 chunk 只读取、解析一次，再分发给与之相交的各个输出，返回各输出的统计。
+    """
+    windows = [
+        (dest, start_ns or 0, end_ns or (1 << 64) - 1) for dest, start_ns, end_ns in outputs
+    ]
+    blocked = {ch.encode() for ch in (blacklist or [])}
+    with RecordReader(src) as reader:
+        if reader.header.get("compress", 0):
+            raise ValueError(f"{src}: 暂不支持压缩的 record")
+        mm = reader.mm
+        channel_entries = {}
+        chunks = []
+        for entry in reader.index:
+            if entry["type"] == SECTION_CHANNEL:
+                channel_entries[entry["cache"].get(2, b"")] = entry
+            elif entry["type"] == SECTION_CHUNK_HEADER:
+                chunks.append([entry, None])
+            elif entry["type"] == SECTION_CHUNK_BODY and chunks:
+                chunks[-1][1] = entry
+
+        counts: List[Dict[bytes, int]] = [{} for _ in windows]
+        stats = [{"copied_bytes": 0, "filtered_bytes": 0} for _ in windows]
+        writers: List[RecordWriter] = []
+        try:
+            for dest, _, _ in windows:
+                writers.append(RecordWriter(dest, reader.header))
+            for h_entry, b_entry in chunks:
+                cache = h_entry["cache"]
+                c_begin, c_end = cache.get(2, 0), cache.get(3, 0)
+                targets = [
+                    i
+                    for i, (_, start_ns, end_ns) in enumerate(windows)
+                    if not (c_end < start_ns or c_begin > end_ns)
+                ]
+                if b_entry is None or not targets:
+                    continue
+                _, b_start, b_size = reader.read_section(b_entry["position"])
+                messages = list(iter_messages(mm, b_start, b_start + b_size))
+                clean = not any(m[0] in blocked for m in messages)
+                for i in targets:
+                    _, start_ns, end_ns = windows[i]
+                    writer = writers[i]
+                    if clean and start_ns <= c_begin and c_end <= end_ns:
+                        # 整块落在窗口内：原样拷贝 chunk header 与 body
+                        _, h_start, h_size = reader.read_section(h_entry["position"])
+                        kept = messages
+                        with memoryview(mm) as view:
+                            writer.write_chunk(
+                                view[h_start : h_start + h_size],
+                                view[b_start : b_start + b_size],
+                                len(kept),
+                                c_begin,
+                                c_end,
+                                cache.get(4, 0),
+                            )
+                        stats[i]["copied_bytes"] += b_size
+                    else:
+                        kept = [
+                            m
+                            for m in messages
+                            if start_ns <= m[1] <= end_ns and m[0] not in blocked
+                        ]
+                        if not kept:
+                            continue
+                        body = b"".join(mm[s:e] for _, _, s, e in kept)
+                        k_begin = min(m[1] for m in kept)
+                        k_end = max(m[1] for m in kept)
+                        header_payload = (
+                            field_varint(1, k_begin)
+                            + field_varint(2, k_end)
+                            + field_varint(3, len(kept))
+                            + field_varint(4, len(body))
+                        )
+                        writer.write_chunk(
+                            header_payload, body, len(kept), k_begin, k_end, len(body)
+                        )
+                        stats[i]["filtered_bytes"] += len(body)
+                    for m in kept:
+                        counts[i][m[0]] = counts[i].get(m[0], 0) + 1
+            # 只保留实际有消息的频道，Channel 段原样拷贝
+            for writer, channel_counts in zip(writers, counts):
+                for name, count in sorted(channel_counts.items()):
+                    entry = channel_entries.get(name)
+                    if entry is None:
+                        continue
+                    _, c_start, c_size = reader.read_section(entry["position"])
+                    c_cache = entry["cache"]
+                    cache = (
+                        field_varint(1, count)
+                        + field_bytes(2, name)
+                        + field_bytes(3, c_cache.get(3, b""))
+                        + field_bytes(4, c_cache.get(4, b""))
+                    )
+                    writer.write_channel(mm[c_start : c_start + c_size], cache)
+                writer.close(len(channel_counts))
+        except Exception:
+            for writer in writers:
+                writer.f.close()
+            raise
+    for (dest, _, _), writer, stat in zip(windows, writers, stats):
+        stat.update(writer.stats)
+        logging.info(
+            f"[NATIVE_SPLIT] {src} -> {dest}: {stat['messages']} msgs, "
+            f"copied {stat['copied_bytes']}B, filtered {stat['filtered_bytes']}B"
+        )
+    return stats
@@ -1,7 +1,14 @@
-import subprocess
+import atexit
+import logging
+import shlex
 import os
+import threading
 from pathlib import Path
-from typing import Union
+from typing import List, Optional, Union
+from core.agent import AGENT_SERVER, AgentClient
+from core.process import ProcessExecutor
+from core.staging import StagingCache
+from core.trace import span
 from interface import ui
 
 
@@ -14,6 +21,13 @@ class DockerAdapter():
         self.setup_env = ctx.config["docker"]["setup_env"]
         self.host_mount = Path(ctx.config["docker"]["host_mount"]).resolve()
         self.docker_mount = Path(ctx.config["docker"]["docker_mount"])
+        self.use_agent = bool(ctx.config["docker"].get("agent", False))
+        self.agent_workers = int(ctx.config["docker"].get("agent_workers", 4))
+        self._agent = None
+        self._agent_lock = threading.Lock()
+        self.staging = StagingCache(ctx)
+        self.timeout = ctx.config["docker"].get("timeout") or None
+        self.process = ProcessExecutor.shared()
 
     def wrap_env(self, cmd: str) -> str:
         base_env = "export LANG=C.UTF-8 && export LC_ALL=C.UTF-8"
@@ -23,7 +37,12 @@ class DockerAdapter():
         if os.path.exists(path):
             os.remove(path)
 
-    def map_path(self, host_path: Union[str, Path]) -> str:
+    def map_path(self, host_path: Union[str, Path], stage: bool = False) -> str:
+        """
+        宿主机路径转为容器内路径，stage 为 True 时 NAS 上的输入文件先换成本地缓存副本
+        """
+        if stage:
+            host_path = self.staging.stage(host_path)
         try:
             h_path = Path(host_path).resolve()
             relative = h_path.relative_to(self.host_mount)
@@ -35,15 +54,53 @@ class DockerAdapter():
             )
             raise
 
-    def execute(self, cmd: str) -> str:
-        full_cmd = f"docker exec {self.container} /bin/bash -c '{self.wrap_env(cmd)}'"
-        result = subprocess.run(
-            full_cmd, shell=True, capture_output=True, text=True, check=True
-        )
-        return result.stdout
+    def agent_argv(self) -> List[str]:
+        """在容器内启动常驻代理：环境只 source 一次"""
+        server = shlex.quote(AGENT_SERVER.read_text(encoding="utf-8"))
+        inner = f"exec python3 -u -c {server} {self.agent_workers}"
+        return ["docker", "exec", "-i", self.container, "/bin/bash", "-c", self.wrap_env(inner)]
+
+    def _get_agent(self):
+        with self._agent_lock:
+            if self._agent is None or not self._agent.alive:
+                agent = AgentClient(self.agent_argv())
+                try:
+                    agent.start()
+                except Exception as e:
+                    logging.warning(f"[AGENT] 启动失败，回退到 docker exec: {e}")
+                    ui.print_status("任务代理启动失败，回退到逐条 docker exec", "WARN")
+                    self.use_agent = False
+                    return None
+                self._agent = agent
+                atexit.register(agent.close)
+            return self._agent
+
+    def execute(self, cmd: str, timeout: Optional[float] = None) -> str:
+        """
+        容器内执行命令，返回标准输出；timeout 默认取 docker.timeout
+        """
+        timeout = timeout or self.timeout
+        with span("docker.execute", cmd=cmd) as s:
+            stdout = self._execute(cmd, timeout)
+            s.update(exit_code=0, bytes_out=len(stdout))
+            return stdout
+
+    def _execute(self, cmd: str, timeout) -> str:
+        if self.use_agent:
+            agent = self._get_agent()
+            if agent:
+                return agent.execute(cmd, timeout)
+        argv = ["docker", "exec", self.container, "/bin/bash", "-c", self.wrap_env(cmd)]
+        return self.process.run(argv, timeout=timeout)
+
+    def cancel_all(self):
+        """Ctrl-C 中断并发切片时，结束所有线程中正在执行的容器命令（含代理中的）"""
+        self.process.cancel_all()
+        with self._agent_lock:
+            agent = self._agent
+        if agent:
+            agent.cancel_all()
 
     def execute_interactive(self, cmd: str):
-        play_cmd = (
-            f"docker exec -it {self.container} /bin/bash -c '{self.wrap_env(cmd)}'"
-        )
-        subprocess.run(play_cmd, shell=True, check=True)
+        argv = ["docker", "exec", "-it", self.container, "/bin/bash", "-c", self.wrap_env(cmd)]
+        self.process.run(argv, capture=False)
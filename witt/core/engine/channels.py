@@ -0,0 +1,52 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from utils import parser
+
+
+class ChannelService:
+    """
+    多个 record 的频道并集：同一 SOC、同一软件版本只取一个代表文件，并发获取 info。
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._versions: Dict[Path, str] = {}
+
+    def _version_key(self, record_dir: Path) -> str:
+        if record_dir not in self._versions:
+            contents = [
+                v.read_text(encoding="utf-8", errors="ignore")
+                for v in sorted(record_dir.glob("version*"))
+                if v.is_file()
+            ]
+            self._versions[record_dir] = "\n".join(contents)
+        return self._versions[record_dir]
+
+    def representatives(self, tasks: List[dict]) -> List[str]:
+        """每个 (soc, version) 组合挑一个文件"""
+        picked: Dict[Tuple[str, str], str] = {}
+        for t in tasks:
+            for p in t.get("paths", []):
+                key = (parser.soc_of(p), self._version_key(Path(p).parent))
+                picked.setdefault(key, p)
+        return list(picked.values())
+
+    def iter_union(self, tasks: List[dict]) -> Iterator[Tuple[int, int, List[dict]]]:
+        """
+        每完成一个文件产出一次 (已完成数, 总数, 当前并集)，用于显示解析进度；
+        最后一次产出的才是完整并集
+        """
+        paths = self.representatives(tasks)
+        workers = max(1, int(self.session.ctx.config.get("pipeline", {}).get("workers", 1)))
+        channels_map: Dict[str, dict] = {}
+        logging.info(f"[CHANNELS] {len(paths)} representative files: {paths}")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.session.recorder.get_info, p) for p in paths]
+            for done, future in enumerate(as_completed(futures), 1):
+                for ch in future.result().get("channels", []):
+                    merged = channels_map.setdefault(ch["name"], {"name": ch["name"], "count": 0})
+                    merged["count"] += ch.get("count", 0)
+                yield done, len(paths), sorted(channels_map.values(), key=lambda x: x["name"])
@@ -2,10 +2,16 @@ import logging
 import json
 import os
 import shutil
-from alive_progress import alive_bar
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from core.catalog import load_tag_entry, tag_signature
+from core.cyber.reader import RecordReader
+from core.engine.planner import makespan
+from core.engine.progress import SliceMonitor, slice_bar
+from core.trace import span
 from interface import ui
 from utils import parser
 
@@ -22,15 +28,105 @@ class RecordDownloader:
     def dest_root(self):
         return Path(self.ctx.config["host"]["dest_root"])
 
-    def _prepare_dir(self, target_dir: Path):
+    def _prepare_dir(self, target_dir: Path, keep: set):
         """
-        彻底清理目标目录，确保没有旧数据干扰
+        清理本次不再需要的旧切片，保留仍然有效的输出
         """
-        if target_dir.exists():
-            shutil.rmtree(target_dir)
         target_dir.mkdir(parents=True, exist_ok=True)
+        for f in target_dir.glob("*.split"):
+            if f.name not in keep:
+                f.unlink()
 
-    def save_contract(self, task, save_dir, file_infos):
+    @staticmethod
+    def _load_inputs(save_dir: Path) -> dict:
+        """读取 meta.json 中记录的上次切片输入"""
+        meta_path = save_dir.parent / "meta.json"
+        if not meta_path.exists():
+            return {}
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            return meta.get("inputs", {}).get(save_dir.name, {})
+        except Exception:
+            return {}
+
+    def _slice_window(self, task):
+        logic = self.ctx.config["logic"]
+        tag_dt = parser.str_to_time(task["time"])
+        t_start = tag_dt - timedelta(seconds=int(logic["before"]))
+        t_end = tag_dt + timedelta(seconds=int(logic["after"]))
+        return t_start, t_end
+
+    def _blacklist_unchanged(self, src: Path, old, new: list) -> bool:
+        """
+        黑名单变化时才读取源文件的频道：变化的频道都不在该文件中（如其他 SOC 的频道）则无需重切，
+        读取失败时按已变化处理
+        """
+        changed = set(old or []) ^ set(new)
+        if not changed:
+            return True
+        try:
+            names = {ch["name"] for ch in self.recorder.get_info(str(src))["channels"]}
+        except Exception as e:
+            logging.debug(f"[SLICE] {src} 频道读取失败，按黑名单变化处理: {e}")
+            return False
+        return not changed & names
+
+    def _slice_inputs(self, src: Path, task) -> dict:
+        """描述一个输出文件的全部输入，任何一项变化都需要重新切片"""
+        st = src.stat()
+        t_start, t_end = self._slice_window(task)
+        return {
+            "src": str(src),
+            "src_size": st.st_size,
+            "src_mtime": st.st_mtime_ns,
+            "start": t_start.isoformat(),
+            "end": t_end.isoformat(),
+            "blacklist": sorted(self.ctx.config["logic"].get("blacklist") or []),
+            "backend": self.backend,
+        }
+
+    def _record_span(self, src: Path):
+        """record 的起止时间：优先读 info 缓存，否则只解析文件头"""
+        info = self.recorder.info_cache.get(str(src))
+        if info:
+            return info["begin"], info["end"]
+        try:
+            with RecordReader(str(src)) as reader:
+                begin = reader.header.get("begin_time", 0)
+                end = reader.header.get("end_time", 0)
+        except (OSError, ValueError):
+            return None
+        if not begin or end <= begin:
+            return None
+        return datetime.fromtimestamp(begin / 1e9), datetime.fromtimestamp(end / 1e9)
+
+    def _window_bytes(self, src: Path, task) -> int:
+        """源文件大小 × 切片窗口覆盖的时间比例，用于按数据量估算进度"""
+        size = src.stat().st_size
+        record_span = self._record_span(src)
+        if not record_span:
+            return size
+        begin, end = record_span
+        t_start, t_end = self._slice_window(task)
+        duration = (end - begin).total_seconds()
+        if duration <= 0:
+            return size
+        overlap = (min(end, t_end) - max(begin, t_start)).total_seconds()
+        return int(size * min(1.0, max(0.0, overlap / duration)))
+
+    def _is_fresh(self, src: Path, dest: Path, inputs: dict, old: dict) -> bool:
+        """输入一致且输出文件未被改动时跳过切片"""
+        if not old or not dest.exists():
+            return False
+        st = dest.stat()
+        return (
+            all(old.get(k) == v for k, v in inputs.items() if k != "blacklist")
+            and old.get("out_size") == st.st_size
+            and old.get("out_mtime") == st.st_mtime_ns
+            and self._blacklist_unchanged(src, old.get("blacklist"), inputs["blacklist"])
+        )
+
+    def save_contract(self, task, save_dir, file_infos, inputs=None):
         """保存元数据，实现信息透传"""
         tag_dir = save_dir.parent
         meta_path = tag_dir / "meta.json"
@@ -52,25 +148,28 @@ class RecordDownloader:
             "date": self.ctx.target_date,
             "last_update": {},
             "files": {},
+            "inputs": {},
         }
         if meta_path.exists():
             try:
                 old_contract = json.loads(meta_path.read_text(encoding="utf-8"))
                 contract["last_update"] = old_contract["last_update"]
                 contract["files"] = old_contract["files"]
+                contract["inputs"] = old_contract.get("inputs", {})
             except Exception:
                 ui.print_status("元数据文件损坏，执行全量重写", "WARN")
         current_soc = file_infos[0][2]
         contract["files"][current_soc] = [Path(f[1]).name for f in file_infos]
+        contract["inputs"][current_soc] = inputs or {}
         contract["last_update"][current_soc] = datetime.now().strftime(
             "%Y-%m-%d %H:%M:%S"
         )
         meta_path.write_text(json.dumps(contract, indent=4, ensure_ascii=False))
 
-    def post_process_task(self, task, save_dir, file_infos):
+    def post_process_task(self, task, save_dir, file_infos, inputs=None):
         """生成元数据、README 和 version"""
         # 生成元数据文件
-        self.save_contract(task, save_dir, file_infos)
+        self.save_contract(task, save_dir, file_infos, inputs)
         # 同步 version
         src_dir = Path(file_infos[0][0]).parent
         for v_src in src_dir.glob("version*"):
@@ -82,7 +181,8 @@ class RecordDownloader:
                 ui.print_status(f"拷贝 {task['name']}: version 文件失败", "ERROR")
                 raise e
         # 生成 README
-        v_content = v_dest.read_text() if v_dest.exists() else "N/A"
+        v_files = sorted(save_dir.glob("version*"))
+        v_content = v_files[0].read_text() if v_files else "N/A"
         records_str = " ".join([Path(f[1]).name for f in file_infos])
         nas_path = save_dir.relative_to(Path(self.ctx.config["host"]["dest_root"]))
         before = int(self.ctx.config["logic"]["before"])
@@ -108,84 +208,212 @@ cyber_recorder play -s {play_start} -f {records_str}
 """
         readme_path = save_dir / "README.md"
         readme_path.write_text(readme_content, encoding="utf-8")
+        # 目录内文件都写完后再取签名登记，回放扫描时不会把刚下载的 tag 当作有变化
+        tag_dir = save_dir.parent
+        self.session.catalog.upsert(tag_dir, load_tag_entry(tag_dir), tag_signature(tag_dir))
         logging.info(f"[TASK_COMPLETE] Tag: {task['name']} | Saved to: {save_dir}")
         logging.info(f"  Files: {[Path(f[1]).name for f in file_infos]}")
 
-    def _sync_file(self, src, dest, task):
+    @staticmethod
+    def coalesce(download_queue) -> list:
+        """同一源文件的切片项合并为一个批次，多个 tag 窗口共用一次读取"""
+        batches = {}
+        for item in download_queue:
+            batches.setdefault(str(item["src"]), []).append(item)
+        return list(batches.values())
+
+    @property
+    def backend(self) -> str:
+        return self.ctx.config.get("recorder", {}).get("split_backend", "docker")
+
+    def _source_bytes(self, src: Path) -> int:
+        return src.stat().st_size
+
+    def run_batch(self, batch, upcoming=(), monitor=None) -> list:
         """
-        同步的核心逻辑：
-        1. 生成 .split 文件，全量覆盖
-        2. 清理中间文件
+        同步的核心逻辑：一次读取源文件，为批次内每个窗口生成 .split 文件，全量覆盖
+        upcoming 为队列中随后的源文件，后台预取到本地缓存；monitor 跟踪输出增长与吞吐量
+        返回每一项是否成功。耗时连同源文件/窗口字节数记入 slice.batch，供 planner 标定
         """
-        # 环境准备
-        logic = self.ctx.config["logic"]
-        tag_dt = parser.str_to_time(task["time"])
-        t_start = tag_dt - timedelta(seconds=int(logic["before"]))
-        t_end = tag_dt + timedelta(seconds=int(logic["after"]))
-        blacklist = logic.get("blacklist")
+        blacklist = self.ctx.config["logic"].get("blacklist") or []
+        src_bytes = batch[0]["src_bytes"]
+        with span(
+            "slice.batch",
+            file=str(batch[0]["src"]),
+            backend=self.backend,
+            outputs=len(batch),
+            blacklist=len(blacklist),
+            bytes_in=src_bytes,
+            window_bytes=min(src_bytes, sum(item["bytes"] for item in batch)),
+        ) as s:
+            results = self._run_batch(batch, upcoming, monitor)
+            s["exit_code"] = 0 if all(results) else 1
+            return results
+
+    def _run_batch(self, batch, upcoming, monitor) -> list:
+        self.session.executor.staging.prefetch(upcoming)
+        blacklist = self.ctx.config["logic"].get("blacklist")
         if blacklist:
             logging.info(f"[RECORDER_COMPRESS] Blacklist: {','.join(blacklist)}")
-        self.session.recorder.split(
-            host_in=src,
-            host_out=dest,
-            start_dt=t_start,
-            end_dt=t_end,
-            blacklist=blacklist,
-        )
+        src = batch[0]["src"]
+        if monitor:
+            watch = [item["dest"] for item in batch]
+            watch.append(self.recorder.superset_path(src, batch[0]["dest"]))
+            weight = min(batch[0]["src_bytes"], sum(item["bytes"] for item in batch))
+            monitor.start(src, watch, weight)
+        results = []
+        try:
+            results = self.session.recorder.split_many(
+                src,
+                [(item["dest"], *self._slice_window(item["task"])) for item in batch],
+                blacklist=blacklist,
+                backend=self.backend,
+            )
+            return results
+        finally:
+            if monitor:
+                monitor.finish(src, bool(results) and all(results))
+
+    def _finish_group(self, group):
+        with span(
+            "post_process", tag=group["task"]["name"], file=str(group["save_dir"])
+        ):
+            self.post_process_task(
+                group["task"], group["save_dir"], group["files"], group["inputs"]
+            )
 
-    def download_record(self, task_list):
+    def plan(self, task_list):
         """
-        负责高层调度和进度条
+        生成切片队列并清理过期输出，输入未变化的切片直接复用
+        返回 (待切片队列, 统计)
         """
         download_queue = []
-        prepared_dirs = set()
+        groups = {}
+        stats = {"total": 0, "sliced": 0, "skipped": 0, "failed": 0}
         for task in task_list:
             for soc_name, paths in task["soc_paths"].items():
                 if not paths:
                     continue
                 save_dir = self.ctx.get_task_dir(task["id"], task["name"], soc_name)
-                if save_dir not in prepared_dirs:
-                    self._prepare_dir(save_dir)
-                    prepared_dirs.add(save_dir)
-                save_dir.mkdir(parents=True, exist_ok=True)
+                if save_dir not in groups:
+                    groups[save_dir] = {
+                        "task": task,
+                        "save_dir": save_dir,
+                        "files": [],
+                        "pending": 0,
+                        "inputs": {},
+                        "old": self._load_inputs(save_dir),
+                    }
+                group = groups[save_dir]
                 for p in paths:
+                    src = Path(p)
+                    dest = save_dir / (src.name + ".split")
+                    group["files"].append((str(src), str(dest), soc_name))
+                    stats["total"] += 1
+                    try:
+                        inputs = self._slice_inputs(src, task)
+                        old = group["old"].get(dest.name)
+                        if self._is_fresh(src, dest, inputs, old):
+                            group["inputs"][dest.name] = dict(old, blacklist=inputs["blacklist"])
+                            stats["skipped"] += 1
+                            continue
+                        window_bytes = self._window_bytes(src, task)
+                        src_bytes = self._source_bytes(src)
+                    except OSError as e:
+                        # 源文件缺失或不可读只算这一个切片失败，不中断整个任务
+                        logging.warning(f"[SLICE] {src} 无法读取，跳过: {e}")
+                        stats["failed"] += 1
+                        continue
+                    group["pending"] += 1
                     download_queue.append(
                         {
-                            "src": Path(p),
-                            "dest": save_dir / (Path(p).name + ".split"),
+                            "src": src,
+                            "dest": dest,
                             "task": task,
-                            "save_dir": save_dir,
+                            "group": group,
                             "soc_name": soc_name,
+                            "inputs": inputs,
+                            "bytes": window_bytes,
+                            "src_bytes": src_bytes,
+                            "downloader": self,
                         }
                     )
-        if not download_queue:
+        for save_dir, group in groups.items():
+            self._prepare_dir(save_dir, {Path(f[1]).name for f in group["files"]})
+            if group["pending"] == 0:
+                self._finish_group(group)
+        return download_queue, stats
+
+    def complete(self, item, ok: bool, stats: dict):
+        """单个切片结束：记录输入签名，(task, soc) 全部完成后统一后处理"""
+        group = item["group"]
+        if ok and item["dest"].exists():
+            st = item["dest"].stat()
+            group["inputs"][item["dest"].name] = dict(
+                item["inputs"], out_size=st.st_size, out_mtime=st.st_mtime_ns
+            )
+            stats["sliced"] += 1
+        else:
+            stats["failed"] += 1
+        group["pending"] -= 1
+        if group["pending"] == 0:
+            self._finish_group(group)
+
+    def download_record(self, task_list) -> dict:
+        """
+        负责高层调度和进度条
+        返回统计: total / sliced / skipped / failed
+        """
+        download_queue, stats = self.plan(task_list)
+        if not stats["total"]:
             ui.print_status("下载队列为空", "WARN")
-            return
-        ui.print_status(f"准备同步 {len(download_queue)} 个 Record 片段...")
-        # 执行下载流水线
-        with alive_bar(
-            len(download_queue),
-            title="Progress",
-            theme="classic",
-            stats=False,
-            elapsed=False,
-        ) as bar:
-            processed_files = []
-            for i, item in enumerate(download_queue):
-                task = item["task"]
-                bar.text = f"-> [Tag: {task['name'][:15]}]"
-
-                self._sync_file(item["src"], item["dest"], task)
-                processed_files.append(
-                    (str(item["src"]), str(item["dest"]), item["soc_name"])
-                )
-
-                check_soc = (i == len(download_queue) - 1) or (
-                    download_queue[i + 1]["soc_name"] != item["soc_name"]
-                )
-                if check_soc:
-                    self.post_process_task(task, item["save_dir"], processed_files)
-                    processed_files = []
-                bar()
+            return stats
+        if stats["skipped"]:
+            ui.print_status(f"{stats['skipped']} 个片段输入未变化，跳过切片")
+        if not download_queue:
+            ui.print_status("所有片段均为最新！")
+            return stats
+        workers = max(1, int(self.ctx.config.get("pipeline", {}).get("workers", 1)))
+        planner = self.session.planner
+        batches = planner.order(self.coalesce(download_queue))
+        total_bytes = sum(item["bytes"] for item in download_queue)
+        predicted = makespan(map(planner.estimate_batch, batches), workers)
+        ui.print_status(
+            f"准备同步 {len(download_queue)} 个 Record 片段，"
+            f"涉及 {len(batches)} 个源文件，约 {total_bytes / 2**20:.0f} MB (并发 {workers})，"
+            f"预计 {predicted:.0f}s..."
+        )
+        t0 = time.perf_counter()
+        # 执行下载流水线：按源文件并发切片，同一 (task, soc) 的文件全部完成后统一后处理
+        with slice_bar(total_bytes) as bar, SliceMonitor(bar) as monitor, ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="slice"
+        ) as pool:
+            sources = [batch[0]["src"] for batch in batches]
+            futures = {
+                pool.submit(self.run_batch, batch, sources[i + workers :], monitor): batch
+                for i, batch in enumerate(batches)
+            }
+            try:
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        logging.error(f"[SLICE] {batch[0]['src']} 切片异常: {e}")
+                        results = [False] * len(batch)
+                    for item, ok in zip(batch, results):
+                        self.complete(item, ok, stats)
+                        bar(item["bytes"])
+            except KeyboardInterrupt:
+                # 丢弃排队中的批次，并结束正在执行的容器命令
+                for future in futures:
+                    future.cancel()
+                self.session.executor.cancel_all()
+                raise
 
+        ui.show_throughput(monitor.rows)
+        logging.info(
+            f"[PLANNER] predicted {predicted:.1f}s, actual {time.perf_counter() - t0:.1f}s"
+        )
         ui.print_status("所有同步任务已完成！")
+        return stats
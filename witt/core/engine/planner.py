@@ -0,0 +1,189 @@
+import heapq
+import json
+import logging
+import statistics
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils import parser
+
+MB = 2**20
+# 无历史数据时的默认模型：(固定开销 s, 读取吞吐 MB/s)
+DEFAULTS = {"native": (0.01, 200.0), "docker": (0.3, 80.0), "remote": (1.0, 40.0)}
+MIN_SAMPLES = 8
+
+
+def _solve(a: List[List[float]], b: List[float]) -> Optional[List[float]]:
+    """高斯消元（列主元）解 a·x = b，奇异时返回 None"""
+    n = len(b)
+    m = [row[:] + [b[i]] for i, row in enumerate(a)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) < 1e-9:
+            return None
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(col + 1, n):
+            f = m[r][col] / m[col][col]
+            for c in range(col, n + 1):
+                m[r][c] -= f * m[col][c]
+    x = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        x[r] = (m[r][n] - sum(m[r][c] * x[c] for c in range(r + 1, n))) / m[r][r]
+    return x
+
+
+def _fit(rows: List[List[float]], y: List[float]) -> Optional[List[float]]:
+    """最小二乘（正规方程），任一系数为负视为拟合失败"""
+    k = len(rows[0])
+    ata = [[sum(r[i] * r[j] for r in rows) for j in range(k)] for i in range(k)]
+    aty = [sum(r[i] * v for r, v in zip(rows, y)) for i in range(k)]
+    coef = _solve(ata, aty)
+    if coef is None or any(c < 0 for c in coef):
+        return None
+    return coef
+
+
+def makespan(costs: Iterable[float], workers: int) -> float:
+    """按给定顺序派发到 workers 个空闲最早的线程，返回总耗时"""
+    heap = [0.0] * max(1, workers)
+    for cost in costs:
+        heapq.heapreplace(heap, heap[0] + cost)
+    return max(heap)
+
+
+class SplitPlanner:
+    """
+    切片耗时模型：dur ≈ a + b·源文件MB + c·窗口MB + d·窗口MB·黑名单频道数，
+    按后端用历史日志中的 slice.batch 埋点标定，样本不足时退回默认吞吐；
+    用于执行前估算所选 tag 的耗时，并让并发切片按预计耗时从长到短派发
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.history = int(ctx.config.get("planner", {}).get("history", 50))
+        self._models: Optional[Dict[str, List[float]]] = None
+        self.samples: Dict[str, int] = {}
+
+    def _trace_files(self) -> List[Path]:
+        root = Path(self.ctx.config["host"]["dest_root"])
+        files = list(root.glob("*/*/.witt/log/trace_*.jsonl"))
+        files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        return files[: self.history]
+
+    def _load_samples(self) -> Dict[str, list]:
+        samples: Dict[str, list] = {}
+        for path in self._trace_files():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        s = json.loads(line)
+                        if s.get("name") != "slice.batch" or "error" in s or s.get("exit_code"):
+                            continue
+                        row = (s["bytes_in"] / MB, s["window_bytes"] / MB, s.get("blacklist", 0))
+                        samples.setdefault(s.get("backend", ""), []).append(row + (s["dur"],))
+            except (OSError, ValueError, KeyError) as e:
+                logging.debug(f"[PLANNER] 跳过 {path}: {e}")
+        return samples
+
+    def _calibrate(self) -> Dict[str, List[float]]:
+        if self._models is None:
+            self._models = {}
+            for backend, rows in self._load_samples().items():
+                self.samples[backend] = len(rows)
+                if len(rows) < MIN_SAMPLES:
+                    continue
+                y = [r[3] for r in rows]
+                coef = _fit([[1.0, s, w, w * n] for s, w, n, _ in rows], y)
+                if coef is None:
+                    # 窗口与源文件大小共线（如车端切片）时只按源文件大小拟合
+                    coef = _fit([[1.0, s] for s, _, _, _ in rows], y)
+                    coef = coef and coef + [0.0, 0.0]
+                if coef:
+                    self._models[backend] = coef
+            logging.info(f"[PLANNER] calibrated {self._models} from samples {self.samples}")
+        return self._models
+
+    def model(self, backend: str) -> List[float]:
+        coef = self._calibrate().get(backend)
+        if coef:
+            return coef
+        overhead, mbps = DEFAULTS.get(backend, DEFAULTS["docker"])
+        return [overhead, 1.0 / mbps, 0.0, 0.0]
+
+    def estimate(self, backend: str, src_bytes: int, window_bytes: int, blacklist: int) -> float:
+        a, b, c, d = self.model(backend)
+        s, w = src_bytes / MB, min(src_bytes, window_bytes) / MB
+        return a + b * s + c * w + d * w * blacklist
+
+    def _blacklist(self) -> int:
+        return len(self.ctx.config["logic"].get("blacklist") or [])
+
+    def estimate_batch(self, batch: list) -> float:
+        """一个批次（同一源文件的全部窗口）的预计耗时"""
+        src_bytes = batch[0]["src_bytes"]
+        return self.estimate(
+            batch[0]["downloader"].backend,
+            src_bytes,
+            sum(item["bytes"] for item in batch),
+            self._blacklist(),
+        )
+
+    def order(self, batches: list) -> list:
+        """最长优先（LPT）：大批次先派发，避免末尾单个大文件拖长总耗时"""
+        return sorted(batches, key=self.estimate_batch, reverse=True)
+
+    @property
+    def workers(self) -> int:
+        return max(1, int(self.ctx.config.get("pipeline", {}).get("workers", 1)))
+
+    def describe(self, tasks: list, backend: str) -> str:
+        """
+        只用 manifest 中的文件大小与起始时间估算所选任务，不读取 record：
+        record 时长取同一 SOC 相邻文件的起始时间差，窗口占比折算切片数据量
+        """
+        logic = self.ctx.config["logic"]
+        before, after = int(logic["before"]), int(logic["after"])
+        sources: Dict[str, List[int]] = {}
+        unknown = 0
+        for task in tasks:
+            tag = parser.str_to_time(task["time"])
+            tag_sec = tag.hour * 3600 + tag.minute * 60 + tag.second
+            w_start, w_end = tag_sec - before, tag_sec + after
+            for files in task["files"].values():
+                starts = sorted(f["start"] for f in files if f.get("start") is not None)
+                gaps = [b - a for a, b in zip(starts, starts[1:]) if b > a]
+                span_default = statistics.median(gaps) if gaps else 60
+                for f in files:
+                    size, start = f.get("size"), f.get("start")
+                    if size is None:
+                        unknown += 1
+                        continue
+                    entry = sources.setdefault(f["path"], [size, 0])
+                    if start is None:
+                        entry[1] = size
+                        continue
+                    later = [s for s in starts if s > start]
+                    duration = (later[0] - start) if later else span_default
+                    overlap = min(start + duration, w_end) - max(start, w_start)
+                    entry[1] += int(size * min(1.0, max(0.0, overlap / duration)))
+        if not sources:
+            return ""
+        n = self._blacklist()
+        costs = sorted(
+            (self.estimate(backend, size, window, n) for size, window in sources.values()),
+            reverse=True,
+        )
+        total_in = sum(size for size, _ in sources.values())
+        total_out = sum(min(size, window) for size, window in sources.values())
+        wall = makespan(costs, self.workers)
+        if backend in self._calibrate():
+            basis = f"{self.samples[backend]} 条历史记录"
+        else:
+            basis = "默认吞吐"
+        msg = (
+            f"预计读取 {len(sources)} 个源文件 {total_in / MB:.0f} MB，切出约 {total_out / MB:.0f} MB，"
+            f"耗时约 {wall:.0f}s (并发 {self.workers}，{backend} 后端，基于 {basis})"
+        )
+        if unknown:
+            msg += f"，另有 {unknown} 个文件大小未知"
+        return msg
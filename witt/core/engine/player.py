@@ -1,7 +1,10 @@
-import json
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any
+from core.catalog import load_tag_entry, tag_signature
+from core.envstate import find_version_file
+from core.trace import span
 from interface import ui, workflow
 
 
@@ -11,69 +14,46 @@ class RecordPlayer:
         self.ctx = session.ctx
         self.executor = session.executor
 
-    @property
-    def library_file(self):
-        return self.ctx.work_dir / ".witt" / "local_library.json"
-
     def get_library(self) -> List[Dict[str, Any]]:
-        fp = self.ctx.get_library_fingerprint()
-        if self.library_file.exists():
-            data = json.loads(self.library_file.read_text(encoding="utf-8"))
-            if data.get("fingerprint") == fp and data.get("library"):
-                ui.print_status(f"本地库状态未变，加载缓存: {self.library_file}...")
-                return data.get("library", [])
-        ui.print_status(f"正在扫描本地库{self.ctx.work_dir}...")
-        library_list = self.scan_local_library()
-        save_obj = {"fingerprint": fp, "library": library_list}
-        try:
-            self.library_file.parent.mkdir(parents=True, exist_ok=True)
-            self.library_file.write_text(
-                json.dumps(save_obj, indent=4, ensure_ascii=False)
-            )
-        except Exception as e:
-            ui.print_status("缓存文件写入失败", "ERROR")
-            raise e
-        return library_list
+        """同步当前工作目录的变化到目录库，再按车辆/日期查询"""
+        self.scan_local_library()
+        return self.session.catalog.query(
+            vehicle=self.ctx.vehicle, date=self.ctx.target_date
+        )
+
+    def scan_local_library(self) -> bool:
+        """增量扫描：只重新解析签名发生变化的 tag 目录，返回是否有变化"""
+        with span("library.scan", file=str(self.ctx.work_dir)) as s:
+            changed = self._scan_local_library()
+            s["changed"] = changed
+            return changed
 
-    def scan_local_library(self) -> List[Dict[str, Any]]:
-        library_map = {}
-        for meta_file in self.ctx.work_dir.rglob("meta.json"):
-            tag_dir = meta_file.parent
-            try:
-                meta = json.loads(meta_file.read_text(encoding="utf-8"))
-                tag_name = meta["tag_info"]["name"]
-                tag_entry = {
-                    "tag": tag_name,
-                    "time": meta["tag_info"]["time"],
-                    "vehicle": meta.get("vehicle", tag_dir.parent.name),
-                    "date": meta.get("date", tag_dir.parents[1].name),
-                    "socs": {},
-                    "last_update": meta.get("last_update"),
-                }
-                for soc_name, file_names in meta.get("files", {}).items():
-                    soc_path = tag_dir / soc_name
-                    if not soc_path.exists():
-                        continue
-                    record_details = []
-                    for fname in file_names:
-                        f_abs_path = soc_path / fname
-                        if f_abs_path.exists():
-                            record_details.append(
-                                {
-                                    "path": str(f_abs_path.absolute()),
-                                    "begin": meta["tag_info"]["abs_start"],
-                                    "duration": meta["tag_info"]["offset_bf"]
-                                    + meta["tag_info"]["offset_af"],
-                                }
-                            )
-                    if record_details:
-                        record_details.sort(key=lambda x: x["begin"])
-                        tag_entry["socs"][soc_name] = record_details
-                library_map[str(tag_dir)] = tag_entry
-            except Exception as e:
-                ui.print_status(f"[{meta_file}] 元数据解析失败...", "ERROR")
-                raise e
-        return sorted(list(library_map.values()), key=lambda x: x["time"])
+    def _scan_local_library(self) -> bool:
+        catalog = self.session.catalog
+        work_dir = self.ctx.work_dir
+        known = catalog.signatures(work_dir)
+        seen = set()
+        changed = 0
+        if work_dir.exists():
+            with os.scandir(work_dir) as it:
+                tag_dirs = [Path(de.path) for de in it if de.is_dir() and de.name != ".witt"]
+            for tag_dir in tag_dirs:
+                sig = tag_signature(tag_dir)
+                if sig is None:
+                    continue
+                seen.add(str(tag_dir))
+                if known.get(str(tag_dir)) == sig:
+                    continue
+                catalog.upsert(tag_dir, load_tag_entry(tag_dir), sig)
+                changed += 1
+        removed = [d for d in known if d not in seen]
+        if removed:
+            catalog.remove(removed)
+        if changed or removed:
+            ui.print_status(f"本地库有更新，已增量扫描 {work_dir}")
+        else:
+            ui.print_status("本地库状态未变，加载目录缓存...")
+        return bool(changed or removed)
 
     def play(
         self,
@@ -88,9 +68,13 @@ class RecordPlayer:
             return datetime.fromisoformat(val) if isinstance(val, str) else val
         global_start = ensure_dt(records[0]["begin"])
         total_duration = max(r["duration"] for r in records)
-        self.ctx.config["logic"]["version"] = Path(records[0]["path"]).parent
+        version_file = find_version_file(Path(records[0]["path"]).parent)
+        self.ctx.config["logic"]["version"] = str(version_file or "")
         # 构造指令
-        docker_paths = [self.executor.map_path(r["path"]) for r in records]
+        # 已缓存到本地的文件读副本，其余直接从 NAS 播放，不等拷贝；后台预取供下次回放使用
+        staging = self.executor.staging
+        docker_paths = [self.executor.map_path(staging.cached(r["path"])) for r in records]
+        staging.prefetch(r["path"] for r in records)
         cmd_parts = ["cyber_recorder play", "-l", "-f", " ".join(docker_paths)]
         # 时间窗
         fmt = "%Y-%m-%d %H:%M:%S"
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from alive_progress import alive_bar
+
+
+def slice_bar(total_bytes: Optional[int]):
+    """按字节计量的切片进度条，ETA 与速率按源数据量估算；total_bytes 为 None 时总量未知，只显示速率"""
+    return alive_bar(
+        None if total_bytes is None else max(1, int(total_bytes)),
+        title="Progress",
+        theme="classic",
+        unit="B",
+        scale="IEC",
+        precision=1,
+        stats="(ETA: {eta}, {rate})",
+        elapsed=False,
+        # 边检索边切片时检索结果会打印在进度条上方，不加 "on N:" 前缀
+        enrich_print=False,
+    )
+
+
+class SliceMonitor:
+    """
+    跟踪正在执行的切片：后台轮询输出文件增长，实时显示各 worker 的 MB/s；
+    结束时按源文件记录吞吐量，用于运行后的汇总表。
+    """
+
+    def __init__(self, bar, interval: float = 0.5):
+        self.bar = bar
+        self.interval = interval
+        self.rows: List[Dict] = []
+        self._active: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @staticmethod
+    def _written(paths) -> int:
+        total = 0
+        for p in paths:
+            try:
+                total += os.path.getsize(p)
+            except OSError:
+                pass
+        return total
+
+    def start(self, src, watch, weight: int):
+        with self._lock:
+            self._active[str(src)] = {
+                "src": str(src),
+                "watch": [str(p) for p in watch],
+                "weight": weight,
+                "worker": threading.current_thread().name.rsplit("_", 1)[-1],
+                "t0": time.perf_counter(),
+                "last": 0,
+                "rate": 0.0,
+            }
+
+    def finish(self, src, ok: bool):
+        with self._lock:
+            entry = self._active.pop(str(src), None)
+        if entry is None:
+            return
+        seconds = time.perf_counter() - entry["t0"]
+        self.rows.append(
+            {
+                "src": entry["src"],
+                "dir": str(Path(entry["src"]).parent),
+                "bytes": entry["weight"],
+                "out_bytes": self._written(entry["watch"]),
+                "seconds": seconds,
+                "mbps": entry["weight"] / 2**20 / seconds if seconds else 0.0,
+                "ok": ok,
+            }
+        )
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                entries = list(self._active.values())
+            parts = []
+            for e in entries:
+                written = self._written(e["watch"])
+                e["rate"] = max(0, written - e["last"]) / self.interval / 2**20
+                e["last"] = written
+                parts.append(f"w{e['worker']} {e['rate']:.1f}MB/s")
+            if parts:
+                self.bar.text = "-> " + " | ".join(parts)
@@ -1,22 +1,54 @@
 import logging
+import os
+import shlex
+from datetime import datetime
 from utils import parser
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
+from core.cache import InfoCache
+from core.cyber.reader import read_record_info
+from core.cyber.splitter import split_record, split_record_multi
+from core.trace import span
 from interface import ui
 
 
+def _ns(dt: Optional[datetime]) -> Optional[int]:
+    """与 cyber_recorder 一致，按秒精度换算为纳秒时间戳"""
+    return int(dt.timestamp()) * 10**9 if dt else None
+
+
 class Recorder:
     def __init__(self, session):
         self.session = session
+        self.info_cache = InfoCache(session.ctx)
 
     def get_info(self, docker_path: str) -> Dict[str, Any]:
         """
-        获取 record 的时间、时长、排序后的频道列表
+        获取 record 的时间、时长、排序后的频道列表，已解析过的文件直接读缓存
         """
+        with span("recorder.info", file=str(docker_path)) as s:
+            cached = self.info_cache.get(docker_path)
+            s["cache_hit"] = bool(cached)
+            return cached or self._get_info(docker_path)
+
+    def _get_info(self, docker_path: str) -> Dict[str, Any]:
+        if self.session.ctx.config.get("recorder", {}).get("info_backend") == "native":
+            try:
+                # info 只读文件头与索引，不为此整文件拷贝
+                info = read_record_info(str(self.session.executor.staging.cached(docker_path)))
+                self.info_cache.put(docker_path, info)
+                return info
+            except (OSError, ValueError) as e:
+                logging.debug(f"{docker_path} 本地解析失败，改用 cyber_recorder: {e}")
         try:
-            stdout = self.session.executor.execute(f"cyber_recorder info {docker_path}")
-            return parser.parse_record_info(stdout)
+            stdout = self.session.executor.execute(
+                "cyber_recorder info "
+                + self.session.executor.map_path(self.session.executor.staging.cached(docker_path))
+            )
+            info = parser.parse_record_info(stdout)
+            self.info_cache.put(docker_path, info)
+            return info
         except Exception as e:
             ui.print_status(f"{docker_path} 异常，解析元数据失败", "ERROR")
             raise e
@@ -25,29 +57,133 @@ class Recorder:
         self,
         host_in: str,
         host_out: Optional[str],
-        start_dt: Optional[str],
-        end_dt: Optional[str],
+        start_dt: Optional[datetime],
+        end_dt: Optional[datetime],
         blacklist: Optional[List[str]] = None,
-    ):
+        backend: str = "docker",
+    ) -> bool:
         """
-        执行 record 切片
+        执行 record 切片，backend 为 native 时在本地直接切片，不支持的文件回退到容器
+        返回是否切片成功
         """
-        logging.info(f"[RECORDER_SLICE] File: {Path(host_in).name}")
-        logging.info(f"  Range: {start_dt} -> {end_dt}")
+        with span("recorder.split", file=str(host_in), backend=backend) as s:
+            s["bytes_in"] = os.path.getsize(host_in) if os.path.exists(host_in) else None
+            ok = self._split(host_in, host_out, start_dt, end_dt, blacklist, backend)
+            if ok and host_out and os.path.exists(host_out):
+                s["bytes_out"] = os.path.getsize(host_out)
+            s["exit_code"] = 0 if ok else 1
+            return ok
 
-        cmd_parts = ["cyber_recorder split", f"-f {host_in}"]
-        cmd_parts.append(f'-o "{host_out}"')
+    def split_many(
+        self,
+        host_in: str,
+        outputs: List[Tuple[str, datetime, datetime]],
+        blacklist: Optional[List[str]] = None,
+        backend: str = "docker",
+    ) -> List[bool]:
+        """
+        同一源文件的多个时间窗只读一遍：
+        native 直接一次遍历切出所有输出；docker 先在容器内切出覆盖全部窗口的超集，
+        再在本地从超集切出各窗口。返回每个输出是否成功
+        """
+        if len(outputs) == 1:
+            return [self.split(host_in, *outputs[0], blacklist, backend)]
+        with span(
+            "recorder.split_many", file=str(host_in), backend=backend, outputs=len(outputs)
+        ) as s:
+            s["bytes_in"] = os.path.getsize(host_in) if os.path.exists(host_in) else None
+            results = self._split_many(host_in, outputs, blacklist, backend)
+            s["bytes_out"] = sum(
+                os.path.getsize(o[0]) for o, ok in zip(outputs, results) if ok and os.path.exists(o[0])
+            )
+            s["exit_code"] = 0 if all(results) else 1
+            return results
+
+    @staticmethod
+    def split_command(path_in, path_out, start_dt, end_dt, blacklist=None) -> str:
+        """拼接 cyber_recorder split 命令，路径为命令执行端（容器或车端）可见的路径"""
+        cmd_parts = ["cyber_recorder split", f"-f {shlex.quote(str(path_in))}"]
+        cmd_parts.append(f"-o {shlex.quote(str(path_out))}")
         if start_dt:
             cmd_parts.append(f'-b "{parser.time_to_str(start_dt)}"')
         if end_dt:
             cmd_parts.append(f'-e "{parser.time_to_str(end_dt)}"')
         if blacklist:
             for ch in blacklist:
-                cmd_parts.append(f"-k {ch}")
-        split_cmd = " ".join(cmd_parts)
+                cmd_parts.append(f"-k {shlex.quote(ch)}")
+        return " ".join(cmd_parts)
+
+    @staticmethod
+    def superset_path(host_in, first_dest) -> Path:
+        """docker 多窗口切片的中间超集，放在第一个输出旁边，保证容器可写、宿主机可读"""
+        return Path(first_dest).parent / f".{Path(host_in).name}.superset"
+
+    def _split_many(self, host_in, outputs, blacklist, backend) -> List[bool]:
+        logging.info(f"[RECORDER_SLICE] File: {Path(host_in).name} x {len(outputs)} windows")
+        windows = [(str(dest), _ns(start), _ns(end)) for dest, start, end in outputs]
+        if backend == "native":
+            try:
+                local = self.session.executor.staging.stage(host_in)
+                with span("native.split", file=str(host_in)):
+                    split_record_multi(str(local), windows, blacklist)
+                return [True] * len(outputs)
+            except (OSError, ValueError) as e:
+                logging.debug(f"{host_in} 本地切片失败，改用 cyber_recorder: {e}")
+
+        superset = self.superset_path(host_in, outputs[0][0])
+        starts = [o[1] for o in outputs]
+        ends = [o[2] for o in outputs]
+        try:
+            if not self._split(
+                host_in,
+                str(superset),
+                None if None in starts else min(starts),
+                None if None in ends else max(ends),
+                blacklist,
+                "docker",
+            ):
+                return [False] * len(outputs)
+            try:
+                with span("native.subcut", file=str(superset)):
+                    split_record_multi(str(superset), windows)
+                return [True] * len(outputs)
+            except (OSError, ValueError) as e:
+                logging.debug(f"{superset} 本地二次切片失败，逐个窗口切片: {e}")
+            return [
+                self._split(host_in, dest, start, end, blacklist, "docker")
+                for dest, start, end in outputs
+            ]
+        finally:
+            if superset.exists():
+                superset.unlink()
 
+    def _split(self, host_in, host_out, start_dt, end_dt, blacklist, backend) -> bool:
+        logging.info(f"[RECORDER_SLICE] File: {Path(host_in).name}")
+        logging.info(f"  Range: {start_dt} -> {end_dt}")
+        if backend == "native":
+            try:
+                local = self.session.executor.staging.stage(host_in)
+                with span("native.split", file=str(host_in)):
+                    split_record(
+                        str(local), str(host_out), _ns(start_dt), _ns(end_dt), blacklist
+                    )
+                return True
+            except (OSError, ValueError) as e:
+                logging.debug(f"{host_in} 本地切片失败，改用 cyber_recorder: {e}")
+
+        executor = self.session.executor
+        try:
+            path_in = executor.map_path(host_in, stage=True)
+            path_out = executor.map_path(host_out)
+        except (OSError, ValueError) as e:
+            # 路径不在容器挂载目录下，map_path 已提示
+            logging.debug(f"{host_in} 路径映射失败: {e}")
+            return False
+        split_cmd = self.split_command(path_in, path_out, start_dt, end_dt, blacklist)
         try:
-            self.session.executor.execute(split_cmd)
+            executor.execute(split_cmd)
+            return True
         except Exception as e:
             ui.print_status(f"文件损坏(已跳过): {host_in}", "WARN")
             logging.debug(f"{host_in} 文件损坏: {e}")
+            return False
@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import os
+import re
+import shlex
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.engine.dowloader import RecordDownloader
+from core.transport import Transport, make_transport
+from interface import ui
+from utils.tags import parse_tag_text
+
+_RE_TAIL_HEADER = re.compile(r"^==> (.+) <==$", re.M)
+
+
+def split_label(label) -> Tuple[str, str]:
+    """soc1:/mdrive_data/bag/x.record -> ("soc1", "/mdrive_data/bag/x.record")"""
+    soc, _, path = str(label).partition(":")
+    return soc, path
+
+
+class RemoteSlicer(RecordDownloader):
+    """
+    车端切片：在 SOC 上检索 tag 并执行 cyber_recorder split，只把切出的片段传回本地。
+    record 路径记为 "soc1:/mdrive_data/bag/..."，切片规划、增量跳过、后处理与本地切片共用
+    """
+
+    def __init__(self, session):
+        super().__init__(session)
+        remote = self.ctx.config["remote"]
+        self.hosts: Dict[str, str] = remote.get("hosts") or {"soc1": remote["ip"]}
+        self.setup_env = remote.get("setup_env") or ""
+        self.tmp_dir = str(remote.get("tmp_dir") or "/tmp/witt_slices").rstrip("/")
+        self.timeout = self.ctx.config["docker"].get("timeout") or None
+        self._transports: Dict[str, Transport] = {}
+        # 检索时记录的车端文件 (大小, mtime_ns) 与各目录下的 version 文件
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._versions: Dict[str, List[str]] = {}
+        self._version_lock = threading.Lock()
+
+    def transport(self, soc: str) -> Transport:
+        if soc not in self._transports:
+            self._transports[soc] = make_transport(self.ctx, soc, self.hosts[soc])
+        return self._transports[soc]
+
+    def close(self):
+        """结束各车端的复用连接（ssh ControlMaster），之后再用会重新建立"""
+        transports, self._transports = self._transports, {}
+        for transport in transports.values():
+            transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _wrap(self, cmd: str) -> str:
+        if not self.setup_env:
+            return cmd
+        return f"source {shlex.quote(self.setup_env)} >/dev/null 2>&1; {cmd}"
+
+    def _list(self, soc: str, data: Dict):
+        """一次 find 列出当天的 record / tag / version，再一次读回全部 tag 内容"""
+        transport = self.transport(soc)
+        date = self.ctx.target_date
+        stdout = transport.run(
+            f"find {shlex.quote(transport.data_root)} -type f "
+            f"\\( -name '{date}*record*' -o -name 'tag_{date}*.pb.txt' -o -name 'version*' \\) "
+            "-printf '%s %T@ %p\\n'",
+            timeout=self.timeout,
+        )
+        tag_files = []
+        for line in stdout.splitlines():
+            parts = line.split(" ", 2)
+            if len(parts) != 3:
+                continue
+            size, mtime, path = parts
+            directory, name = os.path.split(path)
+            label_dir = f"{soc}:{directory}"
+            if name.startswith("version"):
+                self._versions.setdefault(label_dir, []).append(name)
+                continue
+            entry = data["dirs"].setdefault(label_dir, {"dirs": [], "records": [], "tags": []})
+            if not self.session.index.add_file(entry, name):
+                continue
+            self._stats[f"{label_dir}/{name}"] = (int(size), int(float(mtime) * 1e9))
+            if name.startswith("tag_"):
+                tag_files.append(path)
+        if not tag_files:
+            return
+        stdout = transport.run(
+            "tail -v -n +1 -- " + " ".join(shlex.quote(p) for p in tag_files),
+            timeout=self.timeout,
+        )
+        chunks = _RE_TAIL_HEADER.split(stdout)
+        for path, content in zip(chunks[1::2], chunks[2::2]):
+            data["tags"][f"{soc}:{path}"] = {"sig": None, "entries": parse_tag_text(content)}
+
+    def search(self, manifest_path: Optional[Path] = None):
+        """在各 SOC 上检索当天的 tag 与 record，生成与本地检索相同格式的 manifest"""
+        manifest_path = manifest_path or self.ctx.manifest_path
+        soc_filter = str(self.ctx.config["logic"]["soc"])
+        data = {"dirs": {}, "tags": {}}
+        for soc in self.hosts:
+            if soc_filter not in soc:
+                continue
+            transport = self.transport(soc)
+            ui.print_status(f"车端模式 ({transport.name}): {soc} {self.hosts[soc]}:{transport.data_root}")
+            try:
+                self._list(soc, data)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+                ui.print_status(f"{soc} 检索失败，已跳过", "WARN")
+                logging.warning(f"[REMOTE] {soc} 检索失败: {e}")
+        sizes = {label: size for label, (size, _) in self._stats.items()}
+        return self.session.index.publish(data, "车端", manifest_path, sizes)
+
+    def _slice_inputs(self, src: Path, task) -> dict:
+        size, mtime = self._stats.get(str(src), (None, None))
+        t_start, t_end = self._slice_window(task)
+        return {
+            "src": str(src),
+            "src_size": size,
+            "src_mtime": mtime,
+            "start": t_start.isoformat(),
+            "end": t_end.isoformat(),
+            "blacklist": sorted(self.ctx.config["logic"].get("blacklist") or []),
+            "backend": self.backend,
+        }
+
+    def _window_bytes(self, src: Path, task) -> int:
+        return self._stats.get(str(src), (0, 0))[0]
+
+    def _remote_out(self, dest: Path) -> str:
+        """车端临时输出名，按本地目标路径区分，重试时可复用已切好的片段"""
+        digest = hashlib.sha1(str(dest).encode("utf-8")).hexdigest()[:12]
+        return f"{self.tmp_dir}/{digest}_{dest.name}"
+
+    def _split_remote(self, transport: Transport, path: str, batch) -> List[bool]:
+        """同一源文件的全部窗口在一条命令中切完，逐个窗口回报成功与否"""
+        blacklist = self.ctx.config["logic"].get("blacklist")
+        steps = [f"mkdir -p {shlex.quote(self.tmp_dir)}"]
+        for item in batch:
+            out = self._remote_out(item["dest"])
+            split = self.recorder.split_command(
+                path, f"{out}.tmp", *self._slice_window(item["task"]), blacklist
+            )
+            q_out, q_tmp = shlex.quote(out), shlex.quote(f"{out}.tmp")
+            steps.append(
+                f"if [ -s {q_out} ] || {{ {split} >/dev/null && mv {q_tmp} {q_out}; }}; "
+                f"then echo OK {q_out}; else rm -f {q_tmp}; echo FAIL {q_out}; fi"
+            )
+        try:
+            stdout = transport.run(self._wrap("; ".join(steps)), timeout=self.timeout)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logging.debug(f"[REMOTE] {path} 车端切片失败: {e}")
+            return [False] * len(batch)
+        done = {line[3:] for line in stdout.splitlines() if line.startswith("OK ")}
+        return [self._remote_out(item["dest"]) in done for item in batch]
+
+    def _fetch_versions(self, transport: Transport, src_dir: str, save_dir: Path):
+        _, directory = split_label(src_dir)
+        with self._version_lock:
+            for name in self._versions.get(src_dir, []):
+                if not (save_dir / name).exists():
+                    transport.fetch(f"{directory}/{name}", save_dir / name)
+
+    @property
+    def backend(self) -> str:
+        return "remote"
+
+    def _source_bytes(self, src: Path) -> int:
+        return self._stats.get(str(src), (0, 0))[0]
+
+    def _run_batch(self, batch, upcoming, monitor) -> list:
+        """车端切出批次内全部窗口，逐个续传回本地后删除车端临时文件"""
+        src = batch[0]["src"]
+        soc, path = split_label(src)
+        transport = self.transport(soc)
+        logging.info(f"[REMOTE_SLICE] {soc} File: {Path(path).name} x {len(batch)} windows")
+        if monitor:
+            watch = [p for item in batch for p in (item["dest"], f"{item['dest']}.part")]
+            monitor.start(src, watch, sum(item["bytes"] for item in batch))
+        results = []
+        try:
+            results = self._split_remote(transport, path, batch)
+            fetched = []
+            for i, item in enumerate(batch):
+                if not results[i]:
+                    ui.print_status(f"车端切片失败(已跳过): {src}", "WARN")
+                    continue
+                out = self._remote_out(item["dest"])
+                try:
+                    transport.fetch(out, item["dest"])
+                    self._fetch_versions(transport, str(Path(src).parent), item["dest"].parent)
+                    fetched.append(out)
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+                    logging.warning(f"[REMOTE] 回传 {out} 失败，下次运行续传: {e}")
+                    results[i] = False
+            if fetched:
+                try:
+                    transport.run(
+                        "rm -f -- " + " ".join(shlex.quote(p) for p in fetched),
+                        timeout=self.timeout,
+                    )
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                    logging.warning(f"[REMOTE] 清理车端临时文件失败: {e}")
+            return results
+        finally:
+            if monitor:
+                monitor.finish(src, bool(results) and all(results))
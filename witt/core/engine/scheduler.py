@@ -0,0 +1,217 @@
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from core.engine.progress import SliceMonitor, slice_bar
+from core.engine.remote import split_label
+from core.index import NoTagsError
+from interface import ui
+from utils import parser
+
+
+def expand_dates(start: str, end: str) -> List[str]:
+    """YYYYMMDD 闭区间展开为日期列表"""
+    day = datetime.strptime(start, "%Y%m%d")
+    last = datetime.strptime(end, "%Y%m%d")
+    dates = []
+    while day <= last:
+        dates.append(day.strftime("%Y%m%d"))
+        day += timedelta(days=1)
+    return dates
+
+
+def _count_tags(tasks, report: dict):
+    """边读 manifest 边规划，顺带统计有数据的 tag 数"""
+    for task in tasks:
+        if task["paths"]:
+            report["tags"] += 1
+            yield task
+
+
+class JobScheduler:
+    """
+    多车辆、多日期任务调度：逐个 (车辆, 日期) 检索，边读 manifest 边把完整的切片批次
+    交给一个全局线程池，并按存储源限制并发，避免单个 NAS 被打满。
+    remote 为 True 时在车端检索、切片，存储源即各 SOC。
+    """
+
+    def __init__(self, session, remote: bool = False):
+        self.session = session
+        self.remote = remote
+        conf = session.ctx.config.get("scheduler", {})
+        self.workers = max(1, int(session.ctx.config.get("pipeline", {}).get("workers", 1)))
+        self.per_source = max(1, int(conf.get("per_source", self.workers)))
+        self.source_limits: Dict[str, int] = {
+            str(k).rstrip("/"): int(v) for k, v in (conf.get("source_limits") or {}).items()
+        }
+        self._mounts: Dict[str, str] = {}
+        self._remotes: list = []
+
+    def source_of(self, path) -> str:
+        """文件所属存储源：优先匹配配置的前缀，否则取所在挂载点"""
+        path = str(path)
+        if self.remote:
+            return split_label(path)[0]
+        for prefix in sorted(self.source_limits, key=len, reverse=True):
+            if path == prefix or path.startswith(prefix + "/"):
+                return prefix
+        directory = os.path.dirname(path)
+        if directory not in self._mounts:
+            mount = os.path.realpath(directory)
+            while not os.path.ismount(mount):
+                mount = os.path.dirname(mount)
+            self._mounts[directory] = mount
+        return self._mounts[directory]
+
+    def limit_of(self, source: str) -> int:
+        return self.source_limits.get(source, self.per_source)
+
+    def plan(self, jobs: List[dict], reports: List[dict]) -> Iterator[list]:
+        """
+        逐个检索 (车辆, 日期)，边读 manifest 边规划，产出可立即派发的切片批次；
+        tag 按时间排列，某个源文件不再被后续 tag 引用时其批次即完整，多个 tag 仍共用一次读取。
+        reports 中追加每个任务的汇总
+        """
+        for job in jobs:
+            for date in expand_dates(str(job["start"]), str(job.get("end", job["start"]))):
+                sub = self.session.derive(job["vehicle"], date)
+                report = {"vehicle": job["vehicle"], "date": date, "status": "ok", "tags": 0}
+                report["files"] = {"total": 0, "sliced": 0, "skipped": 0, "failed": 0}
+                reports.append(report)
+                t0 = time.perf_counter()
+                downloader = sub.remote if self.remote else sub.downloader
+                if self.remote:
+                    self._remotes.append(downloader)
+                pending: Dict[str, list] = {}
+                try:
+                    (sub.remote if self.remote else sub.index).search()
+                    for task in _count_tags(parser.iter_manifest(sub.ctx.manifest_path), report):
+                        items, stats = downloader.plan([task])
+                        for key in ("total", "skipped", "failed"):
+                            report["files"][key] += stats[key]
+                        if stats["failed"]:
+                            report["status"] = "failed"
+                        current = {str(item["src"]) for item in items}
+                        ready = [pending.pop(src) for src in list(pending) if src not in current]
+                        for item in items:
+                            item["report"] = report
+                            pending.setdefault(str(item["src"]), []).append(item)
+                        if ready:
+                            yield ready
+                except NoTagsError as e:
+                    logging.warning(f"[SCHEDULER] {job['vehicle']} {date} 没有 tag: {e}")
+                    report.update(status="empty", reason=str(e))
+                except Exception as e:
+                    logging.error(f"[SCHEDULER] {job['vehicle']} {date} 检索失败: {e}")
+                    report.update(status="failed", error=str(e))
+                report["timings"] = {"plan": round(time.perf_counter() - t0, 3)}
+                if pending:
+                    yield list(pending.values())
+
+    def run(self, jobs: List[dict]) -> List[dict]:
+        """执行全部任务，返回每个 (车辆, 日期) 的汇总；结束时关闭车端连接"""
+        self._remotes = []
+        try:
+            return self._run(jobs)
+        finally:
+            for remote in self._remotes:
+                remote.close()
+
+    def _run(self, jobs: List[dict]) -> List[dict]:
+        reports: List[dict] = []
+        planner = self.session.planner
+        # 按存储源分桶，轮询派发，每个源的并发不超过其上限；桶内按预计耗时从长到短
+        buckets: Dict[str, List[list]] = {}
+        running: Dict[str, int] = {}
+        order: deque = deque()
+        totals = {"items": 0, "batches": 0, "bytes": 0}
+        ui.print_status(f"边检索边切片，全局并发 {self.workers}...")
+
+        def add(batches):
+            touched = set()
+            for batch in batches:
+                source = self.source_of(batch[0]["src"])
+                if source not in buckets:
+                    buckets[source], running[source] = [], 0
+                    order.append(source)
+                buckets[source].append(batch)
+                touched.add(source)
+                totals["items"] += len(batch)
+                totals["batches"] += 1
+                totals["bytes"] += sum(item["bytes"] for item in batch)
+            for source in touched:
+                buckets[source].sort(key=planner.estimate_batch, reverse=True)
+
+        def next_batch():
+            for _ in range(len(order)):
+                source = order[0]
+                order.rotate(-1)
+                if buckets[source] and running[source] < self.limit_of(source):
+                    return source, buckets[source].pop(0)
+            return None, None
+
+        with slice_bar(None) as bar, SliceMonitor(bar) as monitor, ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="slice"
+        ) as pool:
+            futures = {}
+
+            def fill():
+                while len(futures) < self.workers:
+                    source, batch = next_batch()
+                    if batch is None:
+                        return
+                    running[source] += 1
+                    upcoming = [q[0][0]["src"] for q in buckets.values() if q]
+                    future = pool.submit(
+                        batch[0]["downloader"].run_batch, batch, upcoming, monitor
+                    )
+                    futures[future] = (source, batch)
+
+            def collect(timeout):
+                done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source, batch = futures.pop(future)
+                    running[source] -= 1
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        # 单个批次异常只记为失败，继续消化队列，保留其他任务的汇总
+                        logging.error(f"[SCHEDULER] {batch[0]['src']} 切片异常: {e}")
+                        results = [False] * len(batch)
+                    for item, ok in zip(batch, results):
+                        report = item["report"]
+                        item["downloader"].complete(item, ok, report["files"])
+                        if report["files"]["failed"]:
+                            report["status"] = "failed"
+                        bar(item["bytes"])
+
+            try:
+                for batches in self.plan(jobs, reports):
+                    add(batches)
+                    fill()
+                    if futures:
+                        collect(0)
+                        fill()
+                while futures:
+                    collect(None)
+                    fill()
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                self.session.executor.cancel_all()
+                raise
+        if not totals["items"]:
+            ui.print_status("没有需要切片的文件")
+            return reports
+        ui.show_throughput(monitor.rows)
+        ui.print_status(
+            f"共 {len(reports)} 个车辆/日期，{totals['items']} 个 Record 片段 / "
+            f"{totals['batches']} 个源文件 (约 {totals['bytes'] / 2**20:.0f} MB)，存储源: "
+            + ", ".join(f"{s}({self.limit_of(s)})" for s in buckets)
+        )
+        ui.print_status("所有调度任务已完成！")
+        return reports
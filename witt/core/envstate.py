@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.process import ProcessExecutor
+
+
+def find_version_file(path) -> Optional[Path]:
+    """version 参数可以是文件或切片目录，目录时取其中的 version.json / version.txt"""
+    if not path:
+        return None
+    path = Path(path)
+    if path.is_file():
+        return path
+    if path.is_dir():
+        for name in ("version.json", "version.txt"):
+            if (path / name).is_file():
+                return path / name
+        found = sorted(p for p in path.glob("version*") if p.is_file())
+        if found:
+            return found[0]
+    return None
+
+
+def _digest(path: Path) -> str:
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+class EnvState:
+    """
+    记录最近一次成功应用的回放环境指纹 (version 文件内容、车辆、容器 ID、vmc.sh)，
+    指纹一致时说明容器仍在运行且已是目标版本，可跳过 restore_env.sh
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.process = ProcessExecutor.shared()
+
+    @property
+    def state_file(self) -> Path:
+        return self.ctx.cache_dir / "env_state.json"
+
+    def container_id(self) -> str:
+        """运行中的容器完整 ID，容器重建后会变化；未运行时返回空串"""
+        container = self.ctx.config["docker"]["container"]
+        try:
+            out = self.process.run(
+                ["docker", "ps", "-q", "--no-trunc", "-f", f"name=^/{container}$"], timeout=10
+            )
+        except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            return ""
+        return out.strip()
+
+    def fingerprint(self) -> Optional[Dict[str, str]]:
+        version_file = find_version_file(self.ctx.config["logic"].get("version"))
+        if version_file is None:
+            return None
+        return {
+            "version": _digest(version_file),
+            "vehicle": self.ctx.vehicle,
+            "container": self.container_id(),
+            "vmc": _digest(Path(self.ctx.config["host"]["mdrive_root"]) / "vmc.sh"),
+        }
+
+    def _load(self) -> Dict:
+        try:
+            return json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def is_current(self) -> bool:
+        fp = self.fingerprint()
+        if not fp or not fp["container"]:
+            return False
+        current = self._load() == fp
+        logging.info(f"[ENV] fingerprint {'matched' if current else 'changed'}: {fp}")
+        return current
+
+    def save(self):
+        """restore_env 成功后记录当前指纹"""
+        fp = self.fingerprint()
+        if not fp:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(fp, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.state_file)
+
+    def invalidate(self):
+        try:
+            self.state_file.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,224 @@
+import bisect
+import itertools
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from interface import ui
+from utils import parser, tags
+
+INDEX_VERSION = 2
+
+_RE_RECORD_TIME = re.compile(r"\.(\d{2})(\d{2})(\d{2})$")
+
+
+def is_cifs_mount(path: str) -> bool:
+    """等价于 findmnt -nt cifs <path>：判断路径本身是否为 CIFS 挂载点"""
+    target = os.path.realpath(path)
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount_point = parts[1].replace("\\040", " ")
+                if mount_point == target and parts[2] == "cifs":
+                    return True
+    except OSError:
+        pass
+    return False
+
+
+class NoTagsError(RuntimeError):
+    """当天没有 tag：不是数据缺失，批处理中单独计为 empty"""
+
+
+class RecordIndex:
+    """
+    持久化的 record/tag 索引，替代 find_record.sh 的全量 find。
+    目录 mtime 未变化时复用上次的列表，只对变化的目录重新 scandir。
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    @property
+    def index_file(self) -> Path:
+        return self.ctx.work_dir / ".witt" / "record_index.json"
+
+    def resolve_data_root(self) -> str:
+        """确定查询模式：NAS 挂载时按 日期/车号 定位，否则使用本地路径"""
+        host = self.ctx.config["host"]
+        if is_cifs_mount(host["data_root"]):
+            data_root = f"{host['nas_root']}/{self.ctx.target_date[:8]}/{self.ctx.vehicle}"
+            ui.print_status(f"NAS 模式: {data_root}")
+        else:
+            data_root = str(host["data_root"]).rstrip("/")
+            ui.print_status(f"本地路径模式: {data_root}")
+        return data_root
+
+    def _load(self, data_root: str) -> Dict:
+        empty = {"version": INDEX_VERSION, "data_root": data_root, "dirs": {}, "tags": {}}
+        if not self.index_file.exists():
+            return empty
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            ui.print_status("索引文件损坏，重新建立索引", "WARN")
+            return empty
+        if data.get("version") != INDEX_VERSION or data.get("data_root") != data_root:
+            return empty
+        return data
+
+    def _save(self, data: Dict):
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+
+    def _scan_dir(self, path: str) -> Dict:
+        entry = {"dirs": [], "records": [], "tags": []}
+        with os.scandir(path) as it:
+            for de in it:
+                if de.is_dir(follow_symlinks=False):
+                    entry["dirs"].append(de.name)
+                elif de.is_file():
+                    self.add_file(entry, de.name)
+        return entry
+
+    def add_file(self, entry: Dict, name: str) -> bool:
+        """按文件名识别当天的 record / tag 文件并登记到目录条目，record 附带开始秒数"""
+        date = self.ctx.target_date
+        if name.startswith(date) and "record" in name:
+            m = _RE_RECORD_TIME.search(name)
+            if m:
+                hh, mm, ss = (int(x) for x in m.groups())
+                entry["records"].append([name, hh * 3600 + mm * 60 + ss])
+                return True
+        elif name.startswith(f"tag_{date}") and name.endswith(".pb.txt"):
+            entry["tags"].append(name)
+            return True
+        return False
+
+    def refresh(self, data_root: str) -> Dict:
+        """增量刷新：逐级 stat 目录，mtime 变化的目录才重新列举"""
+        data = self._load(data_root)
+        old_dirs, old_tags = data["dirs"], data["tags"]
+        new_dirs = {}
+        tag_paths = []
+        rescanned = 0
+        stack = [data_root]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            cached = old_dirs.get(path)
+            if cached and cached["mtime"] == mtime:
+                entry = cached
+            else:
+                entry = self._scan_dir(path)
+                entry["mtime"] = mtime
+                rescanned += 1
+            new_dirs[path] = entry
+            stack.extend(os.path.join(path, d) for d in entry["dirs"])
+            tag_paths.extend(os.path.join(path, name) for name in entry["tags"])
+        # tag 文件会被原地追加，目录 mtime 不一定变化，按文件大小/mtime 判断是否重新解析
+        workers = int(self.ctx.config.get("pipeline", {}).get("workers", 4))
+        new_tags, reparsed = tags.load_tag_files(tag_paths, old_tags, workers)
+        data.update({"dirs": new_dirs, "tags": new_tags})
+        self._save(data)
+        logging.info(
+            f"[INDEX] {data_root}: {len(new_dirs)} dirs, {rescanned} rescanned, "
+            f"{len(new_tags)} tag files, {reparsed} reparsed"
+        )
+        return data
+
+    def _records(self, data: Dict) -> Tuple[List[int], List[Tuple[int, str, str]]]:
+        """按开始秒数排序的 (秒数, soc, 路径)，附带用于 bisect 的秒数列表"""
+        soc_filter = str(self.ctx.config["logic"]["soc"])
+        rows = []
+        for dir_path, entry in data["dirs"].items():
+            for name, sec in entry["records"]:
+                path = os.path.join(dir_path, name)
+                if soc_filter in path:
+                    rows.append((sec, parser.soc_of(path), path))
+        rows.sort()
+        return [r[0] for r in rows], rows
+
+    def query(self, records: Tuple[List[int], List], tag_sec: int) -> List[str]:
+        """
+        与 find_record.sh 保持一致的匹配规则：
+        窗口内开始的文件全部保留，窗口前每个 soc 只保留最后一个文件
+        """
+        secs, rows = records
+        logic = self.ctx.config["logic"]
+        start_sec = tag_sec - int(logic["before"])
+        end_sec = tag_sec + int(logic["after"])
+        lower = int((start_sec - 60) / 60) * 60
+        last_before: Dict[str, str] = {}
+        in_window = []
+        for sec, soc, path in itertools.islice(rows, bisect.bisect_left(secs, lower), None):
+            if sec >= end_sec:
+                break
+            if sec >= start_sec:
+                in_window.append(path)
+            else:
+                last_before[soc] = path
+        return [last_before[s] for s in sorted(last_before)] + in_window
+
+    def search(self, manifest_path: Optional[Path] = None):
+        """检索 tag 对应的 record，并生成 parser.iter_manifest 使用的 tasks.jsonl"""
+        manifest_path = manifest_path or self.ctx.manifest_path
+        data_root = self.resolve_data_root()
+        if not os.path.isdir(data_root):
+            ui.print_status(f"{data_root} 目录不存在！", "ERROR")
+            raise RuntimeError(f"{data_root} 目录不存在")
+        return self.publish(self.refresh(data_root), data_root, manifest_path)
+
+    def publish(
+        self,
+        data: Dict,
+        data_root: str,
+        manifest_path: Path,
+        sizes: Optional[Dict[str, int]] = None,
+    ):
+        """
+        由索引数据匹配每个 tag 的 record，逐行写出 tasks.jsonl 并随即展示，返回 tag 数
+        sizes 为已知的文件大小，缺省时对匹配到的文件逐个 stat
+        """
+        # 从索引文件读回的条目是 list，新解析的是 tuple，统一后再排序
+        tag_entries = sorted(tuple(e) for t in data["tags"].values() for e in t["entries"])
+        if not tag_entries:
+            ui.print_status(f"{data_root} 找不到对应的 tag 文件！", "ERROR")
+            raise NoTagsError(f"{data_root} 找不到对应的 tag 文件")
+        records = self._records(data)
+        starts = {path: sec for sec, _, path in records[1]}
+        sizes = dict(sizes or {})
+        tmp = manifest_path.with_suffix(".tmp")
+
+        def rows(f):
+            # 每写出一行即交给展示，结果不在内存中累积
+            for tag_time, tag, sec in tag_entries:
+                paths = self.query(records, sec)
+                files: Dict[str, List[Dict]] = {}
+                for path in paths:
+                    if path not in sizes:
+                        try:
+                            sizes[path] = os.path.getsize(path)
+                        except OSError:
+                            sizes[path] = None
+                    files.setdefault(parser.soc_of(path), []).append(
+                        {"path": path, "start": starts[path], "size": sizes[path]}
+                    )
+                f.write(parser.manifest_row(tag_time, tag, files))
+                yield tag_time, tag, paths
+
+        with open(tmp, "w", encoding="utf-8") as f:
+            count = ui.show_search_results(rows(f))
+        os.replace(tmp, manifest_path)
+        return count
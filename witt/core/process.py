@@ -0,0 +1,142 @@
+import asyncio
+import atexit
+import logging
+import os
+import signal
+import subprocess
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+LineHandler = Callable[[str], None]
+# StreamReader 默认单行上限 64 KB，cyber_recorder info 等输出可能有超长行
+STREAM_LIMIT = 16 * 2**20
+
+
+class ProcessExecutor:
+    """
+    基于 asyncio 的子进程执行器：所有命令跑在同一个后台事件循环中，可并发执行。
+    - 标准输出逐行回调给解析方，不再整体缓冲
+    - 每条命令可设超时，超时或取消时结束整个进程组（docker exec、bash 及其子进程）
+    - 同步调用方按 Ctrl-C 只取消当前命令，KeyboardInterrupt 照常抛给上层菜单
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, kill_grace: float = 3.0):
+        self.kill_grace = kill_grace
+        self._running = set()
+        self._lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="witt-process-loop", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def shared(cls) -> "ProcessExecutor":
+        """进程内共用一个事件循环"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    async def _terminate(self, proc: asyncio.subprocess.Process, group: bool):
+        """先 SIGTERM，宽限期后 SIGKILL；group 为 True 时作用于整个进程组"""
+        if proc.returncode is not None:
+            return
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                if group:
+                    os.killpg(proc.pid, sig)
+                else:
+                    proc.send_signal(sig)
+            except ProcessLookupError:
+                return
+            try:
+                await asyncio.wait_for(proc.wait(), self.kill_grace)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+    async def run_async(
+        self,
+        argv: Sequence[str],
+        env: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        on_line: Optional[LineHandler] = None,
+        capture: bool = True,
+    ) -> str:
+        """
+        执行命令并返回标准输出。capture 为 False 时继承终端（交互命令）。
+        失败抛 CalledProcessError，超时抛 TimeoutExpired，行为与 subprocess.run(check=True) 一致
+        """
+        pipe = asyncio.subprocess.PIPE if capture else None
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=pipe,
+            stderr=pipe,
+            env=env,
+            limit=STREAM_LIMIT,
+            # 捕获输出的命令放到独立进程组，便于整组结束；交互命令留在前台接收终端信号
+            start_new_session=capture,
+        )
+        lines: List[str] = []
+        errors: List[bytes] = []
+
+        async def pump_stdout():
+            async for raw in proc.stdout:
+                line = raw.decode("utf-8", "replace")
+                lines.append(line)
+                if on_line:
+                    on_line(line.rstrip("\n"))
+
+        async def pump_stderr():
+            errors.append(await proc.stderr.read())
+
+        async def communicate():
+            if capture:
+                await asyncio.gather(pump_stdout(), pump_stderr())
+            return await proc.wait()
+
+        try:
+            rc = await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self._terminate(proc, capture)
+            logging.warning(f"[PROCESS] 超时 {timeout}s，已结束: {' '.join(argv)[:200]}")
+            raise subprocess.TimeoutExpired(list(argv), timeout, "".join(lines))
+        except asyncio.CancelledError:
+            await self._terminate(proc, capture)
+            raise
+        stdout = "".join(lines)
+        if rc != 0:
+            stderr = b"".join(errors).decode("utf-8", "replace")
+            raise subprocess.CalledProcessError(rc, list(argv), output=stdout, stderr=stderr)
+        return stdout
+
+    def run(self, argv: Sequence[str], **kwargs) -> str:
+        """同步接口，可在任意线程调用；Ctrl-C 时取消命令并结束子进程后再抛出"""
+        future = asyncio.run_coroutine_threadsafe(self.run_async(argv, **kwargs), self.loop)
+        with self._lock:
+            self._running.add(future)
+        try:
+            return future.result()
+        except KeyboardInterrupt:
+            # 取消后事件循环里的协程会结束子进程组，菜单循环不受影响
+            future.cancel()
+            raise
+        finally:
+            with self._lock:
+                self._running.discard(future)
+
+    def cancel_all(self):
+        """取消所有线程中正在执行的命令（如 Ctrl-C 中断并发切片时）"""
+        with self._lock:
+            running = list(self._running)
+        for future in running:
+            future.cancel()
+
+    def close(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
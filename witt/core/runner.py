@@ -1,6 +1,10 @@
 import subprocess
 from pathlib import Path
 
+from core.process import ProcessExecutor
+from core.trace import span
+from interface import ui
+
 
 class ScriptRunner:
     """负责本地调用外部脚本完成各项任务"""
@@ -11,6 +15,7 @@ class ScriptRunner:
         self.scripts_dir = (
             PROJECT_ROOT / self.ctx.config["paths"]["scripts_dir"]
         ).resolve()
+        self.process = ProcessExecutor.shared()
 
     def _run_script(self, script_name: str, quiet: bool = False, *args: str):
         """
@@ -23,11 +28,18 @@ class ScriptRunner:
         bash_cmd = ["bash"]
         # if self.ctx.config["env"]["debug"]:
         #     bash_cmd.append("-x")
-        cmd = bash_cmd + [str(script_path)]
+        cmd = bash_cmd + [str(script_path), *args]
+        # quiet 时输出被捕获，逐行滚动显示进度；否则直接继承终端
+        progress = ui.live_line(script_name) if quiet else None
         try:
-            subprocess.run(cmd, env=env_vars, text=True, check=True, capture_output=quiet)
-        except subprocess.CalledProcessError as e:
+            with span("script.run", cmd=script_name) as s:
+                self.process.run(cmd, env=env_vars, capture=quiet, on_line=progress)
+                s["exit_code"] = 0
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             raise RuntimeError(f"{script_name} 脚本执行失败") from e
+        finally:
+            if progress:
+                progress.done()
 
     def run_find_record(self):
         self._run_script("find_record.sh")
@@ -35,9 +47,6 @@ class ScriptRunner:
     def run_restore_env(self):
         self._run_script("restore_env.sh")
 
-    def run_tools(self):
-        self._run_script("tools.sh")
-
     def run_docker(self):
         self._run_script("dev_start.sh", True, "--remove")
 
@@ -0,0 +1,150 @@
+import logging
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.trace import span
+from interface import ui
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+MULTIVIZ_CONFIG = "customized_20260115.multiviz.yaml"
+MULTIVIZ_CMD = f"/mdrive/mdrive/bin/mdrive_multiviz -d /mdrive/{MULTIVIZ_CONFIG} >/dev/null 2>&1"
+SUPERVISOR_INIT = "sudo -E bash /mdrive/mdrive/scripts/cmd.sh"
+
+
+class ServiceManager:
+    """
+    回放依赖的容器与可视化服务：探测容器、supervisor 进程与 Dreamview/multiviz 端口，
+    健康状态短时缓存，只重启实际挂掉的部分，启动后等待端口就绪而不是固定 sleep
+    """
+
+    def __init__(self, session):
+        self.session = session
+        conf = session.ctx.config.get("services", {})
+        self.programs = list(conf.get("supervisor") or ["Dreamview", "Debug_Driver-LiDAR"])
+        self.ports: Dict[str, int] = dict(conf.get("ports") or {"dreamview": 8888, "multiviz": 9001})
+        self.ttl = float(conf.get("health_ttl", 10))
+        self.ready_timeout = float(conf.get("ready_timeout", 30))
+        self._health: Optional[Dict] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def port_open(port: int, host: str = "127.0.0.1", timeout: float = 0.3) -> bool:
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def wait_port(self, port: int) -> bool:
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline:
+            if self.port_open(port):
+                return True
+            time.sleep(0.2)
+        return False
+
+    def supervisor_status(self) -> Dict[str, bool]:
+        """supervisorctl status 中各进程是否 RUNNING"""
+        try:
+            out = self.session.executor.execute("sudo supervisorctl status || true", timeout=15)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, RuntimeError) as e:
+            logging.debug(f"[SERVICES] supervisorctl 查询失败: {e}")
+            return {}
+        status = {}
+        for line in out.splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                status[parts[0]] = parts[1] == "RUNNING"
+        return status
+
+    def health(self, refresh: bool = False) -> Dict:
+        """{container, supervisor: {程序: 是否运行}, ports: {服务: 是否可连}}，ttl 内复用上次结果"""
+        with self._lock:
+            if not refresh and self._health and time.monotonic() - self._checked < self.ttl:
+                return self._health
+            with span("services.probe"):
+                container = bool(self.session.env_state.container_id())
+                health = {
+                    "container": container,
+                    "supervisor": self.supervisor_status() if container else {},
+                    "ports": {name: self.port_open(port) for name, port in self.ports.items()},
+                }
+            self._health, self._checked = health, time.monotonic()
+            logging.info(f"[SERVICES] health: {health}")
+            return health
+
+    def invalidate(self):
+        with self._lock:
+            self._health = None
+
+    def ensure(self, tools: bool = False, restart: bool = False) -> Dict:
+        """
+        保证容器、supervisor 进程与 Dreamview 可用；tools 为 True 时同时保证 multiviz 并打开浏览器
+        已经健康的服务不做任何操作；restart 为 True 时（如切换了版本）重启全部 supervisor 进程
+        """
+        health = self.health()
+        if not health["container"]:
+            ui.print_status("容器未运行，正在启动...", "WARN")
+            self.session.runner.run_docker()
+            self.session.env_state.invalidate()
+            health = self.health(refresh=True)
+            if not health["container"]:
+                raise RuntimeError("容器启动失败")
+
+        started = False
+        if restart:
+            ui.print_status(f"重启服务: {', '.join(self.programs)}")
+            restarts = " && ".join(f"sudo supervisorctl restart {p}" for p in self.programs)
+            self.session.executor.execute(f"{SUPERVISOR_INIT} && {restarts}", timeout=60)
+            started = True
+        down = [] if restart else [p for p in self.programs if not health["supervisor"].get(p)]
+        if down:
+            starts = " && ".join(f"sudo supervisorctl start {p}" for p in down)
+            ui.print_status(f"启动服务: {', '.join(down)}")
+            self.session.executor.execute(f"{SUPERVISOR_INIT} && {starts}", timeout=60)
+            started = True
+        if "dreamview" in self.ports and (started or not health["ports"].get("dreamview")):
+            if not self.wait_port(self.ports["dreamview"]):
+                ui.print_status(f"Dreamview 端口 {self.ports['dreamview']} 未就绪", "WARN")
+
+        if tools and "multiviz" in self.ports and not health["ports"].get("multiviz"):
+            self._start_multiviz()
+            started = True
+        if started:
+            self.invalidate()
+        if tools:
+            self.open_browser()
+        return self.health()
+
+    def _start_multiviz(self):
+        target = Path(self.session.ctx.config["host"]["mdrive_root"]) / MULTIVIZ_CONFIG
+        if not target.exists():
+            shutil.copy2(BASE_DIR / "docs" / MULTIVIZ_CONFIG, target)
+        container = self.session.ctx.config["docker"]["container"]
+        self.session.executor.process.run(
+            ["docker", "exec", "-d", container, "bash", "-c", MULTIVIZ_CMD], timeout=30
+        )
+        if self.wait_port(self.ports["multiviz"]):
+            ui.print_status("mdrive_multiviz 已启动...")
+        else:
+            ui.print_status(f"multiviz 端口 {self.ports['multiviz']} 未就绪", "WARN")
+
+    def open_browser(self):
+        for name in ("multiviz", "dreamview"):
+            if name not in self.ports:
+                continue
+            try:
+                subprocess.Popen(
+                    ["xdg-open", f"http://localhost:{self.ports[name]}"],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+            except OSError as e:
+                logging.debug(f"[SERVICES] 打开浏览器失败: {e}")
@@ -1,10 +1,20 @@
+from core.catalog import Catalog
 from core.context import TaskContext
 from core.runner import ScriptRunner
 from core.docker import DockerAdapter
+from core.envstate import EnvState
+from core.index import RecordIndex
+from core.services import ServiceManager
+from core.versions import VersionCache
+from core.engine.channels import ChannelService
 from core.engine.dowloader import RecordDownloader
+from core.engine.planner import SplitPlanner
 from core.engine.player import RecordPlayer
 from core.engine.recorder import Recorder
+from core.engine.remote import RemoteSlicer
+from core.trace import tracer
 
+import copy
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -16,11 +26,40 @@ class AppSession:
 
     def __init__(self):
         self.ctx = TaskContext(DEFAULT_CONFIG_PATH)
+        tracer.enabled = bool(self.ctx.config.get("trace", {}).get("enabled", True))
         self.runner = ScriptRunner(self.ctx)
+        self.env_state = EnvState(self.ctx)
+        self.versions = VersionCache(self.ctx)
+        self.index = RecordIndex(self.ctx)
+        self.catalog = Catalog(self.ctx)
         self.recorder = Recorder(self)
+        self.channels = ChannelService(self)
+        self.planner = SplitPlanner(self.ctx)
         self.downloader = RecordDownloader(self)
         self.executor = DockerAdapter(self.ctx)
         self.player = RecordPlayer(self)
+        self.remote = RemoteSlicer(self)
+        self.services = ServiceManager(self)
+
+    def derive(self, vehicle: str, target_date: str) -> "AppSession":
+        """
+        派生出处理另一车辆/日期的会话：上下文相关的对象重新创建，
+        执行器、Recorder 和目录库等无状态对象共享
+        """
+        child = copy.copy(self)
+        child.ctx = self.ctx.derive(vehicle, target_date)
+        child.runner = ScriptRunner(child.ctx)
+        child.env_state = EnvState(child.ctx)
+        child.versions = VersionCache(child.ctx)
+        child.index = RecordIndex(child.ctx)
+        child.downloader = RecordDownloader(child)
+        child.player = RecordPlayer(child)
+        child.remote = RemoteSlicer(child)
+        return child
 
     def init_logging(self):
         self.ctx.setup_logger()
+
+    def flush_trace(self):
+        """写出本轮埋点到日志目录，返回各阶段耗时汇总"""
+        return tracer.flush(self.ctx.log_dir)
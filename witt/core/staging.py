@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+from core.trace import span
+
+_COPY_BUFFER = 16 * 2**20
+
+
+def cifs_mounts() -> List[str]:
+    """当前所有 CIFS 挂载点"""
+    mounts = []
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[2] == "cifs":
+                    mounts.append(parts[1].replace("\\040", " "))
+    except OSError:
+        pass
+    return mounts
+
+
+class StagingCache:
+    """
+    NAS record 的本地磁盘读穿缓存：首次访问时顺序整读拷贝到本地，之后切片、info、回放都读本地副本。
+    以 (路径, 大小, mtime) 标识文件，NAS 上文件变化后自动换新副本；总大小超过上限时按最近使用淘汰。
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        conf = ctx.config.get("staging", {})
+        self.enabled = bool(conf.get("enabled", False))
+        self.max_bytes = int(float(conf.get("max_gb", 100)) * 2**30)
+        self.prefetch_depth = int(conf.get("prefetch", 2))
+        self._dir = conf.get("dir")
+        self._sources = [str(p).rstrip("/") for p in conf.get("sources") or []] or None
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        # 最近交给调用方的副本 -> 时间，租期内不淘汰，避免删掉正要被读取的文件
+        self.lease = float(conf.get("lease", 600))
+        self._handed: Dict[str, float] = {}
+        self._pool = None
+
+    @property
+    def root(self) -> Path:
+        return Path(self._dir) if self._dir else self.ctx.cache_dir / "staging"
+
+    @property
+    def sources(self) -> List[str]:
+        """需要缓存的远端目录，未配置时取所有 CIFS 挂载点"""
+        if self._sources is None:
+            self._sources = [m.rstrip("/") for m in cifs_mounts()]
+        return self._sources
+
+    def is_remote(self, path: str) -> bool:
+        path = os.path.realpath(path)
+        return any(path == s or path.startswith(s + "/") for s in self.sources)
+
+    def _local_path(self, path: str) -> Path:
+        st = os.stat(path)
+        key = f"{os.path.realpath(path)}|{st.st_size}|{st.st_mtime_ns}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}_{os.path.basename(path)}"
+
+    def stage(self, host_path: Union[str, Path]) -> Path:
+        """返回可读取的路径：远端文件换成本地副本，其他路径原样返回"""
+        path = str(host_path)
+        if not self.enabled or not os.path.isfile(path) or not self.is_remote(path):
+            return Path(path)
+        local = self._local_path(path)
+        key = str(local)
+        while True:
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    if local.exists():
+                        os.utime(local)
+                        self._handed[key] = time.monotonic()
+                        return local
+                    event = self._inflight[key] = threading.Event()
+                    break
+            # 其他线程（或预取）正在拷贝同一文件，等它完成
+            event.wait()
+        try:
+            self._copy(path, local)
+            with self._lock:
+                self._handed[key] = time.monotonic()
+            self._evict(keep=local)
+        except OSError as e:
+            logging.warning(f"[STAGING] {path} 缓存失败，直接读取 NAS: {e}")
+            return Path(path)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+        return local
+
+    def cached(self, host_path: Union[str, Path]) -> Path:
+        """
+        已有本地副本时返回副本，否则原样返回，不等待拷贝：
+        回放、info 只读取文件的一部分或需要立即开始，整文件拷贝反而更慢
+        """
+        path = str(host_path)
+        if not self.enabled or not os.path.isfile(path) or not self.is_remote(path):
+            return Path(path)
+        try:
+            local = self._local_path(path)
+        except OSError:
+            return Path(path)
+        key = str(local)
+        with self._lock:
+            if key in self._inflight or not local.exists():
+                return Path(path)
+            self._handed[key] = time.monotonic()
+        try:
+            os.utime(local)
+        except OSError:
+            return Path(path)
+        return local
+
+    def _copy(self, src: str, dest: Path):
+        """顺序大块读取，提示内核预读，写入临时文件后原子替换"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + ".part")
+        with span("staging.copy", file=src) as s, open(src, "rb", buffering=0) as fin, open(
+            tmp, "wb"
+        ) as fout:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fin.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            buf = bytearray(_COPY_BUFFER)
+            view = memoryview(buf)
+            copied = 0
+            while True:
+                n = fin.readinto(buf)
+                if not n:
+                    break
+                fout.write(view[:n])
+                copied += n
+            s.update(bytes_in=copied, bytes_out=copied)
+        os.replace(tmp, dest)
+        logging.info(f"[STAGING] {src} -> {dest} ({copied / 2**20:.1f} MB)")
+
+    def _evict(self, keep: Path):
+        """总大小超限时删除最久未使用的副本"""
+        entries = []
+        total = 0
+        for sub in self.root.iterdir():
+            if not sub.is_dir():
+                continue
+            for f in sub.iterdir():
+                if f.name.endswith(".part"):
+                    continue
+                try:
+                    st = f.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, f))
+                total += st.st_size
+        entries.sort()
+        now = time.monotonic()
+        with self._lock:
+            self._handed = {k: t for k, t in self._handed.items() if now - t < self.lease}
+            busy = set(self._inflight) | set(self._handed)
+        for _, size, f in entries:
+            if total <= self.max_bytes:
+                break
+            if f == keep or str(f) in busy:
+                continue
+            try:
+                f.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            logging.info(f"[STAGING] evict {f.name}")
+
+    def prefetch(self, paths: Iterable[Union[str, Path]]):
+        """后台预取接下来要用的文件，最多 prefetch 个"""
+        if not self.enabled or self.prefetch_depth <= 0:
+            return
+        todo = [str(p) for p in paths if self.is_remote(str(p))][: self.prefetch_depth]
+        if not todo:
+            return
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.prefetch_depth, thread_name_prefix="witt-prefetch"
+                )
+        for p in todo:
+            self._pool.submit(self._prefetch_one, p)
+
+    def _prefetch_one(self, path: str):
+        try:
+            t0 = time.perf_counter()
+            self.stage(path)
+            logging.debug(f"[STAGING] prefetched {path} in {time.perf_counter() - t0:.2f}s")
+        except Exception as e:
+            logging.debug(f"[STAGING] prefetch {path} failed: {e}")
@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class Tracer:
+    """
+    热路径埋点：子进程调用与文件操作以 span 记录 (命令, 文件, 输入/输出字节, 退出码, 耗时)，
+    运行结束时写出 JSONL 与 Chrome Trace (chrome://tracing / Perfetto 可直接打开)。
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        记录一个 span，调用方可向返回的 dict 补充 bytes_out / exit_code 等字段
+        """
+        if not self.enabled:
+            yield attrs
+            return
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs.setdefault("exit_code", getattr(e, "returncode", None))
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            record = {
+                "name": name,
+                "start": start,
+                "dur": time.perf_counter() - t0,
+                "tid": threading.get_ident(),
+            }
+            record.update({k: v for k, v in attrs.items() if v is not None})
+            with self._lock:
+                self._spans.append(record)
+
+    def summary(self, spans: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """按阶段汇总：次数、总/平均/最大耗时、失败数与字节数"""
+        stages: Dict[str, Dict[str, Any]] = {}
+        for s in self._spans if spans is None else spans:
+            row = stages.setdefault(
+                s["name"],
+                {"stage": s["name"], "count": 0, "total": 0.0, "max": 0.0, "errors": 0,
+                 "bytes_in": 0, "bytes_out": 0},
+            )
+            row["count"] += 1
+            row["total"] += s["dur"]
+            row["max"] = max(row["max"], s["dur"])
+            row["errors"] += 1 if "error" in s else 0
+            row["bytes_in"] += s.get("bytes_in", 0)
+            row["bytes_out"] += s.get("bytes_out", 0)
+        rows = sorted(stages.values(), key=lambda r: r["total"], reverse=True)
+        for row in rows:
+            row["mean"] = row["total"] / row["count"]
+        return rows
+
+    def flush(self, log_dir: Path) -> List[Dict[str, Any]]:
+        """写出本轮 span 并清空，返回阶段汇总"""
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if not spans:
+            return []
+        log_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        with open(log_dir / f"trace_{stamp}.jsonl", "w", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps(s, ensure_ascii=False) + "\n")
+        pid = os.getpid()
+        events = [
+            {
+                "name": s["name"],
+                "cat": s["name"].split(".")[0],
+                "ph": "X",
+                "ts": int(s["start"] * 1e6),
+                "dur": int(s["dur"] * 1e6),
+                "pid": pid,
+                "tid": s["tid"],
+                "args": {k: v for k, v in s.items() if k not in ("name", "start", "dur", "tid")},
+            }
+            for s in spans
+        ]
+        (log_dir / f"trace_{stamp}.json").write_text(
+            json.dumps({"traceEvents": events}, ensure_ascii=False), encoding="utf-8"
+        )
+        return self.summary(spans)
+
+
+tracer = Tracer()
+span = tracer.span
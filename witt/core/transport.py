@@ -0,0 +1,161 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+import shlex
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from core.process import ProcessExecutor
+from core.trace import span
+
+_COPY_BUFFER = 8 * 2**20
+
+
+class Transport(ABC):
+    """
+    与车端（或其替身）交互的通道：执行命令、取回文件。
+    fetch 必须可断点续传：中断后再次调用只传输剩余部分。
+    data_root 为该端 record 数据的根目录
+    """
+
+    name = "base"
+    data_root = ""
+
+    @abstractmethod
+    def run(self, cmd: str, timeout: Optional[float] = None) -> str:
+        """在该端执行 shell 命令，返回标准输出"""
+
+    @abstractmethod
+    def fetch(self, remote_path: str, local_path: Path) -> int:
+        """取回文件到 local_path，返回本地文件大小"""
+
+    def close(self):
+        pass
+
+
+class LocalTransport(Transport):
+    """本地目录充当车端，命令在本机执行，用于无车调试"""
+
+    name = "local"
+
+    def __init__(self, data_root: str):
+        self.data_root = str(data_root).rstrip("/")
+        self.process = ProcessExecutor.shared()
+
+    def run(self, cmd: str, timeout: Optional[float] = None) -> str:
+        with span("transport.run", cmd=cmd, transport=self.name):
+            return self.process.run(["/bin/bash", "-c", cmd], timeout=timeout)
+
+    def fetch(self, remote_path: str, local_path: Path) -> int:
+        """从 .part 文件已有的长度处继续拷贝，完成后原子替换"""
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        part = local_path.with_name(local_path.name + ".part")
+        offset = part.stat().st_size if part.exists() else 0
+        with span("transport.fetch", file=remote_path, transport=self.name) as s:
+            with open(remote_path, "rb") as fin, open(part, "ab") as fout:
+                fin.seek(offset)
+                while True:
+                    chunk = fin.read(_COPY_BUFFER)
+                    if not chunk:
+                        break
+                    fout.write(chunk)
+            os.replace(part, local_path)
+            size = local_path.stat().st_size
+            s.update(bytes_in=size - offset, resumed=offset)
+        return size
+
+
+class SSHTransport(Transport):
+    """
+    OpenSSH 连接复用（ControlMaster）：同一车端的所有命令与传输共用一条连接；
+    文件用 rsync --partial --append-verify 传输，中断后续传。
+    """
+
+    name = "ssh"
+
+    def __init__(
+        self,
+        user: str,
+        host: str,
+        data_root: str,
+        retries: int = 3,
+        timeout: Optional[float] = None,
+    ):
+        self.data_root = str(data_root).rstrip("/")
+        self.target = f"{user}@{host}" if user else host
+        self.retries = max(1, retries)
+        self.timeout = timeout
+        self.process = ProcessExecutor.shared()
+        control_dir = Path(tempfile.gettempdir()) / "witt_ssh"
+        control_dir.mkdir(mode=0o700, exist_ok=True)
+        self.ssh_opts = [
+            "-o", "BatchMode=yes",
+            "-o", "StrictHostKeyChecking=no",
+            "-o", "UserKnownHostsFile=/dev/null",
+            "-o", "LogLevel=ERROR",
+            "-o", "ConnectTimeout=10",
+            "-o", "ServerAliveInterval=15",
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={control_dir}/%r@%h:%p",
+            "-o", "ControlPersist=300",
+        ]
+
+    def _retry(self, argv: List[str], timeout: Optional[float]) -> str:
+        for attempt in range(1, self.retries + 1):
+            try:
+                return self.process.run(argv, timeout=timeout or self.timeout)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                # ssh 自身失败（连接断开）返回 255，rsync 网络中断返回 12/23/30/35，值得重试
+                rc = getattr(e, "returncode", None)
+                retryable = rc in (None, 12, 23, 30, 35, 255)
+                if attempt == self.retries or not retryable:
+                    raise
+                logging.warning(f"[TRANSPORT] {self.target} 第 {attempt} 次失败 (rc={rc})，重试...")
+                time.sleep(min(2 ** attempt, 10))
+
+    def run(self, cmd: str, timeout: Optional[float] = None) -> str:
+        with span("transport.run", cmd=cmd, transport=self.name):
+            return self._retry(["ssh", *self.ssh_opts, self.target, cmd], timeout)
+
+    def fetch(self, remote_path: str, local_path: Path) -> int:
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        rsh = " ".join(["ssh", *(shlex.quote(o) for o in self.ssh_opts)])
+        argv = [
+            "rsync", "--partial", "--append-verify", "--inplace", "-e", rsh,
+            f"{self.target}:{shlex.quote(remote_path)}", str(local_path),
+        ]
+        with span("transport.fetch", file=remote_path, transport=self.name) as s:
+            self._retry(argv, None)
+            size = local_path.stat().st_size
+            s["bytes_in"] = size
+        return size
+
+    def close(self):
+        try:
+            subprocess.run(
+                ["ssh", *self.ssh_opts, "-O", "exit", self.target],
+                capture_output=True,
+                timeout=5,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+
+def make_transport(ctx, soc: str, address: str) -> Transport:
+    """
+    按 remote.transport 创建指定 soc 的通道：
+    ssh 时 address 为车端 IP；local 时 address 为模拟该 soc 数据根目录的本地路径
+    """
+    remote = ctx.config["remote"]
+    if remote.get("transport", "ssh") == "local":
+        return LocalTransport(address)
+    return SSHTransport(
+        remote["user"],
+        address,
+        remote["data_root"],
+        retries=int(remote.get("retries", 3)),
+        timeout=ctx.config["docker"].get("timeout") or None,
+    )
@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.envstate import find_version_file
+from core.process import ProcessExecutor
+from core.trace import span
+from interface import ui
+from utils import parser
+
+# vmc 包名 -> vmc.sh 中的版本变量
+PACKAGES = {
+    "mdrive": "MDRIVE_VERSION",
+    "mdrive_conf": "MDRIVE_CONF_VERSION",
+    "mdrive_model": "MDRIVE_MODEL_VERSION",
+    "mdrive_map": "MDRIVE_MAP_VERSION",
+}
+READY = ".witt_ready.json"
+
+
+def parse_version_file(path: Path) -> Dict[str, str]:
+    """等价于 restore_env.sh 的 find_version：version.txt 按列解析，version.json 按字段读取"""
+    text = path.read_text(encoding="utf-8", errors="ignore")
+    if path.suffix == ".txt":
+        versions = {}
+        for line in text.splitlines():
+            parts = line.split()
+            if len(parts) >= 2 and parts[0] in PACKAGES:
+                versions[parts[0]] = parts[1]
+    else:
+        data = json.loads(text)
+        versions = {name: str(data.get(name) or "") for name in PACKAGES}
+    return {name: versions.get(name, "") for name in PACKAGES}
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class VersionCache:
+    """
+    多套 mdrive/conf/model/map 版本并存：每套安装在独立目录，
+    mdrive_root 下的各包目录改为指向当前版本的相对软链接（容器内同样可解析），
+    切换版本只需替换软链接并重启 supervisor 进程；超过磁盘预算时按最近使用淘汰
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        conf = ctx.config.get("versions", {})
+        self.enabled = bool(conf.get("enabled", False))
+        self.max_bytes = int(float(conf.get("max_gb", 60)) * 2**30)
+        self.process = ProcessExecutor.shared()
+
+    @property
+    def mdrive_root(self) -> Path:
+        return Path(self.ctx.config["host"]["mdrive_root"])
+
+    @property
+    def root(self) -> Path:
+        configured = self.ctx.config.get("versions", {}).get("dir")
+        return Path(configured) if configured else self.mdrive_root / ".witt_versions"
+
+    @property
+    def vmc_sh(self) -> Path:
+        return self.mdrive_root / "vmc.sh"
+
+    @staticmethod
+    def key_of(versions: Dict[str, str], vehicle: str) -> str:
+        """车型、车辆不同时 vmc 安装的配置不同，同一版本组合也不能共用"""
+        model = versions["mdrive_conf"].split(".")[0]
+        parts = [model, vehicle] + [versions[name] for name in PACKAGES]
+        return parser.sanitize_name("__".join(parts))
+
+    def _vmc_values(self) -> Dict[str, str]:
+        """vmc.sh 中当前写入的车辆与版本"""
+        values = {}
+        try:
+            text = self.vmc_sh.read_text(encoding="utf-8")
+        except OSError:
+            return values
+        for m in re.finditer(r'^(MDRIVE_\w+)="?([^"\n]*)"?$', text, re.M):
+            values[m.group(1)] = m.group(2)
+        return values
+
+    def _write_vmc(self, versions: Dict[str, str]):
+        """vmc.sh 与当前版本保持一致，避免之后 source vmc.sh 覆盖缓存中的其他版本"""
+        text = self.vmc_sh.read_text(encoding="utf-8")
+        for name, var in PACKAGES.items():
+            text = re.sub(rf"^{var}=.*$", f"{var}={versions[name]}", text, flags=re.M)
+        tmp = self.vmc_sh.with_suffix(".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        shutil.copymode(self.vmc_sh, tmp)
+        os.replace(tmp, self.vmc_sh)
+
+    def _ready(self, key: str) -> Optional[Dict]:
+        try:
+            return json.loads((self.root / key / READY).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _mark_ready(self, key: str, versions: Dict[str, str]):
+        target = self.root / key
+        meta = {"versions": versions, "size": _dir_size(target), "prepared": time.time()}
+        (target / READY).write_text(json.dumps(meta), encoding="utf-8")
+
+    def _touch(self, key: str):
+        os.utime(self.root / key / READY)
+
+    def active_key(self) -> Optional[str]:
+        link = self.mdrive_root / "mdrive"
+        if not link.is_symlink():
+            return None
+        return Path(os.readlink(link)).parent.name
+
+    def _adopt(self):
+        """首次启用时把 mdrive_root 下已安装的实体目录收编为一套缓存版本"""
+        real = [
+            n
+            for n in PACKAGES
+            if (self.mdrive_root / n).is_dir() and not (self.mdrive_root / n).is_symlink()
+        ]
+        if not real:
+            return
+        current = self._vmc_values()
+        versions = {name: current.get(var, "") for name, var in PACKAGES.items()}
+        vehicle = current.get("MDRIVE_VEHICLE_NAME", "")
+        if not all(versions.values()) or not vehicle:
+            return
+        key = self.key_of(versions, vehicle)
+        target = self.root / key
+        target.mkdir(parents=True, exist_ok=True)
+        for name in real:
+            if not (target / name).exists():
+                os.replace(self.mdrive_root / name, target / name)
+        self._mark_ready(key, versions)
+        self._link(key)
+        logging.info(f"[VERSIONS] adopted installed packages as {key}")
+
+    def prepare(self, versions: Dict[str, str]) -> str:
+        """保证该版本组合已安装在独立目录，返回其 key；安装失败时删除不完整的目录"""
+        key = self.key_of(versions, self.ctx.vehicle)
+        if self._ready(key):
+            self._touch(key)
+            return key
+        target = self.root / key
+        target.mkdir(parents=True, exist_ok=True)
+        current = self._vmc_values()
+        env = os.environ.copy()
+        env.update(
+            {
+                "VMC_HOME": str(Path.home() / ".vmc"),
+                "VMC_SOFTWARE": str(target),
+                "VMC_PLATFORM": "amd64",
+                "MDRIVE_VEHICLE_MODEL": versions["mdrive_conf"].split(".")[0],
+                "MDRIVE_VEHICLE_NAME": self.ctx.vehicle,
+                "MDRIVE_VEHICLE_ID": current.get("MDRIVE_VEHICLE_ID", ""),
+            }
+        )
+        vmc = str(Path.home() / ".vmc" / "bin" / "vmc")
+        ui.print_status(f"安装版本 {key} ...")
+        try:
+            with span("versions.prepare", key=key):
+                for name in PACKAGES:
+                    # vmc 的下载/解压进度逐行显示，安装大包时不会长时间无输出
+                    progress = ui.live_line(f"vmc {name}")
+                    try:
+                        self.process.run(
+                            [vmc, "install", "--name", name, "--version", versions[name]],
+                            env=env,
+                            on_line=progress,
+                        )
+                    finally:
+                        progress.done()
+            self._mark_ready(key, versions)
+        except BaseException:
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+        return key
+
+    def _link(self, key: str):
+        """原子替换各包目录的软链接，使用相对路径以便容器内解析"""
+        for name in PACKAGES:
+            link = self.mdrive_root / name
+            target = os.path.relpath(self.root / key / name, self.mdrive_root)
+            tmp = self.mdrive_root / f".{name}.witt_link"
+            if tmp.is_symlink():
+                tmp.unlink()
+            os.symlink(target, tmp)
+            os.replace(tmp, link)
+
+    def detach(self):
+        """
+        走完整 restore_env 前把当前版本移回 mdrive_root 下的实体目录并移出缓存，
+        vmc 随后就地安装，不会改写缓存中的版本；下次切换时再由 _adopt 收编
+        """
+        key = self.active_key()
+        if key is None:
+            return
+        for name in PACKAGES:
+            link = self.mdrive_root / name
+            if not link.is_symlink():
+                continue
+            link.unlink()
+            if (self.root / key / name).exists():
+                shutil.move(str(self.root / key / name), str(link))
+        shutil.rmtree(self.root / key, ignore_errors=True)
+        logging.info(f"[VERSIONS] detached {key} for restore_env")
+
+    def evict(self, keep: str):
+        """超过磁盘预算时，按最近使用时间删除最旧的非当前版本；没有完成标记的残留目录直接删除"""
+        if not self.root.exists():
+            return
+        entries = []
+        for d in self.root.iterdir():
+            meta = self._ready(d.name)
+            if meta is None:
+                if d.is_dir() and d.name != keep:
+                    shutil.rmtree(d, ignore_errors=True)
+                    logging.info(f"[VERSIONS] removed incomplete {d.name}")
+                continue
+            entries.append(((d / READY).stat().st_mtime, d.name, int(meta.get("size", 0))))
+        total = sum(e[2] for e in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            total -= size
+            logging.info(f"[VERSIONS] evicted {key} ({size / 2**30:.1f} GB)")
+
+    def switch(self) -> bool:
+        """
+        切换到 logic.version 指定的版本组合，成功返回 True；
+        车型/车辆变化需要重建容器环境，或安装失败时返回 False，由调用方走完整的 restore_env
+        """
+        if not self.enabled:
+            return False
+        version_file = find_version_file(self.ctx.config["logic"].get("version"))
+        if version_file is None:
+            return False
+        try:
+            versions = parse_version_file(version_file)
+        except (OSError, ValueError) as e:
+            logging.warning(f"[VERSIONS] 无法解析 {version_file}: {e}")
+            return False
+        if not versions["mdrive"] or not versions["mdrive_conf"]:
+            return False
+        current = self._vmc_values()
+        if (
+            current.get("MDRIVE_VEHICLE_MODEL") != versions["mdrive_conf"].split(".")[0]
+            or current.get("MDRIVE_VEHICLE_NAME") != self.ctx.vehicle
+        ):
+            return False
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._adopt()
+            key = self.prepare(versions)
+            if self.active_key() != key:
+                self._link(key)
+                self._write_vmc(versions)
+                ui.print_status(f"已切换到版本 {key}")
+        except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"[VERSIONS] 切换版本失败，回退到 restore_env: {e}")
+            return False
+        self.evict(keep=key)
+        return True
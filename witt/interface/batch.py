@@ -0,0 +1,194 @@
+"""
+无人值守的批处理入口：检索 + 切片某车某天的全部 tag，输出 JSON 汇总。
+用法示例:
+    python3 main.py batch --vehicle XZB600013 --date yesterday --summary /tmp/witt.json
+    python3 main.py batch --vehicle XZB600011,XZB600013 --date 20260101-20260107
+    python3 main.py batch --job nightly.yaml
+    python3 main.py batch --vehicle XZB600013 --date today --remote
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import yaml
+
+from core.engine.scheduler import JobScheduler
+from core.session import AppSession
+from interface import ui
+
+# 任务参数 -> settings.yaml 中的位置
+JOB_KEYS = {
+    "vehicle": ("logic", "vehicle"),
+    "date": ("logic", "target_date"),
+    "before": ("logic", "before"),
+    "after": ("logic", "after"),
+    "soc": ("logic", "soc"),
+    "blacklist": ("logic", "blacklist"),
+    "data_root": ("host", "data_root"),
+    "dest_root": ("host", "dest_root"),
+    "workers": ("pipeline", "workers"),
+}
+# 汇总状态 -> 退出码：empty 单独区分，定时任务可按需告警而不当作失败
+EXIT_CODES = {"ok": 0, "failed": 1, "empty": 2}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="witt batch", description="批量检索并切片指定车辆/日期的全部 tag")
+    ap.add_argument("--job", help="任务 YAML，字段同下方参数")
+    ap.add_argument("--vehicle", help="车号，多个用逗号分隔")
+    ap.add_argument("--date", help="YYYYMMDD / today / yesterday，或 起始-结束 日期范围")
+    ap.add_argument("--before", type=int)
+    ap.add_argument("--after", type=int)
+    ap.add_argument("--soc", help="soc / soc1 / soc2")
+    ap.add_argument("--data-root", dest="data_root")
+    ap.add_argument("--dest-root", dest="dest_root")
+    ap.add_argument("--blacklist", help="逗号分隔的频道黑名单")
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--remote", action="store_true", help="在车端检索切片，只回传切片结果")
+    ap.add_argument(
+        "--summary", help="JSON 汇总输出路径，默认打印到标准输出（其余界面输出均在标准错误）"
+    )
+    ap.add_argument("--rebuild-catalog", action="store_true", help="仅从 meta.json 重建切片目录库")
+    return ap
+
+
+def resolve_date(value: str) -> str:
+    if value == "today":
+        return datetime.now().strftime("%Y%m%d")
+    if value == "yesterday":
+        return (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
+    datetime.strptime(value[:8], "%Y%m%d")
+    return value
+
+
+def load_job(args) -> dict:
+    job = {}
+    if args.job:
+        job.update(yaml.safe_load(Path(args.job).read_text(encoding="utf-8")) or {})
+    for key in JOB_KEYS:
+        value = getattr(args, key, None)
+        if value is not None:
+            job[key] = value
+    if isinstance(job.get("blacklist"), str):
+        job["blacklist"] = [ch for ch in job["blacklist"].split(",") if ch]
+    return job
+
+
+def expand_jobs(config: dict, job: dict) -> list:
+    """
+    任务 YAML 中的 jobs 列表，或 --vehicle/--date 组合展开为 [{vehicle, start, end}]
+    """
+    if job.get("jobs"):
+        return [
+            {
+                "vehicle": j["vehicle"],
+                "start": resolve_date(str(j["start"])),
+                "end": resolve_date(str(j.get("end", j["start"]))),
+            }
+            for j in job["jobs"]
+        ]
+    vehicles = str(job.get("vehicle", config["logic"]["vehicle"])).split(",")
+    date = str(job.get("date", config["logic"]["target_date"]))
+    start, _, end = date.partition("-")
+    start = resolve_date(start)
+    end = resolve_date(end) if end else start
+    return [{"vehicle": v.strip(), "start": start, "end": end} for v in vehicles if v.strip()]
+
+
+def apply_job(config: dict, job: dict):
+    for key, value in job.items():
+        if key in ("jobs", "vehicle", "date"):
+            continue
+        if key not in JOB_KEYS:
+            raise ValueError(f"未知的任务参数: {key}")
+        section, name = JOB_KEYS[key]
+        config.setdefault(section, {})[name] = value
+
+
+def overall_status(reports: list) -> str:
+    """
+    任一任务失败为 failed；没有任务或全部任务当天都没有 tag 为 empty；
+    其余为 ok（部分日期没有 tag 不算失败，各任务的状态见 jobs）
+    """
+    statuses = {r["status"] for r in reports}
+    if "failed" in statuses:
+        return "failed"
+    if statuses <= {"empty"}:
+        return "empty"
+    return "ok"
+
+
+def run(session: AppSession, jobs: list, remote: bool = False) -> dict:
+    """调度全部 (车辆, 日期) 的 search + 切片，返回汇总"""
+    t0 = time.perf_counter()
+    reports = JobScheduler(session, remote=remote).run(jobs)
+    files = {"total": 0, "sliced": 0, "skipped": 0, "failed": 0}
+    for report in reports:
+        for key in files:
+            files[key] += report.get("files", {}).get(key, 0)
+    return {
+        "status": overall_status(reports),
+        "tags": sum(r["tags"] for r in reports),
+        "files": files,
+        "jobs": reports,
+        "timings": {"schedule": round(time.perf_counter() - t0, 3)},
+    }
+
+
+def main(argv) -> int:
+    """
+    标准输出只留 JSON 汇总，便于 cron/CI 解析：运行期间 fd 1 指向标准错误，
+    状态信息、进度条和子进程的输出都不会混入
+    """
+    args = build_parser().parse_args(argv)
+    sys.stdout.flush()
+    stdout_fd = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        summary = _run_batch(args)
+    finally:
+        sys.stdout.flush()
+        os.dup2(stdout_fd, 1)
+        os.close(stdout_fd)
+    output = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.summary:
+        Path(args.summary).write_text(output, encoding="utf-8")
+    else:
+        sys.stdout.write(output + "\n")
+    return EXIT_CODES.get(summary["status"], 1)
+
+
+def _run_batch(args) -> dict:
+    session = AppSession()
+    started = time.perf_counter()
+    summary = {"status": "failed"}
+    try:
+        job = load_job(args)
+        apply_job(session.ctx.config, job)
+        jobs = expand_jobs(session.ctx.config, job)
+        # 日志与埋点落在第一个任务的工作目录下
+        if jobs:
+            session.ctx.config["logic"]["vehicle"] = jobs[0]["vehicle"]
+            session.ctx.config["logic"]["target_date"] = jobs[0]["start"]
+        session.init_logging()
+        if args.rebuild_catalog:
+            session.catalog.rebuild()
+            summary = {"status": "ok", "action": "rebuild-catalog"}
+        else:
+            summary = run(session, jobs, remote=args.remote)
+    except Exception as e:
+        logging.error(f"[BATCH] 执行失败: {e}\n{traceback.format_exc()}")
+        ui.print_status(f"批处理失败: {e}", "ERROR")
+        summary.update({"status": "failed", "error": str(e)})
+    summary.setdefault("timings", {})["total"] = round(time.perf_counter() - started, 3)
+    summary["stages"] = [
+        {k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()}
+        for row in session.flush_trace()
+    ]
+    return summary
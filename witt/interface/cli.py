@@ -19,6 +19,7 @@ def menu():
         Choice(title="[仅同步] 同步本地 docker 环境", value="3"),
         Choice(title="[仅回播] 手动或者自动回播数据", value="4"),
         Choice(title="[进容器] 交互式进 docker bash", value="5"),
+        Choice(title="[车端切片] 车上检索切片，只回传片段", value="6"),
         Choice(title="[README] 使用说明", value="h"),
         Choice(title="[ 退出 ]", value="q"),
     ]
@@ -30,6 +31,7 @@ def menu():
         "3": lambda: workflow.restore_env_flow(session),
         "4": lambda: workflow.play_flow(session),
         "5": lambda: session.runner.into_docker(),
+        "6": lambda: workflow.remote_flow(session),
         "h": lambda: prompter.usage(),
     }
 
@@ -61,4 +63,5 @@ def menu():
                 ui.print_status("用户终止程序...", "WARN")
             except Exception as e:
                 logging.error(f"执行操作 {choice} 时发生异常: {e}")
+            ui.show_trace_summary(session.flush_trace())
             input("按回车键继续...")
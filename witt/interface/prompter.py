@@ -64,11 +64,12 @@ def get_path_params(config: dict):
     # config["env"]["debug"] = get_user_input("bash 调试模式", config["env"]["debug"])
 
 
-def get_selected_indices(all_tasks: list, prompt="请输入要处理的序号") -> list:
+def get_selected_indices(all_tasks: list, prompt="请输入要处理的序号", estimate=None) -> list:
     """
     通用序号获取方法 带预览与重试逻辑
     :param all_tasks: 原始任务列表，用于获取长度和预览内容
     :param prompt: 输入提示词
+    :param estimate: 可选，传入选中的任务返回预估数据量/耗时说明，确认前显示
     :return: 选中的任务对象列表
     """
     total_count = len(all_tasks)
@@ -128,6 +129,10 @@ def get_selected_indices(all_tasks: list, prompt="请输入要处理的序号")
         if len(final_ids) > preview_limit:
             preview_str += " ..."
         ui.print_status(f"选中待处理序号: [{preview_str}(共 {len(final_ids)} 项)]")
+        if estimate:
+            summary = estimate([all_tasks[i - 1] for i in final_ids])
+            if summary:
+                ui.print_status(summary)
         if get_confirm_input("确认执行？", True):
             return [all_tasks[i - 1] for i in final_ids]
         ui.print_status("已取消...", "WARN")
@@ -235,26 +240,15 @@ def select_channels_wizard(channels: List[dict], prompt: str) -> List[str]:
 
 
 def get_channels(session: "AppSession", tasks: List[dict]) -> List[dict]:
-    """从多个 record 中提取频道并集，支持双 SOC 路径检查"""
-    channels_map = {}
-    socs = set()
-    for t in tasks:
-        path_list = t.get("paths", [])
-        for p in path_list:
-            soc = Path(p).parent.name[-4:]
-            if soc in socs:
-                continue
-            info = session.recorder.get_info(p)
-            channels = info.get("channels", [])
-            for ch in channels:
-                name = ch["name"]
-                if name not in channels_map:
-                    channels_map[name] = ch.copy()
-                    channels_map[name].setdefault("count", 0)
-                else:
-                    channels_map[name]["count"] += ch.get("count", 0)
-            socs.update(soc)
-    return sorted(channels_map.values(), key=lambda x: x["name"])
+    """
+    从多个 record 中提取频道并集，每个 SOC/版本只解析一个代表文件；
+    解析过程中只刷新进度，全部完成后返回完整并集供选择
+    """
+    channels = []
+    for done, total, channels in session.channels.iter_union(tasks):
+        print(f"\r正在解析频道: {done}/{total}, 已发现 {len(channels)} 个", end="", flush=True)
+    print()
+    return channels
 
 
 def get_tasks_channels(session: AppSession, tasks: List[dict]) -> List[str]:
@@ -1,3 +1,7 @@
+import logging
+import re
+
+
 def print_banner() -> None:
     print("" + "=" * 42)
     print("     witt ( What Is That Tag ? ）v1.5")
@@ -5,22 +9,38 @@ def print_banner() -> None:
 
 
 def show_playback_library(library, vehicle, target_date) -> None:
-    """专门负责打印播放列表"""
+    """专门负责打印播放列表，library 已按车辆/日期过滤"""
     print(f"{'ID '} | {vehicle:<9} | {target_date}")
     print("-" * 42)
-    count = 1
-    for entry in library:
-        if entry["date"] == target_date and entry["vehicle"] == vehicle:
-            print(
-                f"{count:<3} ├── \033[3m{entry['time'][11:]} \033[1;32m{entry['tag']}\033[0m "
-            )
-            indent = " " * 4
-            meta = entry.get("last_update", {})
-            soc1_update = meta.get("soc1", "N/A")
-            soc2_update = meta.get("soc2", "N/A")
-            print(f"{indent}├── soc1 update: \033[3;33m{soc1_update}\033[0m")
-            print(f"{indent}└── soc2 update: \033[3;33m{soc2_update}\033[0m")
-            count += 1
+    for count, entry in enumerate(library, 1):
+        print(
+            f"{count:<3} ├── \033[3m{entry['time'][11:]} \033[1;32m{entry['tag']}\033[0m "
+        )
+        indent = " " * 4
+        meta = entry.get("last_update") or {}
+        socs = sorted(meta) or ["soc1", "soc2"]
+        for i, soc in enumerate(socs, 1):
+            branch = "└──" if i == len(socs) else "├──"
+            print(f"{indent}{branch} {soc} update: \033[3;33m{meta.get(soc, 'N/A')}\033[0m")
+
+
+def show_search_results(tasks) -> int:
+    """逐条打印检索结果（可传入生成器），格式与 find_record.sh 保持一致，返回条数"""
+    error_tasks = []
+    count = 0
+    for count, (tag_time, tag_name, paths) in enumerate(tasks, 1):
+        if not paths:
+            error_tasks.append(f"[{count}] {tag_name} : {tag_time}")
+            continue
+        found_socs = " ".join(sorted({s for p in paths for s in re.findall(r"soc\d+", p)}))
+        print(f"\033[0;32m[{count}] {tag_name} : {tag_time} [{found_socs}]\033[0m")
+        print(f"cyber_recorder play -l -f {' '.join(paths)}")
+        print("-" * 48)
+    if error_tasks:
+        print_status("以下 tag 无法找到对应 record 数据", "ERROR")
+        print("\n".join(error_tasks))
+        print("-" * 48)
+    return count
 
 
 def show_manual_play_header() -> None:
@@ -35,6 +55,49 @@ def show_playback_info(tag, duration, channels=None) -> None:
     #     print(f"频道过滤: \033[1;34m{channels}\033[0m")
 
 
+def show_trace_summary(rows) -> None:
+    """打印各阶段耗时汇总"""
+    if not rows:
+        return
+    print(
+        f"{'stage':<18}{'count':>8}{'total':>13}{'mean':>11}{'max':>11}{'err':>8}{'in/out MB':>18}"
+    )
+    print("-" * 87)
+    for r in rows:
+        io = f"{r['bytes_in'] / 2**20:.1f}/{r['bytes_out'] / 2**20:.1f}"
+        print(
+            f"{r['stage']:<18}{r['count']:>8}{r['total']:>12.2f}s{r['mean']:>10.3f}s"
+            f"{r['max']:>10.3f}s{r['errors']:>8}{io:>18}"
+        )
+    print("-" * 87)
+
+
+def show_throughput(rows, limit: int = 15) -> None:
+    """打印各源文件的切片吞吐量，最慢的排在前面，并按目录汇总"""
+    if not rows:
+        return
+    rows = sorted(rows, key=lambda r: r["mbps"])
+    print(f"{'MB/s':>8}{'MB':>10}{'sec':>9}  file")
+    print("-" * 72)
+    for r in rows[:limit]:
+        flag = "" if r["ok"] else " \033[31m[失败]\033[0m"
+        print(
+            f"{r['mbps']:>8.1f}{r['bytes'] / 2**20:>10.1f}{r['seconds']:>9.1f}  "
+            f"{'/'.join(r['src'].rsplit('/', 2)[-2:])}{flag}"
+        )
+    if len(rows) > limit:
+        print(f"... 其余 {len(rows) - limit} 个文件略")
+    dirs = {}
+    for r in rows:
+        d = dirs.setdefault(r["dir"], [0, 0.0])
+        d[0] += r["bytes"]
+        d[1] += r["seconds"]
+    print("-" * 72)
+    for path, (size, seconds) in sorted(dirs.items(), key=lambda x: x[1][0] / max(x[1][1], 1e-9)):
+        print(f"{size / 2**20 / max(seconds, 1e-9):>8.1f}{size / 2**20:>10.1f}{seconds:>9.1f}  {path}/")
+    print("-" * 72)
+
+
 def print_status(msg, level="INFO") -> None:
     """
     终端即时反馈，不进入日志文件。
@@ -46,3 +109,19 @@ def print_status(msg, level="INFO") -> None:
         "RESET": "\033[0m",
     }
     print(f"{colors.get(level, '')}[{level}] {msg}{colors['RESET']}")
+
+
+def live_line(prefix: str):
+    """
+    返回逐行输出的回调：在同一终端行上滚动显示命令的最新一行，并写入调试日志。
+    命令结束后调用返回值的 done() 清除该行
+    """
+
+    def on_line(line: str) -> None:
+        logging.debug(f"[{prefix}] {line}")
+        text = line.strip()
+        if text:
+            print(f"\r\033[K{prefix}: {text[-100:]}", end="", flush=True)
+
+    on_line.done = lambda: print("\r\033[K", end="", flush=True)
+    return on_line
@@ -15,7 +15,9 @@ def full_progress(session: AppSession):
             ui.print_status("未找到相关 Record 记录", "ERROR")
             return
         selected_tasks = prompter.get_selected_indices(
-            task_list, prompt="请选择要处理的 Tag 序号"
+            task_list,
+            prompt="请选择要处理的 Tag 序号",
+            estimate=lambda tasks: session.planner.describe(tasks, session.downloader.backend),
         )
         valid_tasks = [t for t in selected_tasks if t.get("paths")]
         if not valid_tasks:
@@ -31,12 +33,41 @@ def full_progress(session: AppSession):
         raise e
 
 
+def remote_flow(session: AppSession):
+    """车端检索并切片，只回传切片结果"""
+    prompter.get_basic_params(session.ctx.config)
+    session.ctx.config["host"]["dest_root"] = prompter.get_user_input(
+        "导出路径 (/media下)", session.ctx.config["host"]["dest_root"]
+    )
+    session.init_logging()
+    # 结束时关闭到各车端的复用连接，无论是否中途退出
+    with session.remote:
+        ui.print_status("正在车端检索数据...")
+        session.remote.search()
+        task_list = parser.parse_manifest(session.ctx.manifest_path)
+        if not task_list:
+            ui.print_status("未找到相关 Record 记录", "ERROR")
+            return
+        selected_tasks = prompter.get_selected_indices(
+            task_list,
+            prompt="请选择要处理的 Tag 序号",
+            estimate=lambda tasks: session.planner.describe(tasks, session.remote.backend),
+        )
+        valid_tasks = [t for t in selected_tasks if t.get("paths")]
+        if not valid_tasks:
+            ui.print_status("所选序号无效或无路径数据", "ERROR")
+            return
+        session.remote.download_record(valid_tasks)
+    if prompter.get_confirm_input("\n处理完成，是否立即回播数据?", True):
+        auto_play(session)
+
+
 def search_flow(session: AppSession):
     prompter.get_basic_params(session.ctx.config)
     prompter.get_path_params(session.ctx.config)
     session.init_logging()
     ui.print_status("正在执行数据检索...")
-    session.runner.run_find_record()
+    session.index.search()
 
 
 # def compress_flow(session: AppSession):
@@ -82,9 +113,24 @@ def search_flow(session: AppSession):
 def restore_env_flow(session: AppSession, auto: bool = False):
     if not auto:
         session.ctx.config["logic"]["version"] = prompter.get_json_input()
-    session.runner.run_restore_env()
+    elif session.env_state.is_current():
+        # 回放时版本、车辆、容器都未变化，无需重新同步环境，只确认服务仍然存活
+        ui.print_status("回放环境未变化，跳过环境同步")
+        session.services.ensure()
+        return
+    session.env_state.invalidate()
+    active = session.versions.active_key()
+    if session.versions.switch():
+        # 版本已在本地并存，切换软链接后只需重启 supervisor 进程
+        session.services.ensure(restart=session.versions.active_key() != active)
+    else:
+        # restore_env 重写了 vmc.sh 并可能更换了软件版本，运行中的服务仍是旧版本，需全部重启
+        session.versions.detach()
+        session.runner.run_restore_env()
+        session.services.ensure(restart=True)
+    session.env_state.save()
     if prompter.get_confirm_input("是否需要打开 Dreamview & Multiviz"):
-        session.runner.run_tools()
+        session.services.ensure(tools=True)
 
 
 def play_flow(session: AppSession):
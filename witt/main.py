@@ -1,7 +1,14 @@
 import sys
 import interface.cli as cli
+import interface.batch as batch
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        sys.exit(batch.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        import bench.run as bench
+
+        sys.exit(bench.main(sys.argv[2:]))
     try:
         cli.menu()
     except KeyboardInterrupt:
@@ -118,6 +118,10 @@ start_docker() {
         fi
         bash "$START_SCRIPT" --remove
     fi
+    # 由 witt 调用时服务的启动与就绪检查交给 ServiceManager
+    if [ "${WITT_SERVICES:-0}" = "1" ]; then
+        return
+    fi
     docker exec -d "$CONTAINER" bash -c 'sudo -E bash /mdrive/mdrive/scripts/cmd.sh && sudo supervisorctl start Dreamview && sudo supervisorctl start Debug_Driver-LiDAR'
     log_info "Supervisor 和 Dreamview 已启动..."
 }
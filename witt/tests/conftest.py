@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+WITT_DIR = Path(__file__).resolve().parents[1]
+if str(WITT_DIR) not in sys.path:
+    sys.path.insert(0, str(WITT_DIR))
+
+import pytest  # noqa: E402
+
+DATE = "20260101"
+
+
+@pytest.fixture
+def local_session(tmp_path):
+    """
+    本地目录上的一天模拟数据（2 个 SOC、6 个 20s 的 record、3 个 tag），
+    native 后端，容器命令由 FakeExecutor 在本地模拟；返回 (session, 数据集描述)
+    """
+    import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+    from bench.fake_recorder import FakeExecutor
+    from bench.synth import generate
+    from core.engine.player import RecordPlayer
+    from core.session import AppSession
+
+    data_root = tmp_path / "data"
+    dataset = generate(
+        data_root, DATE, socs=2, records=6, record_seconds=20, tags=3, channels=3,
+        rate=2, payload=16,
+    )
+    session = AppSession()
+    config = session.ctx.config
+    config["host"].update(data_root=str(data_root), dest_root=str(tmp_path / "dest"))
+    config["logic"].update(
+        vehicle="XZB", target_date=DATE, soc="soc", before=15, after=5, blacklist=[]
+    )
+    config["recorder"].update(info_backend="native", split_backend="native")
+    config["staging"] = {"enabled": False}
+    session.executor = FakeExecutor(session.ctx, exec_latency=0, info_latency=0, split_mbps=1e4)
+    session.player = RecordPlayer(session)
+    return session, dataset
@@ -0,0 +1,69 @@
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.agent import AGENT_SERVER, AgentClient
+
+
+@pytest.fixture
+def agent():
+    client = AgentClient([sys.executable, "-u", str(AGENT_SERVER), "2"], startup_timeout=10)
+    client.start()
+    yield client
+    client.close()
+
+
+def test_execute_returns_stdout(agent):
+    assert agent.execute("echo hello") == "hello\n"
+
+
+def test_nonzero_exit_raises_called_process_error(agent):
+    with pytest.raises(subprocess.CalledProcessError) as exc:
+        agent.execute("echo oops >&2; exit 3")
+    assert exc.value.returncode == 3
+    assert "oops" in exc.value.stderr
+
+
+def test_timeout_kills_command(agent):
+    with pytest.raises(subprocess.TimeoutExpired):
+        agent.execute("sleep 10", timeout=0.5)
+    # 超时后代理仍可继续处理命令
+    assert agent.execute("echo ok") == "ok\n"
+
+
+def test_concurrent_commands(agent):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outputs = list(pool.map(agent.execute, [f"echo {i}" for i in range(8)]))
+    assert outputs == [f"{i}\n" for i in range(8)]
+
+
+def test_exited_agent_fails_pending(agent):
+    agent.proc.kill()
+    agent.proc.wait()
+    with pytest.raises(RuntimeError):
+        agent.execute("echo late")
+
+
+def test_stderr_goes_to_log(caplog):
+    argv = [sys.executable, "-u", "-c", f"import sys; sys.stderr.write('setup failed\\n'); "
+            f"sys.argv = ['', '1']; exec(open({str(AGENT_SERVER)!r}).read())"]
+    client = AgentClient(argv, startup_timeout=10)
+    with caplog.at_level("INFO"):
+        client.start()
+        client.execute("true")
+        client.close()
+    assert any("setup failed" in r.getMessage() for r in caplog.records)
+
+
+def test_cancel_all_ends_running_commands(agent):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(agent.execute, "sleep 30") for _ in range(2)]
+        time.sleep(0.5)
+        agent.cancel_all()
+        for future in futures:
+            with pytest.raises(subprocess.CalledProcessError):
+                future.result(timeout=5)
+    assert agent.execute("echo ok") == "ok\n"
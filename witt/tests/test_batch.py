@@ -0,0 +1,49 @@
+import shutil
+
+import pytest
+
+import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+from conftest import DATE
+from interface import batch
+
+
+@pytest.mark.parametrize(
+    "statuses, expected",
+    [
+        ([], "empty"),
+        (["empty"], "empty"),
+        (["ok", "empty"], "ok"),
+        (["ok", "failed", "empty"], "failed"),
+        (["ok"], "ok"),
+    ],
+)
+def test_overall_status(statuses, expected):
+    assert batch.overall_status([{"status": s} for s in statuses]) == expected
+
+
+def test_exit_codes_are_distinct():
+    assert batch.EXIT_CODES == {"ok": 0, "failed": 1, "empty": 2}
+
+
+def test_day_with_tags_is_ok(local_session):
+    session, dataset = local_session
+    summary = batch.run(session, [{"vehicle": "XZB", "start": DATE, "end": DATE}])
+    assert summary["status"] == "ok"
+    assert summary["tags"] == dataset["tags"]
+    assert summary["files"]["failed"] == 0
+
+
+def test_day_without_tags_is_empty(local_session):
+    session, _ = local_session
+    shutil.rmtree(f"{session.ctx.config['host']['data_root']}/tags")
+    summary = batch.run(session, [{"vehicle": "XZB", "start": DATE, "end": DATE}])
+    assert summary["status"] == "empty"
+    assert [job["status"] for job in summary["jobs"]] == ["empty"]
+    assert "error" not in summary["jobs"][0]
+
+
+def test_missing_data_root_is_failed(local_session):
+    session, _ = local_session
+    shutil.rmtree(session.ctx.config["host"]["data_root"])
+    summary = batch.run(session, [{"vehicle": "XZB", "start": DATE, "end": DATE}])
+    assert summary["status"] == "failed"
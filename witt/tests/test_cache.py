@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from core import cache as cache_module
+from core.cache import InfoCache
+
+INFO = {
+    "begin": datetime(2026, 1, 1, 10, 0, 0),
+    "end": datetime(2026, 1, 1, 10, 1, 0),
+    "duration": 60,
+    "channels": [{"name": "/mdrive/control/cmd", "count": 300}],
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    ctx = SimpleNamespace(config={"cache": {"info_entries": 2}}, cache_dir=tmp_path / ".witt")
+    return InfoCache(ctx)
+
+
+def make_file(tmp_path, name, content=b"record"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_hit_returns_stored_info(cache, tmp_path):
+    path = make_file(tmp_path, "a.record")
+    assert cache.get(path) is None
+    cache.put(path, INFO)
+    assert cache.get(path) == INFO
+
+
+def test_rewritten_file_invalidates(cache, tmp_path):
+    path = make_file(tmp_path, "a.record")
+    cache.put(path, INFO)
+    with open(path, "ab") as f:
+        f.write(b"more")
+    assert cache.get(path) is None
+
+    cache.put(path, INFO)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert cache.get(path) is None
+
+
+def test_evicts_least_recently_used(cache, tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(cache_module.time, "time", lambda: next(clock))
+    a, b, c = (make_file(tmp_path, f"{n}.record") for n in "abc")
+    cache.put(a, INFO)
+    cache.put(b, INFO)
+    # a 命中后的最近使用时间在下一次写入前批量写回，淘汰的是 b
+    assert cache.get(a) == INFO
+    cache.put(c, INFO)
+    assert cache.get(a) == INFO
+    assert cache.get(b) is None
+    assert cache.get(c) == INFO
+
+
+def test_hits_do_not_write(cache, tmp_path):
+    path = make_file(tmp_path, "a.record")
+    cache.put(path, INFO)
+
+    def last_used():
+        conn = sqlite3.connect(cache.db_path)
+        try:
+            return conn.execute("SELECT last_used FROM info").fetchone()[0]
+        finally:
+            conn.close()
+
+    stored = last_used()
+    for _ in range(cache_module.TOUCH_BATCH - 1):
+        assert cache.get(path) == INFO
+    assert last_used() == stored
+    cache.flush()
+    assert last_used() > stored
+
+
+def test_threads_share_schema(cache, tmp_path):
+    paths = [make_file(tmp_path, f"{i}.record") for i in range(2)]
+    errors = []
+
+    def worker(path):
+        try:
+            cache.put(path, INFO)
+            for _ in range(20):
+                assert cache.get(path) == INFO
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in paths]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
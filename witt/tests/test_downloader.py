@@ -0,0 +1,41 @@
+import os
+
+from utils import parser
+
+
+def planned_tasks(session):
+    session.index.search()
+    return [t for t in parser.parse_manifest(session.ctx.manifest_path) if t["paths"]]
+
+
+def test_plan_counts_missing_source_as_failed(local_session):
+    session, _ = local_session
+    tasks = planned_tasks(session)
+    missing = tasks[0]["paths"][0]
+    os.remove(missing)
+    queue, stats = session.downloader.plan(tasks)
+    assert stats["failed"] == 1
+    assert stats["total"] == sum(len(t["paths"]) for t in tasks)
+    assert missing not in {str(item["src"]) for item in queue}
+    assert len(queue) == stats["total"] - 1
+
+
+def test_download_record_continues_past_missing_source(local_session):
+    session, _ = local_session
+    tasks = planned_tasks(session)
+    os.remove(tasks[0]["paths"][0])
+    stats = session.downloader.download_record(tasks)
+    assert stats["failed"] == 1
+    assert stats["sliced"] == stats["total"] - 1
+
+
+def test_downloaded_tags_are_current_in_catalog(local_session):
+    session, _ = local_session
+    tasks = planned_tasks(session)
+    stats = session.downloader.download_record(tasks)
+    assert stats["sliced"] == stats["total"]
+    known = session.catalog.signatures(session.ctx.work_dir)
+    assert len(known) == len({t["name"] for t in tasks})
+    assert all(sig is not None for sig in known.values())
+    # 刚下载的 tag 已按最终签名登记，回放扫描无需重新解析
+    assert session.player._scan_local_library() is False
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+from core.context import TaskContext
+from core.envstate import EnvState, find_version_file
+from core.session import DEFAULT_CONFIG_PATH
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    """版本目录、vmc.sh 在临时目录下，容器 ID 固定"""
+    ctx = TaskContext(DEFAULT_CONFIG_PATH)
+    mdrive = tmp_path / "mdrive"
+    mdrive.mkdir()
+    (mdrive / "vmc.sh").write_text("echo v1\n", encoding="utf-8")
+    version_dir = tmp_path / "slice"
+    version_dir.mkdir()
+    (version_dir / "version.json").write_text(json.dumps({"version": "1.0"}), encoding="utf-8")
+    ctx.config["host"].update(dest_root=str(tmp_path / "dest"), mdrive_root=str(mdrive))
+    ctx.config["logic"].update(vehicle="XZB", version=str(version_dir))
+    monkeypatch.setattr(EnvState, "container_id", lambda self: "c0ffee")
+    return EnvState(ctx)
+
+
+def test_find_version_file(tmp_path):
+    assert find_version_file(None) is None
+    assert find_version_file(tmp_path) is None
+    (tmp_path / "version_b.txt").write_text("b")
+    (tmp_path / "version_a.txt").write_text("a")
+    assert find_version_file(tmp_path).name == "version_a.txt"
+    (tmp_path / "version.txt").write_text("t")
+    assert find_version_file(tmp_path).name == "version.txt"
+    (tmp_path / "version.json").write_text("{}")
+    assert find_version_file(tmp_path).name == "version.json"
+    assert find_version_file(tmp_path / "version_b.txt").name == "version_b.txt"
+
+
+def test_saved_fingerprint_is_current(state):
+    assert not state.is_current()
+    state.save()
+    assert state.is_current()
+    state.invalidate()
+    assert not state.is_current()
+    state.invalidate()
+
+
+def test_version_file_change_invalidates(state):
+    state.save()
+    version_file = find_version_file(state.ctx.config["logic"]["version"])
+    before = state.fingerprint()
+    version_file.write_text(json.dumps({"version": "1.1"}), encoding="utf-8")
+    assert state.fingerprint()["version"] != before["version"]
+    assert not state.is_current()
+
+
+def test_other_version_dir_invalidates(state, tmp_path):
+    state.save()
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "version.json").write_text(json.dumps({"version": "2.0"}), encoding="utf-8")
+    state.ctx.config["logic"]["version"] = str(other)
+    assert not state.is_current()
+
+
+def test_vehicle_change_invalidates(state):
+    state.save()
+    before = state.fingerprint()
+    # 状态文件跨车辆共享，换车后指纹不同
+    other = EnvState(state.ctx.derive("XZC", "20260101"))
+    assert other.state_file == state.state_file
+    assert other.fingerprint()["vehicle"] == "XZC"
+    assert {k: v for k, v in other.fingerprint().items() if k != "vehicle"} == {
+        k: v for k, v in before.items() if k != "vehicle"
+    }
+    assert not other.is_current()
+    assert state.is_current()
+
+
+def test_container_and_vmc_changes_invalidate(state, monkeypatch):
+    state.save()
+    with open(f"{state.ctx.config['host']['mdrive_root']}/vmc.sh", "a", encoding="utf-8") as f:
+        f.write("echo v2\n")
+    assert not state.is_current()
+    state.save()
+    monkeypatch.setattr(EnvState, "container_id", lambda self: "d00d")
+    assert not state.is_current()
+
+
+def test_not_current_without_version_or_container(state, monkeypatch):
+    state.save()
+    monkeypatch.setattr(EnvState, "container_id", lambda self: "")
+    assert not state.is_current()
+    state.ctx.config["logic"]["version"] = None
+    assert state.fingerprint() is None
+    assert not state.is_current()
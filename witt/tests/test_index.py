@@ -0,0 +1,124 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+from conftest import DATE, WITT_DIR
+from core.context import TaskContext
+from core.index import RecordIndex
+from core.session import DEFAULT_CONFIG_PATH
+from utils import parser
+
+
+def reference_query(records, tag_sec, before, after):
+    """find_record.sh 的匹配逻辑逐行移植：按分钟分桶取候选，再精确筛选"""
+    buckets = {}
+    for sec, path in records:
+        buckets.setdefault(sec // 60, []).append((sec, path))
+    start_sec, end_sec = tag_sec - before, tag_sec + after
+    start_min = int((start_sec - 60) / 60)  # bash 整除向零取整
+    candidates = []
+    for m in range(start_min, end_sec // 60 + 1):
+        candidates.extend(buckets.get(m, []))
+    last_before, in_window = {}, []
+    for sec, path in sorted(candidates):
+        if sec >= end_sec:
+            continue
+        soc = "soc1" if "soc1" in path else "soc2" if "soc2" in path else "unknown"
+        if sec >= start_sec:
+            in_window.append(path)
+        else:
+            last_before[soc] = path
+    return set(last_before.values()), in_window
+
+
+@pytest.fixture
+def index():
+    ctx = TaskContext(DEFAULT_CONFIG_PATH)
+    ctx.config["logic"].update(target_date=DATE, soc="soc")
+    return RecordIndex(ctx)
+
+
+def layout():
+    """两个 SOC 的 record：时长不一、跨分钟、有空档，soc2 相对 soc1 错开几秒"""
+    starts = {"soc1": [], "soc2": []}
+    sec = 10 * 3600
+    for length in [60, 60, 45, 20, 20, 90, 5, 60, 300, 60, 30, 30, 60]:
+        starts["soc1"].append(sec)
+        starts["soc2"].append(sec + 3)
+        sec += length
+    records = []
+    for soc, secs in starts.items():
+        for s in secs:
+            hh, mm, ss = s // 3600, s % 3600 // 60, s % 60
+            name = f"{DATE}100000.record.{len(records):05d}.{hh:02d}{mm:02d}{ss:02d}"
+            records.append((s, f"/data/{DATE}_{soc}/{name}"))
+    return records
+
+
+@pytest.mark.parametrize("before, after", [(15, 0), (15, 5), (0, 0), (90, 30), (61, 61)])
+def test_query_matches_find_record(index, before, after):
+    index.ctx.config["logic"].update(before=before, after=after)
+    records = layout()
+    data = {"dirs": {}}
+    for sec, path in records:
+        entry = data["dirs"].setdefault(os.path.dirname(path), {"records": []})
+        entry["records"].append([os.path.basename(path), sec])
+    rows = index._records(data)
+    first, last = records[0][0], max(sec for sec, _ in records)
+    tag_secs = list(range(first - 120, last + 180, 7))
+    # 恰好落在 record 起点、窗口边界上的 tag
+    tag_secs += [sec + d for sec, _ in records for d in (before, -after, before - 60, 0)]
+    for tag_sec in tag_secs:
+        matched = index.query(rows, tag_sec)
+        before_files, in_window = reference_query(records, tag_sec, before, after)
+        assert set(matched[: len(before_files)]) == before_files, tag_sec
+        assert matched[len(before_files):] == in_window, tag_sec
+
+
+@pytest.mark.skipif(not shutil.which("findmnt"), reason="find_record.sh 需要 findmnt")
+@pytest.mark.parametrize("before, after", [(15, 0), (30, 10)])
+def test_search_matches_find_record_script(local_session, tmp_path, before, after):
+    session, dataset = local_session
+    ctx = session.ctx
+    ctx.config["logic"].update(before=before, after=after)
+    script_manifest = tmp_path / "script_tasks.txt"
+    env = ctx.get_env_vars()
+    env["MANIFEST_PATH"] = str(script_manifest)
+    subprocess.run(
+        ["bash", str(WITT_DIR / "scripts" / "find_record.sh")],
+        env=env, check=True, capture_output=True,
+    )
+    session.index.search()
+
+    def rows(path):
+        return [(t["time"], t["name"], sorted(t["paths"])) for t in parser.parse_manifest(path)]
+
+    expected = rows(script_manifest)
+    assert len(expected) == dataset["tags"]
+    assert rows(ctx.manifest_path) == expected
+
+
+def test_refresh_rescans_only_changed_dirs(local_session, monkeypatch):
+    session, _ = local_session
+    index = session.index
+    data_root = session.ctx.config["host"]["data_root"]
+    first = index.refresh(data_root)
+    scanned = []
+    original = RecordIndex._scan_dir
+    monkeypatch.setattr(
+        RecordIndex, "_scan_dir", lambda self, path: scanned.append(path) or original(self, path)
+    )
+    assert index.refresh(data_root)["dirs"] == first["dirs"]
+    assert scanned == []
+
+    soc1 = Path(data_root) / f"{DATE}_soc1"
+    shutil.copy(next(soc1.glob("*.record.*")), soc1 / f"{DATE}100000.record.00099.120000")
+    os.utime(soc1, (0, os.stat(soc1).st_mtime + 1))
+    data = index.refresh(data_root)
+    assert scanned == [str(soc1)]
+    names = [name for name, _ in data["dirs"][str(soc1)]["records"]]
+    assert f"{DATE}100000.record.00099.120000" in names
@@ -0,0 +1,165 @@
+import json
+import random
+
+import pytest
+
+import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+from conftest import DATE
+from core.context import TaskContext
+from core.engine.planner import DEFAULTS, MB, MIN_SAMPLES, SplitPlanner, _fit, _solve, makespan
+from core.session import DEFAULT_CONFIG_PATH
+from utils import parser
+
+
+@pytest.fixture
+def ctx(tmp_path):
+    ctx = TaskContext(DEFAULT_CONFIG_PATH)
+    ctx.config["host"]["dest_root"] = str(tmp_path / "dest")
+    ctx.config["logic"].update(vehicle="XZB", target_date=DATE, blacklist=[])
+    return ctx
+
+
+def write_trace(ctx, spans, name="trace_1.jsonl"):
+    log_dir = ctx.work_dir / ".witt" / "log"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    with open(log_dir / name, "w", encoding="utf-8") as f:
+        for s in spans:
+            f.write(json.dumps(s) + "\n")
+
+
+def batch_span(backend, src_mb, window_mb, blacklist, coef, **extra):
+    a, b, c, d = coef
+    dur = a + b * src_mb + c * window_mb + d * window_mb * blacklist
+    return dict(
+        name="slice.batch", backend=backend, bytes_in=int(src_mb * MB),
+        window_bytes=int(window_mb * MB), blacklist=blacklist, dur=dur, **extra,
+    )
+
+
+def test_solve():
+    assert _solve([[2.0, 1.0], [1.0, 3.0]], [5.0, 10.0]) == pytest.approx([1.0, 3.0])
+    # 首列为 0 时需要换主元
+    assert _solve([[0.0, 1.0], [1.0, 0.0]], [2.0, 3.0]) == pytest.approx([3.0, 2.0])
+    assert _solve([[1.0, 2.0], [2.0, 4.0]], [1.0, 2.0]) is None
+
+
+def test_fit_recovers_coefficients():
+    rng = random.Random(1)
+    coef = [0.2, 0.01, 0.03, 0.004]
+    rows = [[1.0, rng.uniform(10, 500), rng.uniform(1, 50), rng.randrange(0, 5)] for _ in range(30)]
+    rows = [[1.0, s, w, w * n] for _, s, w, n in rows]
+    y = [sum(c * x for c, x in zip(coef, r)) for r in rows]
+    assert _fit(rows, y) == pytest.approx(coef)
+    # 带噪声时仍接近真实值
+    noisy = [v * rng.uniform(0.98, 1.02) for v in y]
+    assert _fit(rows, noisy) == pytest.approx(coef, rel=0.2)
+
+
+def test_fit_rejects_negative_coefficients():
+    rows = [[1.0, float(s)] for s in range(1, 10)]
+    assert _fit(rows, [10.0 - s for s in range(1, 10)]) is None
+
+
+def test_makespan():
+    assert makespan([], 2) == 0
+    # 同一组耗时，长的先派发总耗时更短
+    assert makespan([4, 3, 3, 2], 2) == 6
+    assert makespan([2, 3, 3, 4], 2) == 7
+    assert makespan([1, 2, 3], 0) == 6
+
+
+def test_defaults_without_history(ctx):
+    planner = SplitPlanner(ctx)
+    overhead, mbps = DEFAULTS["native"]
+    assert planner.model("native") == [overhead, 1.0 / mbps, 0.0, 0.0]
+    assert planner.model("unknown") == planner.model("docker")
+    assert planner.estimate("native", 400 * MB, 10 * MB, 3) == pytest.approx(overhead + 400 / mbps)
+
+
+def test_too_few_samples_fall_back_to_defaults(ctx):
+    coef = [0.5, 0.02, 0.1, 0.01]
+    write_trace(ctx, [batch_span("native", 10 + i, 1 + i % 3, 1, coef) for i in range(MIN_SAMPLES - 1)])
+    planner = SplitPlanner(ctx)
+    assert planner.model("native") == [DEFAULTS["native"][0], 1.0 / DEFAULTS["native"][1], 0.0, 0.0]
+    assert planner.samples == {"native": MIN_SAMPLES - 1}
+
+
+def test_calibrates_from_trace_history(ctx):
+    rng = random.Random(2)
+    coef = [0.5, 0.02, 0.1, 0.01]
+    spans = [
+        batch_span("docker", rng.uniform(50, 600), rng.uniform(2, 40), rng.randrange(0, 4), coef)
+        for _ in range(20)
+    ]
+    # 失败的批次与其他埋点不参与标定
+    spans.append(batch_span("docker", 100, 10, 0, [100, 0, 0, 0], exit_code=1))
+    spans.append(batch_span("docker", 100, 10, 0, [100, 0, 0, 0], error="OSError"))
+    spans.append({"name": "docker.exec", "dur": 50})
+    write_trace(ctx, spans[:10], "trace_1.jsonl")
+    write_trace(ctx, spans[10:], "trace_2.jsonl")
+    planner = SplitPlanner(ctx)
+    assert planner.model("docker") == pytest.approx(coef, rel=1e-3)
+    assert planner.samples == {"docker": 20}
+    # 其他后端仍用默认模型
+    assert planner.model("native")[2:] == [0.0, 0.0]
+
+
+def test_collinear_windows_fit_source_size_only(ctx):
+    # 车端切片的窗口字节数与源文件相同，只能按源文件大小拟合
+    spans = [batch_span("remote", s, s, 0, [1.0, 0.05, 0.0, 0.0]) for s in range(10, 200, 15)]
+    write_trace(ctx, spans)
+    assert SplitPlanner(ctx).model("remote") == pytest.approx([1.0, 0.05, 0.0, 0.0])
+
+
+def test_corrupt_trace_skipped(ctx):
+    rng = random.Random(3)
+    coef = [0.5, 0.02, 0.1, 0.01]
+    spans = [
+        batch_span("native", rng.uniform(50, 600), rng.uniform(2, 40), rng.randrange(0, 4), coef)
+        for _ in range(11)
+    ]
+    write_trace(ctx, spans)
+    log_dir = ctx.work_dir / ".witt" / "log"
+    (log_dir / "trace_bad.jsonl").write_text("{not json\n", encoding="utf-8")
+    planner = SplitPlanner(ctx)
+    assert planner.model("native") == pytest.approx(coef, rel=1e-3)
+    assert planner.samples["native"] == 11
+
+
+def test_estimate_batch_and_order(ctx):
+    planner = SplitPlanner(ctx)
+    downloader = type("D", (), {"backend": "docker"})()
+
+    def batch(src_mb, windows, window_mb):
+        return [
+            {"src": f"{src_mb}", "src_bytes": src_mb * MB, "bytes": window_mb * MB, "downloader": downloader}
+            for _ in range(windows)
+        ]
+
+    # 窗口总量超过源文件时按源文件大小封顶
+    assert planner.estimate_batch(batch(10, 5, 10)) == planner.estimate("docker", 10 * MB, 10 * MB, 0)
+    batches = [batch(50, 1, 5), batch(500, 1, 5), batch(5, 3, 1)]
+    assert [b[0]["src"] for b in planner.order(batches)] == ["500", "50", "5"]
+
+
+def test_describe_from_manifest(local_session):
+    session, _ = local_session
+    session.index.search()
+    tasks = [t for t in parser.parse_manifest(session.ctx.manifest_path) if t["paths"]]
+    text = session.planner.describe(tasks, "native")
+    sources = {p for t in tasks for p in t["paths"]}
+    assert f"预计读取 {len(sources)} 个源文件" in text and "默认吞吐" in text
+    assert session.planner.describe([], "native") == ""
+
+
+def test_download_trace_feeds_planner(local_session):
+    session, _ = local_session
+    session.index.search()
+    tasks = [t for t in parser.parse_manifest(session.ctx.manifest_path) if t["paths"]]
+    stats = session.downloader.download_record(tasks)
+    assert stats["failed"] == 0
+    session.flush_trace()
+    planner = SplitPlanner(session.ctx)
+    planner.model("native")
+    sources = {p for t in tasks for p in t["paths"]}
+    assert planner.samples.get("native", 0) >= len(sources)
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from core.process import ProcessExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = ProcessExecutor(kill_grace=0.5)
+    yield executor
+    executor.close()
+
+
+def alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # 已退出但尚未被回收的僵尸进程视为结束
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+            return f.read().split()[2] != "Z"
+    except OSError:
+        return False
+
+
+def wait_dead(pid: int, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return not alive(pid)
+
+
+# bash 在后台再起一个子进程，只结束 bash 本身时它会残留
+SPAWN_CHILD = "sleep 30 & echo $!; wait"
+
+
+def test_lines_stream_before_exit(executor):
+    script = "import time\nfor i in range(3):\n    print(i, flush=True)\n    time.sleep(0.2)\n"
+    seen = []
+    t0 = time.monotonic()
+    stdout = executor.run(
+        [sys.executable, "-c", script], on_line=lambda line: seen.append((line, time.monotonic()))
+    )
+    assert stdout == "0\n1\n2\n"
+    assert [line for line, _ in seen] == ["0", "1", "2"]
+    # 第一行在命令结束前就已送达
+    assert seen[0][1] - t0 < time.monotonic() - t0 - 0.3
+
+
+def test_long_line_exceeds_default_stream_limit(executor):
+    stdout = executor.run([sys.executable, "-c", "print('x' * 200000)"])
+    assert stdout == "x" * 200000 + "\n"
+
+
+def test_failure_raises_called_process_error(executor):
+    with pytest.raises(subprocess.CalledProcessError) as info:
+        executor.run(["bash", "-c", "echo out; echo err >&2; exit 3"])
+    assert info.value.returncode == 3
+    assert info.value.output == "out\n"
+    assert info.value.stderr == "err\n"
+
+
+def test_timeout_kills_process_group(executor):
+    pids = []
+    with pytest.raises(subprocess.TimeoutExpired):
+        executor.run(["bash", "-c", SPAWN_CHILD], timeout=0.5, on_line=lambda l: pids.append(int(l)))
+    assert pids and wait_dead(pids[0])
+
+
+def test_cancel_all_kills_running_commands(executor):
+    pids, errors = [], []
+    started = threading.Event()
+
+    def on_line(line):
+        pids.append(int(line))
+        started.set()
+
+    def worker():
+        try:
+            executor.run(["bash", "-c", SPAWN_CHILD], on_line=on_line)
+        except CancelledError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert started.wait(5)
+    executor.cancel_all()
+    thread.join(5)
+    assert errors
+    assert wait_dead(pids[0])
@@ -0,0 +1,31 @@
+import struct
+
+import pytest
+
+from core.cyber.proto import field_bytes, field_varint, iter_fields
+
+
+def test_round_trip():
+    buf = field_varint(1, 300) + field_bytes(2, b"abc") + b"\x19" + struct.pack("<Q", 7)
+    fields = [(no, wire, v if isinstance(v, int) else bytes(v)) for no, wire, v in iter_fields(buf)]
+    assert fields == [(1, 0, 300), (2, 2, b"abc"), (3, 1, 7)]
+
+
+@pytest.mark.parametrize(
+    "buf",
+    [
+        b"\x09\x01\x02",  # 截断的 fixed64
+        b"\x0d\x01",  # 截断的 fixed32
+        b"\x0a\x05ab",  # 截断的 length-delimited
+        b"\x08\xff",  # 截断的 varint
+    ],
+)
+def test_truncated_fields_raise_value_error(buf):
+    with pytest.raises(ValueError):
+        list(iter_fields(buf))
+
+
+def test_fixed_field_respects_end():
+    buf = b"\x0d\x01\x02\x03\x04"
+    with pytest.raises(ValueError):
+        list(iter_fields(buf, 0, 3))
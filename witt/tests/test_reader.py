@@ -0,0 +1,85 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from bench.synth import write_record
+from core.cyber.reader import SECTION_CHANNEL, RecordReader, read_record_info
+from utils import parser
+
+BEGIN = datetime(2026, 1, 1, 10, 0, 0)
+CHANNELS = ["/mdrive/control/cmd", "/mdrive/planning/trajectory", "/mdrive/sensor/lidar/top"]
+
+
+@pytest.fixture
+def record(tmp_path):
+    path = tmp_path / "20260101100000.record.00000.100000"
+    write_record(path, BEGIN, seconds=12, channels=CHANNELS, rate=5, payload=32, chunk_seconds=5)
+    return path
+
+
+def test_header_matches_written_record(record):
+    with RecordReader(str(record)) as reader:
+        header = reader.header
+    assert header["is_complete"] == 1
+    assert header["chunk_number"] == 3
+    assert header["channel_number"] == len(CHANNELS)
+    assert header["message_number"] == 12 * 5 * len(CHANNELS)
+    assert header["size"] == os.path.getsize(record)
+    assert header["begin_time"] == int(BEGIN.timestamp()) * 10**9
+
+
+def test_info_channels_and_counts(record):
+    info = read_record_info(str(record))
+    assert info["begin"] == BEGIN
+    assert info["duration"] == 11
+    assert info["channels"] == [{"name": ch, "count": 12 * 5} for ch in sorted(CHANNELS)]
+
+
+@pytest.mark.parametrize("keep", [0, 10, 2000, 0.5])
+def test_truncated_record_raises_value_error(record, keep):
+    size = os.path.getsize(record)
+    with open(record, "r+b") as f:
+        f.truncate(int(size * keep) if isinstance(keep, float) else keep)
+    with pytest.raises(ValueError):
+        read_record_info(str(record))
+
+
+def test_record_without_index_raises_value_error(record):
+    # 仍在写入的 record：Header 尚未回填，index_position / is_complete 缺失
+    with open(record, "r+b") as f:
+        f.write(b"\0" * 2064)
+    with pytest.raises(ValueError):
+        read_record_info(str(record))
+
+
+def cyber_recorder_info(path) -> str:
+    """按 cyber_recorder info 的格式列出索引中的全部频道（真实命令不做过滤）"""
+    with RecordReader(str(path)) as reader:
+        header = reader.header
+        names = [
+            (e["cache"][2].decode(), e["cache"][1])
+            for e in reader.index
+            if e["type"] == SECTION_CHANNEL
+        ]
+    begin, end = header["begin_time"] // 10**9, header["end_time"] // 10**9
+    lines = [
+        f"record_file:    {path}",
+        f"duration:       {(header['end_time'] - header['begin_time']) / 1e9:.6f} Seconds",
+        f"begin_time:     {datetime.fromtimestamp(begin):%Y-%m-%d-%H:%M:%S}",
+        f"end_time:       {datetime.fromtimestamp(end):%Y-%m-%d-%H:%M:%S}",
+    ]
+    prefix = "channel_info:   "
+    for name, count in names:
+        lines.append(f"{prefix}{name:<60}{count:>8} messages: pb.Msg")
+        prefix = " " * 16
+    return "\n".join(lines) + "\n"
+
+
+def test_native_info_matches_cyber_recorder_output(tmp_path):
+    path = tmp_path / "20260101100000.record.00000.100000"
+    channels = CHANNELS + ["/apollo/sensor/gnss", "/apollo/mdrive/bridge", "/mdrive/debug-raw"]
+    write_record(path, BEGIN, seconds=7, channels=channels, rate=2, payload=8, chunk_seconds=5)
+    native = read_record_info(str(path))
+    assert native == parser.parse_record_info(cyber_recorder_info(path))
+    assert [ch["name"] for ch in native["channels"]] == sorted(CHANNELS)
@@ -0,0 +1,148 @@
+import os
+import stat
+import sys
+
+import pytest
+
+import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+from bench.synth import generate
+from conftest import WITT_DIR
+from core.session import AppSession
+from core.engine.scheduler import JobScheduler
+from core.transport import LocalTransport, Transport
+from utils import parser
+
+DATE = "20260101"
+
+FAKE_RECORDER = f"""#!{sys.executable}
+import sys
+sys.path.insert(0, {str(WITT_DIR)!r})
+import interface.cli
+from bench.fake_recorder import FakeExecutor
+FakeExecutor._split(type("Fake", (), {{"split_mbps": 10000}})(), sys.argv[2:])
+"""
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    """本地目录模拟车端 soc1，PATH 中的 cyber_recorder 由本地模拟实现代替"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    recorder = bin_dir / "cyber_recorder"
+    recorder.write_text(FAKE_RECORDER, encoding="utf-8")
+    recorder.chmod(recorder.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    soc_root = tmp_path / "vehicle soc1"
+    generate(soc_root, DATE, socs=1, records=4, tags=3, channels=3, rate=5, payload=64)
+    session = AppSession()
+    config = session.ctx.config
+    config["remote"].update(
+        transport="local", hosts={"soc1": str(soc_root)}, tmp_dir=str(tmp_path / "remote tmp")
+    )
+    config["logic"].update(soc="soc", before=15, after=0, blacklist=[])
+    config["host"]["dest_root"] = str(tmp_path / "dest")
+    session = session.derive("XZB", DATE)
+    session.remote.search()
+    tasks = [t for t in parser.parse_manifest(session.ctx.manifest_path) if t["paths"]]
+    return session, tasks, tmp_path / "remote tmp"
+
+
+def test_search_lists_remote_records(remote):
+    _, tasks, _ = remote
+    assert len(tasks) == 3
+    for task in tasks:
+        assert list(task["soc_paths"]) == ["soc1"]
+        assert all(p.startswith("soc1:") for p in task["paths"])
+        assert all(f["size"] for f in task["files"]["soc1"])
+
+
+def test_slice_fetch_and_skip_unchanged(remote):
+    session, tasks, remote_tmp = remote
+    stats = session.remote.download_record(tasks)
+    assert stats["failed"] == 0 and stats["sliced"] == stats["total"] > 0
+    outputs = list(session.ctx.work_dir.rglob("*.split"))
+    assert len(outputs) == stats["total"]
+    assert all(o.stat().st_size > 0 for o in outputs)
+    assert not list(remote_tmp.iterdir())
+    # 输入未变化，再次运行全部跳过
+    again = session.remote.download_record(tasks)
+    assert again["skipped"] == again["total"] and again["sliced"] == 0
+
+
+def test_interrupted_fetch_resumes(remote, monkeypatch):
+    session, tasks, remote_tmp = remote
+    original = LocalTransport.fetch
+
+    def interrupted(self, remote_path, local_path):
+        # 只传一半就断开
+        part = local_path.with_name(local_path.name + ".part")
+        part.parent.mkdir(parents=True, exist_ok=True)
+        data = open(remote_path, "rb").read()
+        part.write_bytes(data[: len(data) // 2])
+        raise OSError("connection lost")
+
+    monkeypatch.setattr(LocalTransport, "fetch", interrupted)
+    stats = session.remote.download_record(tasks)
+    assert stats["sliced"] == 0 and stats["failed"] == stats["total"]
+    # 车端切片保留，本地留有 .part
+    assert len(list(remote_tmp.iterdir())) == stats["total"]
+    parts = list(session.ctx.work_dir.rglob("*.split.part"))
+    assert len(parts) == stats["total"]
+
+    resumed = []
+
+    def tracking(self, remote_path, local_path):
+        part = local_path.with_name(local_path.name + ".part")
+        if local_path.suffix == ".split":
+            resumed.append(part.stat().st_size if part.exists() else 0)
+        return original(self, remote_path, local_path)
+
+    monkeypatch.setattr(LocalTransport, "fetch", tracking)
+    stats = session.remote.download_record(tasks)
+    assert stats["failed"] == 0 and stats["sliced"] == stats["total"]
+    assert resumed and all(offset > 0 for offset in resumed)
+    assert not list(session.ctx.work_dir.rglob("*.split.part"))
+    assert not list(remote_tmp.iterdir())
+
+
+def test_local_transport_fetch_appends_to_part(tmp_path):
+    src = tmp_path / "remote file"
+    src.write_bytes(os.urandom(4096))
+    dest = tmp_path / "local" / "out"
+    dest.parent.mkdir()
+    dest.with_name("out.part").write_bytes(src.read_bytes()[:1000])
+    assert LocalTransport(str(tmp_path)).fetch(str(src), dest) == 4096
+    assert dest.read_bytes() == src.read_bytes()
+
+
+def test_transport_is_abstract():
+    with pytest.raises(TypeError):
+        Transport()
+
+    class Partial(Transport):
+        def run(self, cmd, timeout=None):
+            return ""
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_context_manager_closes_transports(remote, monkeypatch):
+    session, _, _ = remote
+    closed = []
+    monkeypatch.setattr(LocalTransport, "close", lambda self: closed.append(self.data_root))
+    with session.remote as slicer:
+        slicer.transport("soc1")
+    assert len(closed) == 1
+    # 关闭后再用会重新建立连接
+    assert session.remote.transport("soc1") is not None
+
+
+def test_scheduler_closes_remote_connections(remote, monkeypatch):
+    session, _, _ = remote
+    closed = []
+    monkeypatch.setattr(LocalTransport, "close", lambda self: closed.append(self.data_root))
+    reports = JobScheduler(session, remote=True).run([{"vehicle": "XZB", "start": DATE}])
+    assert reports[0]["status"] == "ok" and reports[0]["files"]["sliced"] > 0
+    assert len(closed) == 1
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+
+import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+from conftest import DATE
+from core.engine.dowloader import RecordDownloader
+from core.engine.scheduler import JobScheduler, expand_dates
+
+MB = 2**20
+
+
+class FakeDownloader:
+    """记录派发顺序与各存储源的并发数，按源文件名决定是否抛异常"""
+
+    backend = "native"
+
+    def __init__(self, scheduler, delay=0.0, fail=()):
+        self.scheduler = scheduler
+        self.delay = delay
+        self.fail = set(fail)
+        self.order = []
+        self.running = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+
+    def run_batch(self, batch, upcoming=(), monitor=None):
+        src = batch[0]["src"]
+        source = self.scheduler.source_of(src)
+        with self._lock:
+            self.order.append(src)
+            self.running[source] = self.running.get(source, 0) + 1
+            self.peak[source] = max(self.peak.get(source, 0), self.running[source])
+        try:
+            time.sleep(self.delay)
+            if src in self.fail:
+                raise RuntimeError("boom")
+            return [True] * len(batch)
+        finally:
+            with self._lock:
+                self.running[source] -= 1
+
+    def complete(self, item, ok, stats):
+        stats["sliced" if ok else "failed"] += 1
+
+
+def make_scheduler(session, workers, per_source, limits=None):
+    config = session.ctx.config
+    config["pipeline"]["workers"] = workers
+    config["scheduler"] = {"per_source": per_source, "source_limits": limits or {}}
+    return JobScheduler(session)
+
+
+def fake_plan(scheduler, downloader, sources):
+    """sources: {源文件: (MB, 窗口数)}，一次性产出全部批次"""
+    report = {"vehicle": "XZB", "date": DATE, "status": "ok", "tags": 1}
+    report["files"] = {"total": 0, "sliced": 0, "skipped": 0, "failed": 0}
+    batches = []
+    for src, (size, windows) in sources.items():
+        batch = [
+            {"src": src, "src_bytes": size * MB, "bytes": size * MB // windows,
+             "downloader": downloader, "report": report}
+            for _ in range(windows)
+        ]
+        report["files"]["total"] += windows
+        batches.append(batch)
+
+    def plan(jobs, reports):
+        reports.append(report)
+        yield batches
+
+    scheduler.plan = plan
+    return report
+
+
+def test_expand_dates():
+    assert expand_dates("20251230", "20260102") == ["20251230", "20251231", "20260101", "20260102"]
+    assert expand_dates(DATE, DATE) == [DATE]
+
+
+def test_source_of_prefers_longest_configured_prefix(local_session):
+    session, _ = local_session
+    scheduler = make_scheduler(session, 4, 2, {"/nas": 3, "/nas/fast/": 1})
+    assert scheduler.source_of("/nas/fast/a.record") == "/nas/fast"
+    assert scheduler.source_of("/nas/slow/a.record") == "/nas"
+    assert scheduler.source_of("/nasty/a.record") != "/nas"
+    assert scheduler.limit_of("/nas/fast") == 1
+    assert scheduler.limit_of("/other") == 2
+
+
+def test_per_source_limits(local_session):
+    session, _ = local_session
+    scheduler = make_scheduler(session, 6, 2, {"/nasA": 1, "/nasB": 3})
+    downloader = FakeDownloader(scheduler, delay=0.05)
+    sources = {f"/nas{s}/{i}.record": (10, 1) for s in "ABC" for i in range(5)}
+    report = fake_plan(scheduler, downloader, sources)
+    scheduler.run([{"vehicle": "XZB", "start": DATE}])
+    # /nasC 不在配置中，归入所在挂载点，使用 per_source
+    assert downloader.peak == {"/nasA": 1, "/nasB": 3, scheduler.source_of("/nasC/0.record"): 2}
+    assert report["files"]["sliced"] == len(sources) and report["status"] == "ok"
+
+
+def test_longest_batches_dispatched_first(local_session):
+    session, _ = local_session
+    scheduler = make_scheduler(session, 1, 1, {"/nasA": 1})
+    downloader = FakeDownloader(scheduler)
+    # 源文件大小决定预计耗时，窗口数只影响切出的数据量
+    sources = {"/nasA/small": (5, 3), "/nasA/large": (500, 1), "/nasA/mid": (50, 2)}
+    fake_plan(scheduler, downloader, sources)
+    scheduler.run([{"vehicle": "XZB", "start": DATE}])
+    assert downloader.order == ["/nasA/large", "/nasA/mid", "/nasA/small"]
+
+
+def test_planner_order_is_lpt(local_session):
+    session, _ = local_session
+    downloader = FakeDownloader(None)
+    batches = [
+        [{"src": name, "src_bytes": size * MB, "bytes": MB, "downloader": downloader}]
+        for name, size in [("a", 5), ("b", 500), ("c", 50)]
+    ]
+    ordered = session.planner.order(batches)
+    assert [b[0]["src"] for b in ordered] == ["b", "c", "a"]
+
+
+def test_raising_batch_counted_as_failed(local_session):
+    session, _ = local_session
+    scheduler = make_scheduler(session, 2, 2, {"/nasA": 2})
+    downloader = FakeDownloader(scheduler, fail={"/nasA/bad"})
+    sources = {"/nasA/good": (10, 2), "/nasA/bad": (20, 3), "/nasA/other": (5, 1)}
+    report = fake_plan(scheduler, downloader, sources)
+    reports = scheduler.run([{"vehicle": "XZB", "start": DATE}])
+    assert reports == [report]
+    assert report["status"] == "failed"
+    assert report["files"]["failed"] == 3
+    assert report["files"]["sliced"] == 3
+
+
+def test_run_reports_raising_source_on_real_data(local_session, monkeypatch):
+    session, dataset = local_session
+    original = RecordDownloader.run_batch
+
+    def run_batch(self, batch, upcoming=(), monitor=None):
+        if "_soc1" in str(batch[0]["src"]):
+            raise OSError("nas gone")
+        return original(self, batch, upcoming, monitor)
+
+    monkeypatch.setattr(RecordDownloader, "run_batch", run_batch)
+    scheduler = make_scheduler(session, 2, 2)
+    [report] = scheduler.run([{"vehicle": "XZB", "start": DATE}])
+    files = report["files"]
+    assert report["status"] == "failed" and report["tags"] == dataset["tags"]
+    assert files["failed"] > 0 and files["sliced"] > 0
+    assert files["failed"] + files["sliced"] == files["total"]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_run_slices_every_window(local_session, workers):
+    session, dataset = local_session
+    scheduler = make_scheduler(session, workers, 2)
+    [report] = scheduler.run([{"vehicle": "XZB", "start": DATE}])
+    files = report["files"]
+    assert report["status"] == "ok" and report["tags"] == dataset["tags"]
+    assert files["sliced"] == files["total"] > 0 and files["failed"] == 0
@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+
+import pytest
+
+import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+from core.context import TaskContext
+from core.services import ServiceManager
+from core.session import DEFAULT_CONFIG_PATH
+
+
+class FakeContainer:
+    """模拟容器：supervisorctl status 按 running 输出，start/restart 命令会把进程置为运行"""
+
+    def __init__(self, running, programs, up=True):
+        self.up = up
+        self.running = set(running)
+        self.programs = programs
+        self.commands = []
+        self.process = SimpleNamespace(run=lambda cmd, timeout=None: self.commands.append(cmd))
+
+    def execute(self, cmd, timeout=None):
+        if "supervisorctl status" in cmd:
+            return "".join(
+                f"{p:<30} {'RUNNING' if p in self.running else 'STOPPED'}   pid 1, uptime 0:01:00\n"
+                for p in self.programs
+            )
+        self.commands.append(cmd)
+        for part in cmd.split(" && "):
+            words = part.split()
+            if words[:3] in (["sudo", "supervisorctl", "start"], ["sudo", "supervisorctl", "restart"]):
+                self.running.add(words[3])
+        return ""
+
+    def started(self, action):
+        return [
+            part.split()[-1]
+            for cmd in self.commands
+            if isinstance(cmd, str)
+            for part in cmd.split(" && ")
+            if part.startswith(f"sudo supervisorctl {action} ")
+        ]
+
+
+@pytest.fixture
+def make_services(tmp_path, monkeypatch):
+    def make(running, ports=None, up=True):
+        ctx = TaskContext(DEFAULT_CONFIG_PATH)
+        ctx.config["host"]["mdrive_root"] = str(tmp_path)
+        ctx.config["services"] = {
+            "supervisor": ["Dreamview", "Debug_Driver-LiDAR", "Perception"],
+            "ports": {"dreamview": 8888, "multiviz": 9001},
+            "health_ttl": 60,
+            "ready_timeout": 0.5,
+        }
+        container = FakeContainer(running, ctx.config["services"]["supervisor"], up)
+        probes = {"container": 0, "ports": 0}
+
+        def container_id():
+            probes["container"] += 1
+            return "c0ffee" if container.up else ""
+
+        def run_docker():
+            container.up = True
+
+        session = SimpleNamespace(
+            ctx=ctx,
+            executor=container,
+            env_state=SimpleNamespace(container_id=container_id, invalidate=lambda: None),
+            runner=SimpleNamespace(run_docker=run_docker),
+        )
+        services = ServiceManager(session)
+        open_ports = dict(ports or {"dreamview": True, "multiviz": True})
+
+        def port_open(port, host="127.0.0.1", timeout=0.3):
+            probes["ports"] += 1
+            name = next(n for n, p in services.ports.items() if p == port)
+            return open_ports[name]
+
+        monkeypatch.setattr(services, "port_open", port_open)
+        monkeypatch.setattr(services, "open_browser", lambda: None)
+        return services, container, probes
+
+    return make
+
+
+def test_healthy_services_untouched(make_services):
+    services, container, _ = make_services(["Dreamview", "Debug_Driver-LiDAR", "Perception"])
+    health = services.ensure()
+    assert container.commands == []
+    assert all(health["supervisor"].values()) and health["container"]
+
+
+def test_restarts_only_down_programs(make_services):
+    services, container, _ = make_services(["Dreamview"])
+    health = services.ensure()
+    assert container.started("start") == ["Debug_Driver-LiDAR", "Perception"]
+    assert container.started("restart") == []
+    assert len(container.commands) == 1
+    assert all(health["supervisor"].values())
+
+
+def test_restart_flag_restarts_all(make_services):
+    services, container, _ = make_services(["Dreamview", "Debug_Driver-LiDAR"])
+    services.ensure(restart=True)
+    assert container.started("restart") == ["Dreamview", "Debug_Driver-LiDAR", "Perception"]
+    assert container.started("start") == []
+
+
+def test_stopped_container_is_started(make_services):
+    services, container, _ = make_services([], up=False)
+    health = services.ensure()
+    assert container.up and health["container"]
+    assert container.started("start") == ["Dreamview", "Debug_Driver-LiDAR", "Perception"]
+
+
+def test_container_start_failure_raises(make_services):
+    services, container, _ = make_services([], up=False)
+    services.session.runner.run_docker = lambda: None
+    with pytest.raises(RuntimeError):
+        services.ensure()
+    assert container.commands == []
+
+
+def test_multiviz_started_only_when_down(make_services):
+    services, container, _ = make_services(
+        ["Dreamview", "Debug_Driver-LiDAR", "Perception"], ports={"dreamview": True, "multiviz": False}
+    )
+    services.ensure(tools=True)
+    [cmd] = container.commands
+    assert cmd[:3] == ["docker", "exec", "-d"] and "mdrive_multiviz" in cmd[-1]
+
+    services, container, _ = make_services(["Dreamview", "Debug_Driver-LiDAR", "Perception"])
+    services.ensure(tools=True)
+    assert container.commands == []
+
+
+def test_health_cached_within_ttl(make_services):
+    services, _, probes = make_services(["Dreamview", "Debug_Driver-LiDAR", "Perception"])
+    services.health()
+    services.health()
+    assert probes["container"] == 1
+    services.health(refresh=True)
+    assert probes["container"] == 2
+    services.invalidate()
+    services.health()
+    assert probes["container"] == 3
+
+
+def test_supervisor_status_parses_output(make_services):
+    services, _, _ = make_services(["Perception"])
+    assert services.supervisor_status() == {
+        "Dreamview": False, "Debug_Driver-LiDAR": False, "Perception": True
+    }
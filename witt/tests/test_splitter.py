@@ -0,0 +1,111 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from bench.synth import write_record
+from core.cyber.reader import SECTION_CHUNK_BODY, SECTION_CHUNK_HEADER, RecordReader
+from core.cyber.splitter import iter_messages, split_record, split_record_multi
+
+BEGIN = datetime(2026, 1, 1, 10, 0, 0)
+T0 = int(BEGIN.timestamp()) * 10**9
+CHANNELS = ["/mdrive/control/cmd", "/mdrive/planning/trajectory", "/mdrive/sensor/lidar/top"]
+RATE = 5
+
+
+@pytest.fixture
+def record(tmp_path):
+    path = tmp_path / "20260101100000.record.00000.100000"
+    write_record(path, BEGIN, seconds=12, channels=CHANNELS, rate=RATE, payload=32, chunk_seconds=5)
+    return path
+
+
+def read_messages(path):
+    """重新打开输出，按索引逐条读出 (channel, time)，并核对每个 chunk 的索引统计"""
+    messages = []
+    with RecordReader(str(path)) as reader:
+        header = reader.header
+        chunks = [e for e in reader.index if e["type"] == SECTION_CHUNK_HEADER]
+        bodies = [e for e in reader.index if e["type"] == SECTION_CHUNK_BODY]
+        assert len(chunks) == len(bodies) == header["chunk_number"]
+        for h_entry, b_entry in zip(chunks, bodies):
+            _, start, size = reader.read_section(b_entry["position"])
+            chunk = [(ch.decode(), t) for ch, t, _, _ in iter_messages(reader.mm, start, start + size)]
+            cache = h_entry["cache"]
+            assert cache[1] == b_entry["cache"][1] == len(chunk)
+            assert cache[2] == min(t for _, t in chunk)
+            assert cache[3] == max(t for _, t in chunk)
+            messages.extend(chunk)
+        channels = reader.channels()
+    assert header["is_complete"] == 1
+    assert header["size"] == os.path.getsize(path)
+    assert header["message_number"] == len(messages)
+    assert header["channel_number"] == len(channels)
+    assert header["begin_time"] == min(t for _, t in messages)
+    assert header["end_time"] == max(t for _, t in messages)
+    counts = {}
+    for ch, _ in messages:
+        counts[ch] = counts.get(ch, 0) + 1
+    assert channels == [{"name": ch, "count": counts[ch]} for ch in sorted(counts)]
+    return messages, counts
+
+
+def expected_count(start_s, end_s):
+    """合成数据中每个频道在 [start_s, end_s] 秒内的消息数"""
+    step = 10**9 // RATE
+    return sum(1 for i in range(12 * RATE) if start_s * 10**9 <= i * step <= end_s * 10**9)
+
+
+def test_full_window_copies_every_chunk(record, tmp_path):
+    dest = tmp_path / "full.split"
+    stats = split_record(str(record), str(dest), None, None)
+    assert stats["filtered_bytes"] == 0 and stats["chunks"] == 3
+    _, counts = read_messages(dest)
+    assert counts == {ch: 12 * RATE for ch in CHANNELS}
+
+
+def test_window_bounds_and_blacklist(record, tmp_path):
+    dest = tmp_path / "window.split"
+    start, end = T0 + 3 * 10**9, T0 + 8 * 10**9
+    split_record(str(record), str(dest), start, end, blacklist=[CHANNELS[2]])
+    messages, counts = read_messages(dest)
+    assert all(start <= t <= end for _, t in messages)
+    assert CHANNELS[2] not in counts
+    assert counts == {ch: expected_count(3, 8) for ch in CHANNELS[:2]}
+
+
+def test_blacklist_filters_chunks_inside_window(record, tmp_path):
+    dest = tmp_path / "blacklist.split"
+    stats = split_record(str(record), str(dest), None, None, blacklist=[CHANNELS[0]])
+    # 含黑名单频道的 chunk 即使整块落在窗口内也要逐条过滤
+    assert stats["copied_bytes"] == 0
+    _, counts = read_messages(dest)
+    assert counts == {ch: 12 * RATE for ch in CHANNELS[1:]}
+
+
+def test_multi_matches_each_window(record, tmp_path):
+    windows = [(1, 4), (4, 11), (10.5, 11)]
+    outputs = [
+        (str(tmp_path / f"multi{i}.split"), T0 + int(a * 10**9), T0 + int(b * 10**9))
+        for i, (a, b) in enumerate(windows)
+    ]
+    stats = split_record_multi(str(record), outputs, blacklist=[CHANNELS[1]])
+    assert len(stats) == len(outputs)
+    for (dest, start, end), (a, b), stat in zip(outputs, windows, stats):
+        messages, counts = read_messages(dest)
+        assert all(start <= t <= end for _, t in messages)
+        assert counts == {ch: expected_count(a, b) for ch in (CHANNELS[0], CHANNELS[2])}
+        assert stat["messages"] == len(messages)
+        single = dest + ".single"
+        split_record(str(record), single, start, end, blacklist=[CHANNELS[1]])
+        with open(dest, "rb") as f1, open(single, "rb") as f2:
+            assert f1.read() == f2.read()
+
+
+def test_window_without_messages_writes_empty_record(record, tmp_path):
+    dest = tmp_path / "empty.split"
+    stats = split_record(str(record), str(dest), T0 + 60 * 10**9, T0 + 70 * 10**9)
+    assert stats["messages"] == 0
+    with RecordReader(str(dest)) as reader:
+        assert reader.header["chunk_number"] == 0
+        assert reader.channels() == []
@@ -0,0 +1,80 @@
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from core.staging import StagingCache
+
+
+@pytest.fixture
+def nas(tmp_path):
+    src = tmp_path / "nas"
+    src.mkdir()
+    for name in ("a.record", "b.record"):
+        (src / name).write_bytes(name.encode() * 1000)
+    return src
+
+
+@pytest.fixture
+def staging(tmp_path, nas):
+    config = {"staging": {"enabled": True, "sources": [str(nas)], "dir": str(tmp_path / "stage")}}
+    return StagingCache(SimpleNamespace(config=config, cache_dir=tmp_path / ".witt"))
+
+
+def test_cached_does_not_copy(staging, nas):
+    path = nas / "a.record"
+    assert staging.cached(path) == path
+    assert not staging.root.exists()
+    local = staging.stage(path)
+    assert local != path and local.read_bytes() == path.read_bytes()
+    assert staging.cached(path) == local
+
+
+def test_cached_ignores_copy_in_progress(staging, nas, monkeypatch):
+    path = nas / "a.record"
+    started, release = threading.Event(), threading.Event()
+    copy = staging._copy
+
+    def slow_copy(src, dest):
+        started.set()
+        release.wait(5)
+        copy(src, dest)
+
+    monkeypatch.setattr(staging, "_copy", slow_copy)
+    worker = threading.Thread(target=staging.stage, args=(path,))
+    worker.start()
+    assert started.wait(5)
+    assert staging.cached(path) == path
+    release.set()
+    worker.join()
+    assert staging.cached(path) != path
+
+
+def test_prefetch_warms_in_background(staging, nas):
+    paths = [nas / "a.record", nas / "b.record"]
+    staging.prefetch(paths)
+    deadline = time.monotonic() + 5
+    while any(staging.cached(p) == p for p in paths) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert all(staging.cached(p) != p for p in paths)
+
+
+def test_player_starts_from_nas_without_waiting(local_session, monkeypatch):
+    session, _ = local_session
+    data_root = session.ctx.config["host"]["data_root"]
+    staging = session.executor.staging
+    staging.enabled, staging._sources = True, [data_root]
+    staging._dir = str(session.ctx.cache_dir / "staging")
+    records = sorted(str(p) for p in Path(data_root).glob("*_soc1/*.record.*"))[:2]
+    copied = []
+    monkeypatch.setattr(staging, "_copy", lambda src, dest: copied.append(src))
+    monkeypatch.setattr(staging, "prefetch", lambda paths: copied.append(list(map(str, paths))))
+    commands = []
+    monkeypatch.setattr("interface.workflow.restore_env_flow", lambda *a, **k: None)
+    monkeypatch.setattr(session.executor, "execute_interactive", commands.append)
+    begin = "2026-01-01T10:00:00"
+    session.player.play([{"path": p, "begin": begin, "duration": 20} for p in records])
+    assert copied == [records]
+    assert all(p in commands[0] for p in records)
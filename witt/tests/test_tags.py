@@ -0,0 +1,94 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from conftest import DATE
+from utils import parser
+from utils.tags import load_tag_files, parse_tag_line, parse_tag_text
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ('msg: "brake : 2026/1/1 09:05:07\\n"', ("2026-01-01 09:05:07", "brake", 9 * 3600 + 307)),
+        ('msg: "brake : 1/1/2026, 9:05:07 PM\\n"', ("2026-01-01 21:05:07", "brake", 21 * 3600 + 307)),
+        ('msg: "noon : 1/1/2026, 12:00:00 PM"', ("2026-01-01 12:00:00", "noon", 12 * 3600)),
+        ('msg: "midnight : 1/1/2026, 12:00:01 AM"', ("2026-01-01 00:00:01", "midnight", 1)),
+        ('msg: "bad : yesterday"', None),
+        ("header: 1", None),
+    ],
+)
+def test_parse_tag_line(line, expected):
+    assert parse_tag_line(line) == expected
+
+
+def write_tags(path: Path, *names):
+    path.write_text(
+        "".join(f'msg: "{n} : 2026/1/1 10:00:{i:02d}\\n"\n' for i, n in enumerate(names)),
+        encoding="utf-8",
+    )
+
+
+def test_unchanged_files_reuse_cache(tmp_path):
+    a, b = tmp_path / "tag_a.pb.txt", tmp_path / "tag_b.pb.txt"
+    write_tags(a, "x", "y")
+    write_tags(b, "z")
+    cache, reparsed = load_tag_files([str(a), str(b)], {})
+    assert reparsed == 2
+    assert [e[1] for e in cache[str(a)]["entries"]] == ["x", "y"]
+    again, reparsed = load_tag_files([str(a), str(b)], cache)
+    assert reparsed == 0
+    assert again[str(a)] is cache[str(a)]
+
+
+def test_changed_file_invalidates_cache(tmp_path):
+    a, b = tmp_path / "tag_a.pb.txt", tmp_path / "tag_b.pb.txt"
+    write_tags(a, "x")
+    write_tags(b, "z")
+    cache, _ = load_tag_files([str(a), str(b)], {})
+
+    # 追加 tag：大小变化
+    write_tags(a, "x", "y")
+    cache, reparsed = load_tag_files([str(a), str(b)], cache)
+    assert reparsed == 1
+    assert [e[1] for e in cache[str(a)]["entries"]] == ["x", "y"]
+
+    # 大小不变、只改内容：靠 mtime 识别
+    st = os.stat(a)
+    write_tags(a, "u", "v")
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert os.stat(a).st_size == st.st_size
+    cache, reparsed = load_tag_files([str(a), str(b)], cache)
+    assert reparsed == 1
+    assert [e[1] for e in cache[str(a)]["entries"]] == ["u", "v"]
+
+
+def test_removed_file_dropped_from_cache(tmp_path):
+    a, b = tmp_path / "tag_a.pb.txt", tmp_path / "tag_b.pb.txt"
+    write_tags(a, "x")
+    write_tags(b, "z")
+    cache, _ = load_tag_files([str(a), str(b)], {})
+    b.unlink()
+    cache, reparsed = load_tag_files([str(a), str(b)], cache)
+    assert list(cache) == [str(a)] and reparsed == 0
+
+
+def test_search_picks_up_edited_tag_file(local_session):
+    session, dataset = local_session
+    tag_file = Path(session.ctx.config["host"]["data_root"]) / "tags" / f"tag_{DATE}_a.pb.txt"
+    session.index.search()
+    names = {t["name"] for t in parser.parse_manifest(session.ctx.manifest_path)}
+    assert len(names) == dataset["tags"]
+
+    with open(tag_file, "a", encoding="utf-8") as f:
+        f.write('msg: "added : 2026/1/1 10:01:00\\n"\n')
+    session.index.search()
+    names = {t["name"] for t in parser.parse_manifest(session.ctx.manifest_path)}
+    assert "added" in names and len(names) == dataset["tags"] + 1
+
+
+def test_parse_tag_text_skips_unparsable_lines():
+    text = 'msg: "a : 2026/1/1 10:00:00\\n"\nmsg: "b : nope"\n\nmsg: "c : 1/1/2026, 1:00:00 AM"\n'
+    assert [e[1] for e in parse_tag_text(text)] == ["a", "c"]
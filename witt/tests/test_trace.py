@@ -0,0 +1,90 @@
+import json
+import subprocess
+import threading
+
+import pytest
+
+from core.trace import Tracer
+
+
+def test_span_records_attrs_and_caller_updates():
+    tracer = Tracer()
+    with tracer.span("docker.exec", cmd="ls", bytes_in=10, file=None) as s:
+        s["bytes_out"] = 4
+        s["exit_code"] = 0
+    [record] = tracer._spans
+    assert record["name"] == "docker.exec" and record["cmd"] == "ls"
+    assert record["bytes_in"] == 10 and record["bytes_out"] == 4 and record["exit_code"] == 0
+    assert record["dur"] >= 0 and record["tid"] == threading.get_ident()
+    # 值为 None 的字段不写出
+    assert "file" not in record
+
+
+def test_span_records_error_and_reraises():
+    tracer = Tracer()
+    with pytest.raises(subprocess.CalledProcessError):
+        with tracer.span("script.run"):
+            raise subprocess.CalledProcessError(3, "x")
+    with pytest.raises(ValueError):
+        with tracer.span("script.run"):
+            raise ValueError("bad")
+    failed, other = tracer._spans
+    assert failed["error"] == "CalledProcessError" and failed["exit_code"] == 3
+    assert other["error"] == "ValueError" and "exit_code" not in other
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    tracer = Tracer()
+    tracer.enabled = False
+    with tracer.span("x", a=1) as s:
+        assert s == {"a": 1}
+    assert tracer.flush(tmp_path) == []
+    assert not list(tmp_path.iterdir())
+
+
+def test_summary_groups_by_stage():
+    tracer = Tracer()
+    spans = [
+        {"name": "a", "dur": 1.0, "bytes_in": 5},
+        {"name": "a", "dur": 3.0, "bytes_out": 2, "error": "OSError"},
+        {"name": "b", "dur": 0.5},
+    ]
+    a, b = tracer.summary(spans)
+    assert a == {"stage": "a", "count": 2, "total": 4.0, "max": 3.0, "errors": 1,
+                 "bytes_in": 5, "bytes_out": 2, "mean": 2.0}
+    assert b["stage"] == "b" and b["count"] == 1
+
+
+def test_flush_writes_jsonl_and_chrome_trace(tmp_path):
+    tracer = Tracer()
+    with tracer.span("stage0.run", bytes_in=7):
+        pass
+    summary = tracer.flush(tmp_path / "log")
+    assert [row["stage"] for row in summary] == ["stage0.run"]
+    [jsonl] = (tmp_path / "log").glob("trace_*.jsonl")
+    [record] = [json.loads(line) for line in jsonl.read_text(encoding="utf-8").splitlines()]
+    assert record["name"] == "stage0.run" and record["bytes_in"] == 7
+    chrome = json.loads(jsonl.with_suffix(".json").read_text(encoding="utf-8"))
+    [event] = chrome["traceEvents"]
+    assert event["ph"] == "X" and event["cat"] == "stage0"
+    assert event["args"] == {"bytes_in": 7}
+    # flush 后清空，下一轮没有 span 时不写文件
+    assert tracer.flush(tmp_path / "log") == []
+    assert len(list((tmp_path / "log").iterdir())) == 2
+
+
+def test_concurrent_spans_are_all_kept():
+    tracer = Tracer()
+
+    def work():
+        for _ in range(200):
+            with tracer.span("w"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(tracer._spans) == 1600
+    assert len({s["tid"] for s in tracer._spans}) > 1
@@ -0,0 +1,89 @@
+import json
+import stat
+
+import pytest
+
+import interface.cli  # noqa: F401  先加载界面模块，避免 core.session 的循环导入
+from core.context import TaskContext
+from core.session import DEFAULT_CONFIG_PATH
+from core.versions import PACKAGES, READY, VersionCache
+
+VERSIONS = {
+    "mdrive": "2.1.0",
+    "mdrive_conf": "M5.2.1.0",
+    "mdrive_model": "20260101",
+    "mdrive_map": "m1",
+}
+VMC_SH = """MDRIVE_VEHICLE_MODEL="M5"
+MDRIVE_VEHICLE_NAME="XZB"
+MDRIVE_VERSION=1.0.0
+MDRIVE_CONF_VERSION=M5.1.0.0
+MDRIVE_MODEL_VERSION=20250101
+MDRIVE_MAP_VERSION=m0
+"""
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """mdrive_root 中是已安装的实体目录，~/.vmc/bin/vmc 由脚本模拟"""
+    root = tmp_path / "mdrive_root"
+    for name in PACKAGES:
+        (root / name).mkdir(parents=True)
+        (root / name / "VERSION").write_text("old", encoding="utf-8")
+    (root / "vmc.sh").write_text(VMC_SH, encoding="utf-8")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    ctx = TaskContext(DEFAULT_CONFIG_PATH)
+    ctx.config["host"]["mdrive_root"] = str(root)
+    ctx.config["logic"]["vehicle"] = "XZB"
+    ctx.config["versions"] = {"enabled": True, "max_gb": 60}
+    return VersionCache(ctx)
+
+
+def fake_vmc(home, fail_on=""):
+    """按 VMC_SOFTWARE 安装，包名为 fail_on 时写入一半后失败"""
+    vmc = home / ".vmc" / "bin" / "vmc"
+    vmc.parent.mkdir(parents=True, exist_ok=True)
+    vmc.write_text(
+        "#!/bin/bash\n"
+        'mkdir -p "$VMC_SOFTWARE/$3" && echo "$5" > "$VMC_SOFTWARE/$3/VERSION"\n'
+        f'[ "$3" != "{fail_on}" ]\n',
+        encoding="utf-8",
+    )
+    vmc.chmod(vmc.stat().st_mode | stat.S_IEXEC)
+
+
+def test_key_includes_vehicle(cache):
+    key = cache.key_of(VERSIONS, "XZB")
+    assert "M5" in key and "XZB" in key
+    assert key != cache.key_of(VERSIONS, "XZA")
+
+
+def test_failed_install_leaves_nothing(cache, tmp_path):
+    fake_vmc(tmp_path / "home", fail_on="mdrive_model")
+    with pytest.raises(Exception):
+        cache.prepare(VERSIONS)
+    assert not (cache.root / cache.key_of(VERSIONS, "XZB")).exists()
+    fake_vmc(tmp_path / "home")
+    key = cache.prepare(VERSIONS)
+    assert json.loads((cache.root / key / READY).read_text())["versions"] == VERSIONS
+
+
+def test_evict_removes_unmarked(cache):
+    partial = cache.root / "partial"
+    (partial / "mdrive").mkdir(parents=True)
+    cache.evict(keep="other")
+    assert not partial.exists()
+
+
+def test_detach_restores_real_dirs(cache):
+    cache.root.mkdir(parents=True)
+    cache._adopt()
+    key = cache.active_key()
+    assert key and (cache.mdrive_root / "mdrive").is_symlink()
+    cache.detach()
+    assert cache.active_key() is None
+    for name in PACKAGES:
+        path = cache.mdrive_root / name
+        assert path.is_dir() and not path.is_symlink()
+        assert (path / "VERSION").read_text() == "old"
+    assert not (cache.root / key).exists()
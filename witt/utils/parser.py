@@ -1,8 +1,9 @@
+import json
 import math
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List
 
 from interface import ui
 
@@ -10,7 +11,11 @@ _RE_TIME = re.compile(
     r"(?:begin|end)_time:\s+(\d{4}[-\s]\d{2}[-\s]\d{2}[-\s]\d{2}:\d{2}:\d{2})"
 )
 _RE_DURATION = re.compile(r"duration:\s+(\d+\.?\d*)")
-_RE_CHANNELS = re.compile(r"(\/mdrive\/[\/\w]+)\s+(\d+)\s+messages")
+_CHANNEL_NAME = r"\/mdrive\/[\/\w]+"
+# 频道名需从行首空白后开始，/apollo/mdrive/x 之类不截取出 /mdrive/x
+_RE_CHANNELS = re.compile(rf"(?<![\w/])({_CHANNEL_NAME})\s+(\d+)\s+messages")
+_RE_CHANNEL_NAME = re.compile(_CHANNEL_NAME)
+_RE_SOC = re.compile(r"soc\d+")
 
 
 def parse_record_info(stdout: str) -> Dict[str, Any]:
@@ -31,6 +36,11 @@ def parse_record_info(stdout: str) -> Dict[str, Any]:
     }
 
 
+def is_listed_channel(name: str) -> bool:
+    """parse_record_info 只列出 /mdrive/ 下的频道，本地解析保持同一口径"""
+    return _RE_CHANNEL_NAME.fullmatch(name) is not None
+
+
 def sanitize_name(name: str) -> str:
     """清洗目录文件名，去除非法字符"""
     if not name:
@@ -42,6 +52,12 @@ def sanitize_name(name: str) -> str:
     return sanitized.strip("._")
 
 
+def soc_of(path: str) -> str:
+    """从路径中识别所属 SOC，识别不到返回 unknown"""
+    match = _RE_SOC.search(str(path))
+    return match.group(0) if match else "unknown"
+
+
 def str_to_time(t_str: str) -> datetime:
     """统一解析 Cyber 时间字符串为 datetime 对象"""
     clean_t = (
@@ -61,39 +77,54 @@ def time_to_str(dt: Any) -> str:
     return str(dt)
 
 
-def parse_manifest(manifest_path: Path) -> List[Dict[str, Any]]:
-    """解析 find_record.sh 生成的 manifest.list: time|tag|paths"""
+def manifest_row(tag_time: str, tag: str, files: Dict[str, List[Dict[str, Any]]]) -> str:
+    """
+    tasks.jsonl 的一行：{"time", "tag", "files": {soc: [{"path", "start", "size"}]}}
+    start 为 record 开始的当天秒数，size 为字节数，未知时为 null
+    """
+    return json.dumps({"time": tag_time, "tag": tag, "files": files}, ensure_ascii=False) + "\n"
+
+
+def iter_manifest(manifest_path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    逐行解析 manifest，读到一个 tag 就产出一个任务，不整体载入。
+    兼容 find_record.sh 生成的旧格式 time|tag|paths；写入方已按 tag 时间排序，序号按读取顺序分配
+    """
     if not manifest_path.exists():
-        return []
-    lines = [
-        i.strip()
-        for i in manifest_path.read_text(encoding="utf-8").splitlines()
-        if i.strip()
-    ]
-    tasks = []
-    for line in lines:
-        parts = line.split("|")
-        tag_time = parts[0]
-        tag_name = sanitize_name(parts[1])
-        raw_paths = parts[2].split()
-        soc_paths = {"soc1": [], "soc2": []}
-        for p in raw_paths:
-            if "soc1" in p:
-                soc_paths["soc1"].append(p)
-            elif "soc2" in p:
-                soc_paths["soc2"].append(p)
-        tasks.append(
-            {
+        return
+    count = 0
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                row = json.loads(line)
+                tag_time, tag, files = row["time"], row["tag"], row.get("files") or {}
+            else:
+                parts = line.split("|")
+                tag_time, tag = parts[0], parts[1]
+                files = {}
+                for p in parts[2].split():
+                    files.setdefault(soc_of(p), []).append({"path": p})
+            count += 1
+            ordered = sorted(
+                (f for soc_files in files.values() for f in soc_files),
+                key=lambda f: f.get("start") or 0,
+            )
+            yield {
+                "id": f"{count:02d}",
                 "time": tag_time,
-                "name": tag_name,
-                "soc_paths": soc_paths,
-                "paths": raw_paths,
+                "name": sanitize_name(tag),
+                "files": files,
+                "soc_paths": {soc: [f["path"] for f in files[soc]] for soc in sorted(files)},
+                "paths": [f["path"] for f in ordered],
             }
-        )
-    tasks.sort(key=lambda x: x["time"])
-    for i, task in enumerate(tasks, 1):
-        task["id"] = f"{i:02d}"
-    return tasks
+
+
+def parse_manifest(manifest_path: Path) -> List[Dict[str, Any]]:
+    """一次读出全部任务，供需要整体展示、选择的交互流程使用"""
+    return list(iter_manifest(manifest_path))
 
 
 def parse_range_logic(range_in: str) -> tuple:
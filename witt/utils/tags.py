@@ -0,0 +1,87 @@
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (格式化时间, tag 名, 当天秒数)
+TagEntry = Tuple[str, str, int]
+
+_RE_TAG_MSG = re.compile(r'msg: "([^"]+)"')
+_RE_TAG_YMD = re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2}) (\d{1,2}):(\d{2}):(\d{2})")
+_RE_TAG_MDY = re.compile(
+    r"(\d{1,2})/(\d{1,2})/(\d{4}), (\d{1,2}):(\d{2}):(\d{2}) (AM|PM)"
+)
+
+
+def parse_tag_line(line: str) -> Optional[TagEntry]:
+    """解析一行 tag 记录，支持 YYYY/M/D HH:MM:SS 与 M/D/YYYY, H:MM:SS AM|PM 两种时间格式"""
+    m_msg = _RE_TAG_MSG.search(line)
+    if not m_msg:
+        return None
+    msg = m_msg.group(1).replace("\\n", "")
+    tag = msg.split(" :", 1)[0]
+    m = _RE_TAG_YMD.search(msg)
+    if m:
+        yyyy, month, dd, hh, mm, ss = (int(x) for x in m.groups())
+    else:
+        m = _RE_TAG_MDY.search(msg)
+        if not m:
+            logging.warning(f"[TAGS] 无法解析 tag 时间: {msg}")
+            return None
+        month, dd, yyyy, hh, mm, ss = (int(x) for x in m.groups()[:6])
+        if m.group(7) == "PM" and hh < 12:
+            hh += 12
+        elif m.group(7) == "AM" and hh == 12:
+            hh = 0
+    formatted = f"{yyyy:04d}-{month:02d}-{dd:02d} {hh:02d}:{mm:02d}:{ss:02d}"
+    return formatted, tag, hh * 3600 + mm * 60 + ss
+
+
+def parse_tag_text(content: str) -> List[TagEntry]:
+    """解析 tag_*.pb.txt 内容"""
+    return [e for e in map(parse_tag_line, content.splitlines()) if e]
+
+
+def file_signature(path: str) -> Optional[List[int]]:
+    """(大小, mtime_ns)，文件不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read(path: str) -> Optional[List[TagEntry]]:
+    try:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            return parse_tag_text(f.read())
+    except OSError:
+        return None
+
+
+def load_tag_files(
+    paths: Iterable[str], cache: Dict[str, Dict], workers: int = 8
+) -> Tuple[Dict[str, Dict], int]:
+    """
+    批量加载 tag 文件：大小与 mtime 未变的直接复用缓存，其余并发读取解析
+    cache 与返回值格式为 {path: {"sig": [size, mtime_ns], "entries": [...]}}
+    返回 (新的缓存, 重新解析的文件数)
+    """
+    result: Dict[str, Dict] = {}
+    todo = []
+    for path in paths:
+        sig = file_signature(path)
+        if sig is None:
+            continue
+        old = cache.get(path)
+        if old and old.get("sig") == sig:
+            result[path] = old
+        else:
+            todo.append((path, sig))
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+            for (path, sig), entries in zip(todo, pool.map(_read, [p for p, _ in todo])):
+                if entries is not None:
+                    result[path] = {"sig": sig, "entries": entries}
+    return result, len(todo)